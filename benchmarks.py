@@ -0,0 +1,526 @@
+#!/usr/bin/env python3
+"""
+Benchmarks for Baggy Moonz Twitter Bot
+Offline throughput checks for the per-tweet hot paths - no browser or API key needed.
+
+Usage:
+    python benchmarks.py classify [--sizes 1000 100000 1000000] [--seed 42]
+    python benchmarks.py state [--rows 1000000] [--lookups 10000]
+    python benchmarks.py logging [--tweets 20000]
+    python benchmarks.py candidates [--ks 1 3 5] [--replies 300] [--invalid-rate 0.4]
+    python benchmarks.py streaming [--replies 30] [--ttft 0.3] [--token-latency 0.03]
+    python benchmarks.py batching [--sizes 1 2 3 4 5 6 7 8] [--replies 24] [--ttft 0.3]
+    python benchmarks.py micro [--corpus synthetic|recorded] [--size 2000] [--output micro.json] [--compare old.json]
+"""
+import os
+import sys
+import json
+import time
+import random
+import logging
+import argparse
+import platform
+import tempfile
+import tracemalloc
+
+import keywords
+import personality
+from features import TextFeatures
+from state import StateStore, text_fingerprint
+import logs
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+
+def load_fixture_tweets():
+    """Recorded sample tweets from fixtures/tweets.json."""
+    with open(os.path.join(FIXTURES_DIR, "tweets.json")) as f:
+        return [item["text"] for item in json.load(f)]
+
+
+def generate_corpus(size, seed=42):
+    """Synthetic tweets: recorded fixtures mixed with random topic words, so texts vary in length and hits."""
+    rng = random.Random(seed)
+    recorded = load_fixture_tweets()
+    topics = keywords.active().engagement_topics
+    filler = ["honestly", "ok", "lol", "today", "again", "why", "nobody", "asked", "this", "is", "fine", "?"]
+    corpus = []
+    for _ in range(size):
+        words = rng.choice(recorded).split()
+        rng.shuffle(words)
+        words = words[:rng.randint(3, len(words))]
+        words += rng.choices(filler, k=rng.randint(0, 4)) + rng.choices(topics, k=rng.randint(0, 2))
+        corpus.append(" ".join(words))
+    return corpus
+
+
+def bench_classify(sizes, seed, scalar_limit=100000):
+    """Batch classification throughput vs calling the three per-tweet functions in a loop."""
+    print(f"{'tweets':>10} {'batch s':>10} {'batch/s':>12} {'scalar s':>10} {'scalar/s':>12} {'speedup':>8}")
+    for size in sizes:
+        corpus = generate_corpus(size, seed)
+
+        start = time.perf_counter()
+        personality.classify_batch(corpus)
+        batch_seconds = time.perf_counter() - start
+
+        scalar_seconds = None
+        if size <= scalar_limit:
+            start = time.perf_counter()
+            for text in corpus:
+                personality.should_engage_with_content(text)
+                personality.should_retweet_content(text)
+                personality.get_engagement_style(text)
+            scalar_seconds = time.perf_counter() - start
+
+        if scalar_seconds is not None:
+            print(f"{size:>10} {batch_seconds:>10.3f} {size / batch_seconds:>12,.0f} "
+                  f"{scalar_seconds:>10.3f} {size / scalar_seconds:>12,.0f} {scalar_seconds / batch_seconds:>7.1f}x")
+        else:
+            print(f"{size:>10} {batch_seconds:>10.3f} {size / batch_seconds:>12,.0f} {'-':>10} {'-':>12} {'-':>8}")
+
+
+def load_recorded_corpus():
+    """Every recorded tweet text: the sample timeline plus the raw scraped texts."""
+    with open(os.path.join(FIXTURES_DIR, "raw_tweets.json")) as f:
+        raw = [item["text"] for item in json.load(f)]
+    return load_fixture_tweets() + raw
+
+
+def keyword_counts():
+    """Sizes of the keyword lists the per-tweet functions scan - results are only comparable at equal sizes."""
+    lists = keywords.active().keywords
+    return {
+        "interest": sum(len(lists[tier]) for tier in ("very_high_interest", "high_interest", "medium_interest")),
+        "engaging_patterns": len(lists["engaging_patterns"]),
+        "retweet": len(lists["retweet"]) + len(lists["decent_retweet"]),
+        "spam": len(lists["spam"]),
+        "style": sum(len(words) for _, words in keywords.active().engagement_styles),
+    }
+
+
+def micro_cases(corpus, twitter_bot):
+    """(name, fn, argument tuples) for every per-tweet hot path; replies and threads are built from the corpus."""
+    import bot
+    threads = [" ".join(corpus[i:i + 3]) for i in range(len(corpus))]
+    replies = [text[:150] for text in corpus[1:] + corpus[:1]]  # Tweet-sized stand-ins for generated replies
+    scorer = twitter_bot.relevance_scorer
+
+    def tweet_checks(tweet, reply):
+        """Every local check one replied-to tweet goes through: engage, style, retweet, relevance x2."""
+        personality.should_engage_with_content(tweet)
+        personality.get_engagement_style(tweet)
+        personality.should_retweet_content(tweet)
+        scorer.classify(reply, tweet)
+        scorer.classify(reply, tweet)  # The strict-reply retry validates against the same tweet
+
+    def tweet_checks_shared(text, reply):
+        tweet_checks(TextFeatures(text), reply)
+
+    return [
+        ("should_engage_with_content", personality.should_engage_with_content, [(text,) for text in corpus]),
+        ("should_retweet_content", personality.should_retweet_content, [(text,) for text in corpus]),
+        ("get_engagement_style", personality.get_engagement_style, [(text,) for text in corpus]),
+        ("should_engage_with_thread_content", personality.should_engage_with_thread_content,
+         [(text,) for text in threads]),
+        ("get_thread_continuation_style", personality.get_thread_continuation_style, [(text,) for text in threads]),
+        ("content_violation", bot.content_violation, [(text,) for text in replies]),
+        ("candidate_score", bot.candidate_score, [(text,) for text in replies]),
+        ("ensure_complete_sentence", twitter_bot.ensure_complete_sentence, [(text,) for text in replies]),
+        ("relevance_classify", scorer.classify, list(zip(replies, corpus))),
+        ("tweet_checks (strings)", tweet_checks, list(zip(corpus, replies))),
+        ("tweet_checks (TextFeatures)", tweet_checks_shared, list(zip(corpus, replies))),
+    ]
+
+
+def measure(fn, args_list, repeats, seed):
+    """(ops/sec of the median pass, mean peak bytes allocated per call, blocks left behind per call)."""
+    passes = []
+    for _ in range(repeats):
+        random.seed(seed)  # Same draws every pass - the keyword functions branch on random()
+        start = time.perf_counter()
+        for args in args_list:
+            fn(*args)
+        passes.append(time.perf_counter() - start)
+    passes.sort()
+
+    random.seed(seed)
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    peak_total = 0
+    for args in args_list:
+        tracemalloc.reset_peak()
+        before = tracemalloc.get_traced_memory()[0]
+        fn(*args)
+        peak_total += tracemalloc.get_traced_memory()[1] - before
+    retained = tracemalloc.get_traced_memory()[0] - baseline
+    tracemalloc.stop()
+    return len(args_list) / passes[len(passes) // 2], peak_total / len(args_list), retained / len(args_list)
+
+
+def bench_micro(corpus_kind, size, repeats, seed, output=None, compare=None, threshold=0.15):
+    """Ops/sec and allocations per call for the personality functions and the local validators."""
+    import bot
+    from offline import MockChatClient
+
+    logging.getLogger().setLevel(logging.ERROR)
+    if corpus_kind == "recorded":
+        recorded = load_recorded_corpus()
+        corpus = [recorded[i % len(recorded)] for i in range(size)]
+    else:
+        corpus = generate_corpus(size, seed)
+    with tempfile.TemporaryDirectory() as tmp:
+        twitter_bot = bot.IntelligentTwitterBot(llm_client=MockChatClient(seed=seed),
+                                                state_path=os.path.join(tmp, "micro.db"),
+                                                mentions_path=os.path.join(tmp, "micro.json"))
+        results = {}
+        for name, fn, args_list in micro_cases(corpus, twitter_bot):
+            ops, peak, retained = measure(fn, args_list, repeats, seed)
+            results[name] = {"ops_per_sec": round(ops), "us_per_op": round(1e6 / ops, 3),
+                             "peak_bytes_per_call": round(peak, 1), "retained_bytes_per_call": round(retained, 2)}
+        twitter_bot.state.close()
+
+    run = {"corpus": corpus_kind, "size": size, "repeats": repeats, "seed": seed,
+           "python": platform.python_version(), "keywords": keyword_counts(), "results": results}
+    baseline = None
+    if compare:
+        with open(compare) as f:
+            baseline = json.load(f)
+        if (baseline["corpus"], baseline["size"], baseline["seed"]) != (corpus_kind, size, seed):
+            print(f"⚠️ {compare} used a different corpus ({baseline['corpus']}, {baseline['size']}, "
+                  f"seed {baseline['seed']}) - ratios are only indicative")
+        if baseline.get("keywords") != run["keywords"]:
+            print(f"keyword lists changed: {baseline.get('keywords')} -> {run['keywords']}")
+
+    print(f"{corpus_kind} corpus, {size} tweets, median of {repeats} passes, Python {run['python']}")
+    print(f"{'function':<34} {'ops/s':>11} {'us/op':>8} {'peak B/call':>12} {'kept B/call':>12}"
+          + (f" {'vs baseline':>12}" if baseline else ""))
+    regressions = []
+    for name, result in results.items():
+        line = (f"{name:<34} {result['ops_per_sec']:>11,} {result['us_per_op']:>8.2f} "
+                f"{result['peak_bytes_per_call']:>12.0f} {result['retained_bytes_per_call']:>12.1f}")
+        old = baseline["results"].get(name) if baseline else None
+        if old:
+            ratio = result["ops_per_sec"] / old["ops_per_sec"]
+            line += f" {ratio:>11.2f}x"
+            if ratio < 1 - threshold:
+                regressions.append(name)
+                line += "  slower"
+        print(line)
+
+    if output:
+        with open(output, "w") as f:
+            json.dump(run, f, indent=2)
+        print(f"results written to {output}")
+    if regressions:
+        print(f"{len(regressions)} function(s) more than {threshold:.0%} slower than {compare}: {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+def percentile(sorted_values, fraction):
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * fraction))]
+
+
+def bench_state(rows, lookups, seed):
+    """State store startup and lookup latency with `rows` stored engagements."""
+    rng = random.Random(seed)
+    authors = [f"user{i}" for i in range(max(1, rows // 50))]
+    now = time.time()
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench_state.db")
+
+        store = StateStore(path)
+        start = time.perf_counter()
+        chunk = 100000
+        tweet_ids = []
+        for offset in range(0, rows, chunk):
+            batch = []
+            for i in range(offset, min(rows, offset + chunk)):
+                author = rng.choice(authors)
+                tweet_id = f"{author}:{text_fingerprint(str(i))}"
+                batch.append((tweet_id, author, "like", now - rng.uniform(0, 60 * 86400)))
+                if i % max(1, rows // lookups) == 0:
+                    tweet_ids.append(tweet_id)
+            store.record_engagements(batch)
+        store.close()
+        insert_seconds = time.perf_counter() - start
+        size_mb = os.path.getsize(path) / 1e6
+        print(f"inserted {rows:,} engagements in {insert_seconds:.1f}s ({rows / insert_seconds:,.0f}/s), db {size_mb:.0f} MB")
+
+        # Startup: open the store and answer the first dedup question
+        start = time.perf_counter()
+        store = StateStore(path)
+        store.has_engaged(tweet_ids[0])
+        lazy_ms = (time.perf_counter() - start) * 1000
+        start = time.perf_counter()
+        eager = {row[0] for row in store.conn.execute("SELECT tweet_id FROM engagements")}
+        eager_ms = (time.perf_counter() - start) * 1000
+        print(f"startup: lazy open + first lookup {lazy_ms:.1f}ms vs loading all ids into a set {eager_ms:.0f}ms")
+        del eager
+
+        def timed(fn, args_list):
+            timings = []
+            for args in args_list:
+                start = time.perf_counter()
+                fn(*args)
+                timings.append((time.perf_counter() - start) * 1e6)
+            timings.sort()
+            return f"p50 {percentile(timings, 0.5):.1f}us  p99 {percentile(timings, 0.99):.1f}us"
+
+        print(f"has_engaged hit      {timed(store.has_engaged, [(tweet_id,) for tweet_id in tweet_ids])}")
+        print(f"has_engaged miss     {timed(store.has_engaged, [(f'nobody:{i}',) for i in range(len(tweet_ids))])}")
+        print(f"engagements_with     {timed(store.engagements_with, [(rng.choice(authors), now - 7 * 86400) for _ in range(1000)])}")
+        print(f"record_engagement    {timed(store.record_engagement, [(f'new:{i}', 'newuser', 'like') for i in range(lookups)])}")
+
+        start = time.perf_counter()
+        removed = store.compact(max_age_days=30)
+        print(f"compact (30 days): removed {removed:,} rows in {time.perf_counter() - start:.1f}s")
+        store.close()
+
+
+def simulate_tweet_logging(logger, text, author, lazy):
+    """The log calls the timeline hot path makes for one tweet (seen, decision, action)."""
+    if lazy:
+        logger.info("👀 Looking at tweet from @%s: %s...", author, text[:50])
+        logger.info("🤔 Deciding whether to engage with @%s", author)
+        logger.info("🎯 ENGAGING - Tweet matches interests: %s...", text[:50])
+        logger.debug("Raw tweet text: %s", text)
+        logger.info("🎯 Engaging with %s on %s", "like", "tweet")
+        logs.log_event("tweet_evaluated", tweet_id=f"{author}:x", author=author, chars=len(text), engage=True)
+        logs.log_event("decision", tweet_id=f"{author}:x", action="like", prepare_ms=3)
+        logs.log_event("action", tweet_id=f"{author}:x", action="like", ok=True, ms=40)
+    else:
+        logger.info(f"👀 Looking at tweet from @{author}: {text[:50]}...")
+        logger.info(f"🤔 Deciding whether to engage with @{author}")
+        logger.info(f"🎯 ENGAGING - Tweet matches interests: {text[:50]}...")
+        logger.debug(f"Raw tweet text: {text}")
+        logger.info(f"🎯 Engaging with {'like'} on {'tweet'}")
+
+
+def bench_logging(tweets, seed, idle=0.0005):
+    """Per-tweet logging cost on the calling thread: old synchronous FileHandler vs the queue setup."""
+    corpus = generate_corpus(min(tweets, 5000), seed)
+    logger = logging.getLogger("BaggyMoonz")
+    root = logging.getLogger()
+    saved_handlers, saved_level = root.handlers[:], root.level
+
+    with tempfile.TemporaryDirectory() as tmp:
+        results = {}
+        for mode in ("sync", "queue"):
+            if mode == "sync":
+                handler = logging.FileHandler(os.path.join(tmp, "sync.log"))
+                handler.setFormatter(logging.Formatter(logs.HUMAN_FORMAT))
+                root.handlers = [handler]
+                root.setLevel(logging.INFO)
+            else:
+                logs.setup_logging(os.path.join(tmp, "queue.log"), os.path.join(tmp, "queue.events.jsonl"), console=False)
+
+            # Tweets are separated by browser waits in the bot - idle briefly between them, untimed
+            timings = []
+            for i in range(tweets):
+                start = time.perf_counter()
+                simulate_tweet_logging(logger, corpus[i % len(corpus)], f"user{i % 97}", lazy=mode == "queue")
+                timings.append((time.perf_counter() - start) * 1e6)
+                time.sleep(idle)
+            timings.sort()
+            results[mode] = (sum(timings) / tweets, percentile(timings, 0.5), percentile(timings, 0.99))
+
+            if mode == "sync":
+                handler.close()
+            else:
+                logs.stop_logging()
+
+        root.handlers, root.level = saved_handlers, saved_level
+        print("caller-thread cost per tweet (us)            mean     p50     p99")
+        for mode, label in (("sync", "sync FileHandler, f-strings (5 lines)"), ("queue", "queue + lazy (5 lines + 3 events)")):
+            mean, p50, p99 = results[mode]
+            print(f"{label:<40} {mean:>8.1f} {p50:>7.1f} {p99:>7.1f}")
+
+
+def bench_candidates(ks, replies, invalid_rate, rtt, seed):
+    """Round trips and modelled latency per accepted reply when sampling k candidates per request."""
+    import bot  # Only this benchmark needs the bot (and its logging setup)
+    from offline import MockChatClient, load_fixture_items
+    import prompts
+    import timing
+
+    items = load_fixture_items()
+    timing.TIMINGS.sleep_enabled = False
+    logging.getLogger().setLevel(logging.WARNING)
+    print(f"{len(items)} fixture tweets, {invalid_rate:.0%} of completions break the output rules, "
+          f"{rtt * 1000:.0f}ms per round trip")
+    print("  k  accepted  round trips/reply  p95  output tokens/reply  est. latency/reply")
+    with tempfile.TemporaryDirectory() as tmp:
+        for k in ks:
+            mock = MockChatClient(seed=seed, invalid_rate=invalid_rate)
+            twitter_bot = bot.IntelligentTwitterBot(llm_client=mock, state_path=os.path.join(tmp, f"state{k}.db"),
+                                                    mentions_path=os.path.join(tmp, f"mentions{k}.json"),
+                                                    rng=random.Random(seed))
+            round_trips, accepted = [], 0
+            for i in range(replies):
+                item = items[i % len(items)]
+                before = mock.calls
+                content = twitter_bot.generate_content(prompts.reply_prompt(item["username"], item["text"], "roasting"),
+                                                       "reply", candidates=k)
+                round_trips.append(mock.calls - before)
+                accepted += content is not None
+            output_tokens = sum(site["output_tokens"] for site in twitter_bot.token_ledger.metrics().values())
+            twitter_bot.state.close()
+            round_trips.sort()
+            per_reply = sum(round_trips) / max(accepted, 1)
+            print(f"{k:>3}  {accepted:>8}  {per_reply:>17.2f}  {percentile(round_trips, 0.95):>3}  "
+                  f"{output_tokens / max(accepted, 1):>19.0f}  {per_reply * rtt * 1000:>15.0f}ms")
+    timing.TIMINGS.sleep_enabled = True
+
+
+def bench_streaming(replies, invalid_rate, ttft, token_latency, seed):
+    """Wall time per accepted reply with and without streaming early abort, against a paced mock stream."""
+    import bot
+    from offline import MockChatClient, load_fixture_items
+    import prompts
+    import timing
+
+    items = load_fixture_items()
+    timing.TIMINGS.sleep_enabled = False
+    logging.getLogger().setLevel(logging.ERROR)
+    print(f"{replies} replies, {invalid_rate:.0%} of completions break a rule mid-text, "
+          f"first token {ttft * 1000:.0f}ms, {token_latency * 1000:.0f}ms per chunk")
+    print("  mode              k  s/reply  chunks/reply  cut off  ttft p50  verdict p50")
+    with tempfile.TemporaryDirectory() as tmp:
+        for stream, k in ((False, 1), (True, 1), (False, 3), (True, 3)):
+            mock = MockChatClient(seed=seed, latency=ttft, token_latency=token_latency, invalid_rate=invalid_rate)
+            twitter_bot = bot.IntelligentTwitterBot(llm_client=mock, state_path=os.path.join(tmp, f"s{stream}{k}.db"),
+                                                    mentions_path=os.path.join(tmp, f"m{stream}{k}.json"),
+                                                    rng=random.Random(seed))
+            accepted = 0
+            start = time.perf_counter()
+            for i in range(replies):
+                item = items[i % len(items)]
+                prompt = prompts.reply_prompt(item["username"], item["text"], "roasting")
+                accepted += twitter_bot.generate_from_candidates(prompt, "reply", k, stream=stream) is not None
+            elapsed = time.perf_counter() - start
+            streams = twitter_bot.llm.metrics()["streams"]
+            aborted = sum(site["aborted"] for site in streams.values())
+            reply_stream = streams.get("reply", {})
+            twitter_bot.state.close()
+            label = "streaming" if stream else "full completion"
+            ttft_text = f"{reply_stream['ttft_p50'] * 1000:>6.0f}ms" if stream else f"{'-':>8}"
+            verdict_text = f"{reply_stream['verdict_p50'] * 1000:>9.0f}ms" if stream else f"{'-':>11}"
+            chunks_text = f"{mock.streamed_tokens / max(accepted, 1):>12.1f}" if stream else f"{'-':>12}"
+            print(f"  {label:<16} {k:>2}  {elapsed / max(accepted, 1):>7.2f}  {chunks_text}  "
+                  f"{aborted:>7}  {ttft_text}  {verdict_text}")
+    timing.TIMINGS.sleep_enabled = True
+
+
+def bench_batching(sizes, replies, invalid_rate, ttft, token_latency, seed):
+    """Tokens, round trips and wall time per reply when an intake batch's replies share one request."""
+    import bot
+    from offline import MockChatClient, load_fixture_items
+    import timing
+
+    items = load_fixture_items()
+    styles = [style for style, _ in keywords.active().engagement_styles]
+    timing.TIMINGS.sleep_enabled = False
+    logging.getLogger().setLevel(logging.ERROR)
+    print(f"{replies} replies, {invalid_rate:.0%} of generated texts break a rule, first token {ttft * 1000:.0f}ms, "
+          f"{token_latency * 1000:.0f}ms per output token; batch size 1 is the per-tweet path")
+    print(" batch  accepted  calls/reply  in tok/reply  out tok/reply  s/reply")
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in sizes:
+            mock = MockChatClient(seed=seed, latency=ttft, token_latency=token_latency, invalid_rate=invalid_rate)
+            twitter_bot = bot.IntelligentTwitterBot(llm_client=mock, state_path=os.path.join(tmp, f"b{size}.db"),
+                                                    mentions_path=os.path.join(tmp, f"b{size}.json"),
+                                                    rng=random.Random(seed))
+            batch = [(f"t{i}", items[i % len(items)]["username"], items[i % len(items)]["text"],
+                      styles[i % len(styles)]) for i in range(replies)]
+            accepted = 0
+            start = time.perf_counter()
+            for first in range(0, replies, size):
+                chunk = batch[first:first + size]
+                if size == 1:
+                    results = {tweet_id: twitter_bot.prepare_reply(text, username, style)
+                               for tweet_id, username, text, style in chunk}
+                else:
+                    results = twitter_bot.prepare_replies(chunk)
+                accepted += sum(reply is not None for reply in results.values())
+            elapsed = time.perf_counter() - start
+            routes = twitter_bot.llm.metrics()["routes"].values()
+            input_tokens = sum(route["input_tokens"] for route in routes)
+            output_tokens = sum(route["output_tokens"] for route in routes)
+            twitter_bot.state.close()
+            per = max(accepted, 1)
+            print(f"{size:>6}  {accepted:>8}  {mock.calls / per:>11.2f}  {input_tokens / per:>12.0f}  "
+                  f"{output_tokens / per:>13.0f}  {elapsed / per:>7.2f}")
+    timing.TIMINGS.sleep_enabled = True
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Offline benchmarks for the bot's hot paths")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    classify = subparsers.add_parser("classify", help="batch vs per-tweet personality classification")
+    classify.add_argument("--sizes", type=int, nargs="+", default=[1000, 100000, 1000000])
+    classify.add_argument("--seed", type=int, default=42)
+    classify.add_argument("--scalar-limit", type=int, default=100000,
+                          help="skip the slow per-tweet loop above this many tweets")
+
+    state = subparsers.add_parser("state", help="SQLite state store startup and lookup latency")
+    state.add_argument("--rows", type=int, default=1000000)
+    state.add_argument("--lookups", type=int, default=10000)
+    state.add_argument("--seed", type=int, default=42)
+
+    logging_parser = subparsers.add_parser("logging", help="per-tweet logging overhead, sync vs queued")
+    logging_parser.add_argument("--tweets", type=int, default=20000)
+    logging_parser.add_argument("--seed", type=int, default=42)
+
+    candidates = subparsers.add_parser("candidates", help="k-candidate generation: round trips per accepted reply")
+    candidates.add_argument("--ks", type=int, nargs="+", default=[1, 3, 5])
+    candidates.add_argument("--replies", type=int, default=300)
+    candidates.add_argument("--invalid-rate", type=float, default=0.4)
+    candidates.add_argument("--rtt", type=float, default=0.8, help="seconds per chat completion round trip")
+    candidates.add_argument("--seed", type=int, default=42)
+
+    streaming = subparsers.add_parser("streaming", help="streamed generation with early abort vs full completions")
+    streaming.add_argument("--replies", type=int, default=30)
+    streaming.add_argument("--invalid-rate", type=float, default=0.4)
+    streaming.add_argument("--ttft", type=float, default=0.3, help="mock seconds to first token")
+    streaming.add_argument("--token-latency", type=float, default=0.03, help="mock seconds between chunks")
+    streaming.add_argument("--seed", type=int, default=42)
+
+    batching = subparsers.add_parser("batching", help="one generation request per intake batch vs per tweet")
+    batching.add_argument("--sizes", type=int, nargs="+", default=[1, 2, 3, 4, 5, 6, 7, 8])
+    batching.add_argument("--replies", type=int, default=24)
+    batching.add_argument("--invalid-rate", type=float, default=0.2)
+    batching.add_argument("--ttft", type=float, default=0.3, help="mock seconds to first token")
+    batching.add_argument("--token-latency", type=float, default=0.01, help="mock seconds per output token")
+    batching.add_argument("--seed", type=int, default=42)
+
+    micro = subparsers.add_parser("micro", help="ops/sec and allocations of the per-tweet decision and validation code")
+    micro.add_argument("--corpus", choices=["synthetic", "recorded"], default="synthetic")
+    micro.add_argument("--size", type=int, default=2000)
+    micro.add_argument("--repeats", type=int, default=5)
+    micro.add_argument("--seed", type=int, default=42)
+    micro.add_argument("--output", help="write the results as JSON")
+    micro.add_argument("--compare", help="JSON from an earlier run; exits 1 when a function got slower")
+    micro.add_argument("--threshold", type=float, default=0.15, help="slowdown that counts as a regression")
+
+    args = parser.parse_args(argv)
+    if args.command == "classify":
+        bench_classify(args.sizes, args.seed, args.scalar_limit)
+    elif args.command == "state":
+        bench_state(args.rows, args.lookups, args.seed)
+    elif args.command == "logging":
+        bench_logging(args.tweets, args.seed)
+    elif args.command == "candidates":
+        bench_candidates(args.ks, args.replies, args.invalid_rate, args.rtt, args.seed)
+    elif args.command == "streaming":
+        bench_streaming(args.replies, args.invalid_rate, args.ttft, args.token_latency, args.seed)
+    elif args.command == "batching":
+        bench_batching(args.sizes, args.replies, args.invalid_rate, args.ttft, args.token_latency, args.seed)
+    elif args.command == "micro":
+        return bench_micro(args.corpus, args.size, args.repeats, args.seed, args.output, args.compare, args.threshold)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
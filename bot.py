@@ -8,6 +8,9 @@ import time
 import random
 import logging
 import re
+import shutil
+import argparse
+import tempfile
 from datetime import datetime, timedelta
 from dotenv import load_dotenv
 from selenium import webdriver
@@ -17,47 +20,240 @@ from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
-from selenium.common.exceptions import TimeoutException, NoSuchElementException
+from selenium.common.exceptions import TimeoutException, NoSuchElementException, StaleElementReferenceException
 from webdriver_manager.chrome import ChromeDriverManager
 from bs4 import BeautifulSoup
 import json
+import numpy as np
 from openai import OpenAI
 from personality import *  # Import all personality functions
-
-# Configure logging for console output
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler("baggy_moonz.log"),
-        logging.StreamHandler()  # This ensures everything goes to console
-    ]
-)
-logger = logging.getLogger("BaggyMoonz")
+from pipeline import EngagementPipeline, TweetRecord, ActionRequest
+from scheduler import TaskScheduler, ScheduledTask
+from mentions import MentionTracker, status_id_timestamp
+from relevance import RelevanceScorer, DEFAULT_CORPUS
+from features import TextFeatures, TextFeatureCache, text_features
+import prompts
+import keywords
+from prompts import TokenLedger
+from llm import LLMClient, LLMUnavailable, BadOutput, Route
+from state import StateStore, copy_database, text_fingerprint
+from offline import ActionRecorder
+from followers import FollowerCrawler
+from conversations import ConversationFetcher, THREAD_MARKER_SCRIPT, has_thread_marker
+from browser import BrowserWatchdog, CommandCounter, capture_session, restore_session
+from control import BotControl, ControlServer
+from logs import setup_logging, stop_logging, log_event
+import timing
+from timing import timed
 
 # Load environment variables
 load_dotenv()
 
+# Configure logging - console + rotating human log + JSONL events, written off the driver thread
+setup_logging(
+    log_file=os.getenv("LOG_FILE", "baggy_moonz.log"),
+    events_file=os.getenv("EVENTS_FILE", "baggy_moonz.events.jsonl"),
+    max_bytes=int(os.getenv("LOG_MAX_BYTES", str(10 * 1024 * 1024))),
+    skip_thread_info=os.getenv("LOG_SKIP_THREAD_INFO", "0") == "1"  # Process-wide: no thread/process names on any record
+)
+logger = logging.getLogger("BaggyMoonz")
+
 # Bot configuration
 TWITTER_USERNAME = os.getenv("TWITTER_USERNAME")
 TWITTER_PASSWORD = os.getenv("TWITTER_PASSWORD")
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+PIPELINE_WORKERS = int(os.getenv("PIPELINE_WORKERS", "2"))  # LLM worker threads for timeline engagement
+MENTIONS_STATE_FILE = os.getenv("MENTIONS_STATE_FILE", "mentions_state.json")
+MENTION_MAX_ATTEMPTS = int(os.getenv("MENTION_MAX_ATTEMPTS", "3"))  # Checks a failing mention is retried before it's skipped
+RELEVANCE_CORPUS = os.getenv("RELEVANCE_CORPUS", DEFAULT_CORPUS)  # Tweets used to learn n-gram IDF weights
+LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", "20"))  # Seconds per OpenAI request before it counts as a timeout
+STATE_DB = os.getenv("STATE_DB", "bot_state.db")  # SQLite file for engagement history, timestamps and followers
+FOLLOWERS_REFRESH_HOURS = 24  # Incremental follower crawl when the last crawl is older than this
+FOLLOWERS_FULL_CRAWL_DAYS = 7  # Scroll the whole follower list (to catch unfollows) at most this often
+ENGAGEMENT_RETENTION_DAYS = 30  # Engagements older than this are compacted away (and may be engaged again)
+GENERATION_CANDIDATES = int(os.getenv("GENERATION_CANDIDATES", "3"))  # Completions sampled per generation request
+STREAM_GENERATION = os.getenv("STREAM_GENERATION", "1") == "1"  # Stream generations and cut off rule-breaking ones
+BATCH_REPLIES = os.getenv("BATCH_REPLIES", "1") == "1"  # One generation request for all replies in an intake batch
+REPLY_BATCH_SIZE = int(os.getenv("REPLY_BATCH_SIZE", "8"))  # Most replies asked for in one batched request
+BATCH_REPLY_TOKENS = 70  # Completion budget per reply in a batched request (reply + JSON wrapping)
+BROWSER_MAX_RSS_MB = int(os.getenv("BROWSER_MAX_RSS_MB", "1500"))  # chromedriver + Chrome processes
+BROWSER_MAX_HEAP_MB = int(os.getenv("BROWSER_MAX_HEAP_MB", "400"))  # Renderer JS heap in use
+BROWSER_MAX_AGE_HOURS = float(os.getenv("BROWSER_MAX_AGE_HOURS", "6"))  # Recycle the browser at least this often
+LOCAL_LLM_URL = os.getenv("LOCAL_LLM_URL")  # OpenAI-compatible server (llama.cpp, vLLM, Ollama...) registered as backend "local"
+LOCAL_LLM_MODEL = os.getenv("LOCAL_LLM_MODEL", "local")  # Model name the local server expects
+GENERATION_BACKEND = os.getenv("GENERATION_BACKEND", "openai")  # Backend for replies and original tweets
+GENERATION_MODEL = os.getenv("GENERATION_MODEL", "gpt-3.5-turbo")
+GENERATION_LATENCY_TARGET = float(os.getenv("GENERATION_LATENCY_TARGET", "8"))  # Seconds per generation call
+CLASSIFIER_BACKEND = os.getenv("CLASSIFIER_BACKEND", GENERATION_BACKEND)  # Backend for proofread/relevance/mood checks
+CLASSIFIER_MODEL = os.getenv("CLASSIFIER_MODEL", GENERATION_MODEL)  # A small model is enough for YES/NO and 1-10 answers
+CLASSIFIER_LATENCY_TARGET = float(os.getenv("CLASSIFIER_LATENCY_TARGET", "2"))  # Seconds per classification call
+RANDOM_SEED = os.getenv("RANDOM_SEED")  # Seed every decision draw so replays repeat exactly; unset = unseeded
+LLM_ROUTES = os.getenv("LLM_ROUTES")  # JSON overrides: {"call site": {"backend": ..., "model": ..., "latency_target": ...}}
+KEYWORDS_FILE = os.getenv("KEYWORDS_FILE", keywords.DEFAULT_KEYWORDS_FILE)  # Topics and keyword lists, reloaded on change
+KEYWORDS_CHECK_INTERVAL = float(os.getenv("KEYWORDS_CHECK_INTERVAL", "5"))  # Seconds between keyword file mtime checks
+CONTROL_ADDRESS = os.getenv("CONTROL_ADDRESS")  # "127.0.0.1:8787" or "unix:/path.sock" serves /metrics, /status, pause/resume/drain
+
+# Initialize OpenAI client - retries are handled by LLMClient (backoff + circuit breaker)
+client = OpenAI(api_key=OPENAI_API_KEY, max_retries=0) if OPENAI_API_KEY else None
+local_client = OpenAI(base_url=LOCAL_LLM_URL, api_key="local", max_retries=0) if LOCAL_LLM_URL else None
+
+
+def llm_routes():
+    """Backend, model and latency target per LLM call site (unlisted sites use "default")."""
+    generation = Route(GENERATION_BACKEND, GENERATION_MODEL, latency_target=GENERATION_LATENCY_TARGET)
+    classifier = Route(CLASSIFIER_BACKEND, CLASSIFIER_MODEL, latency_target=CLASSIFIER_LATENCY_TARGET)
+    routes = {"default": generation, "proofread": classifier, "relevance": classifier, "mood": classifier}
+    if LLM_ROUTES:
+        for call_site, options in json.loads(LLM_ROUTES).items():
+            base = routes.get(call_site, generation)
+            routes[call_site] = Route(options.get("backend", base.backend), options.get("model", base.model),
+                                      latency_target=options.get("latency_target", base.latency_target),
+                                      timeout=options.get("timeout"))
+    return routes
+
+
+# Output rules checked locally - also on partial streamed text, so a broken completion can be cut off early
+EMOJI_PATTERN = re.compile(r'[\U0001F600-\U0001F64F]|[\U0001F300-\U0001F5FF]|[\U0001F680-\U0001F6FF]|[\U0001F1E0-\U0001F1FF]|[\U00002600-\U000027BF]|[\U0001F900-\U0001F9FF]|[\U000024C2-\U0001F251]|[\U0001F004]|[\U0001F0CF]|[\U0001F170-\U0001F171]|[\U0001F17E-\U0001F17F]|[\U0001F18E]|[\U0001F191-\U0001F19A]|[\U0001F1E6-\U0001F1FF]')
+TEXT_EMOJIS = ['🤔', '😀', '😃', '😄', '😁', '😆', '😅', '🤣', '😂', '🙂', '🙃', '😉', '😊', '😇', '🥰', '😍', '🤩', '😘', '😗', '😚', '😙', '😋', '😛', '😜', '🤪', '😝', '🤑', '🤗', '🤭', '🤫', '🤨', '😐', '😑', '😶', '😏', '😒', '🙄', '😬', '🤥', '😌', '😔', '😪', '🤤', '😴', '😷', '🤒', '🤕', '🤢', '🤮', '🤧', '🥵', '🥶', '🥴', '😵', '🤯', '🤠', '🥳', '😎', '🤓', '🧐', '😕', '😟', '🙁', '😮', '😯', '😲', '😳', '🥺', '😦', '😧', '😨', '😰', '😥', '😢', '😭', '😱', '😖', '😣', '😞', '😓', '😩', '😫', '🥱', '😤', '😡', '😠', '🤬', '😈', '👿', '💀', '☠️', '💩', '🤡', '👹', '👺', '👻', '👽', '👾', '🤖', '😺', '😸', '😹', '😻', '😼', '😽', '🙀', '😿', '😾', '🚀', '💎', '🙌', '💰', '💸', '🔥', '💯', '⚡', '🎯', '📈', '🌕', '🌙']
+DANGEROUS_WORDS = ['kys', 'kill yourself', 'suicide', 'terrorist', 'bomb', 'murder']
+MAX_CONTENT_CHARS = 200
+
+def content_violation(content, partial=False):
+    """The output rule the text breaks, or None. partial=True skips checks that need the whole text."""
+    # Check for hashtags
+    if '#' in content:
+        return "Content contains hashtags"
+    # Check for emojis - no emojis allowed (comprehensive pattern plus common text emojis)
+    if EMOJI_PATTERN.search(content) or any(emoji in content for emoji in TEXT_EMOJIS):
+        return "Content contains emojis"
+    # Length check - allow complete sentences
+    if len(content) > MAX_CONTENT_CHARS:
+        return "Content too long"
+    # Only block truly dangerous content
+    lowered = content.lower()
+    if any(word in lowered for word in DANGEROUS_WORDS):
+        return "Content crosses the line"
+    # Check if it's too short or meaningless
+    if not partial and len(content) < 10:
+        return "Content too short"
+    return None
 
-# Initialize OpenAI client
-client = OpenAI(api_key=OPENAI_API_KEY)
+def candidate_score(text):
+    """Cheap local ranking of generated candidates: finished sentences, tweet-sized, not repetitive."""
+    words = text.lower().split()
+    score = 1.0 if text.rstrip()[-1:] in ".!?" else 0.0
+    score -= abs(len(text) - 100) / 100  # Punchy but not clipped
+    if words:
+        score += len(set(words)) / len(words)
+    return score
+
+def parse_yes_no(text):
+    """YES/NO classifier answers - anything else is bad output worth a retry."""
+    answer = text.strip().upper()
+    if "YES" in answer:
+        return "YES"
+    if "NO" in answer:
+        return "NO"
+    raise BadOutput(f"expected YES or NO, got {text!r}")
+
+def dry_run_paths(state_path, mentions_path):
+    """Scratch copies of the state database and mentions file, so a dry run starts from the live
+    history but its engagements, timestamps and watermark never reach the real files."""
+    workdir = tempfile.mkdtemp(prefix="baggy_dry_run_")
+    scratch_state = os.path.join(workdir, os.path.basename(state_path))
+    scratch_mentions = os.path.join(workdir, os.path.basename(mentions_path))
+    if os.path.exists(state_path):
+        copy_database(state_path, scratch_state)
+    if os.path.exists(mentions_path):
+        shutil.copyfile(mentions_path, scratch_mentions)
+    logger.info(f"🧪 Dry run: working on copies of the state in {workdir}, the live files stay untouched")
+    return scratch_state, scratch_mentions
 
 class IntelligentTwitterBot:
-    def __init__(self):
+    def __init__(self, llm_client=None, state_path=STATE_DB, mentions_path=MENTIONS_STATE_FILE, dry_run=False,
+                 rng=None):
+        # One random source for every decision draw, sleep and jitter (the global `random` module unless seeded)
+        if rng is None and RANDOM_SEED:
+            rng = random.Random(int(RANDOM_SEED))
+        self.rng = rng or random
+        self._record_seed = None if self.rng is random else self.rng.getrandbits(64)
+        self.keywords = keywords.configure(KEYWORDS_FILE, KEYWORDS_CHECK_INTERVAL)  # Watched for live edits
         self.driver = None
         self.wait = None
         self.logged_in = False
-        self.last_tweet_time = None
-        self.last_bio_update = None
-        self.engagement_history = []
-        self.blacklisted_users = set()
-        self.followers = []
-        self.engaged_tweets = set()  # Track tweets we've already engaged with
+        # Engagement history, timestamps, followers and blacklist survive restarts
+        if dry_run and (state_path, mentions_path) == (STATE_DB, MENTIONS_STATE_FILE):
+            state_path, mentions_path = dry_run_paths(state_path, mentions_path)
+        self.state = StateStore(state_path)
+        # Workers prepare decisions and replies while this thread keeps driving the browser
+        self.pipeline = EngagementPipeline(self.prepare_engagement, workers=PIPELINE_WORKERS,
+                                           prepare_batch_fn=self.prepare_engagement_batch if BATCH_REPLIES else None)
+        self.scheduler = self.build_scheduler()
+        self.mention_tracker = MentionTracker(mentions_path)  # Persisted mentions watermark
+        self.relevance_scorer = RelevanceScorer.from_corpus_file(RELEVANCE_CORPUS)
+        self.text_features = TextFeatureCache()  # Per-tweet lowercase/tokens/keyword hits, computed once
+        self.token_ledger = TokenLedger()  # Offline input-token accounting per LLM call site
+        # Each call site goes to its own backend/model; llm_client (e.g. offline.MockChatClient) stands in for all of them
+        routes = llm_routes()
+        backends = {"openai": client, "local": local_client}
+        if llm_client is not None:
+            backends = {route.backend: llm_client for route in routes.values()}
+        self.llm = LLMClient(backends={name: backend for name, backend in backends.items() if backend is not None},
+                             routes=routes, timeout=LLM_TIMEOUT, ledger=self.token_ledger)
+        # Timeline DOM and JS heap grow over a long session - recycle the browser past these limits
+        self.watchdog = BrowserWatchdog(max_rss_mb=BROWSER_MAX_RSS_MB, max_heap_mb=BROWSER_MAX_HEAP_MB,
+                                        max_age_hours=BROWSER_MAX_AGE_HOURS)
+        # Thread context is fetched in a background tab and shared by mentions in the same conversation
+        self.conversations = ConversationFetcher()
+        # Dry run: everything up to the click runs, but actions are recorded instead of performed
+        self.dry_run = dry_run
+        self.recorder = ActionRecorder() if dry_run else None
+        # Counters for the control endpoint, plus the pause/resume/drain requests it passes to the main loop
+        self.started_at = time.time()
+        self.tweets_evaluated = 0
+        self.action_counts = {}  # (action, ok) -> count
+        self.commands = CommandCounter()  # WebDriver commands by name
+        self.control = BotControl()
+        self.control_server = None
         
+    @property
+    def last_tweet_time(self):
+        return self.state.get_time("last_tweet")
+    
+    @last_tweet_time.setter
+    def last_tweet_time(self, value):
+        self.state.set_time("last_tweet", value)
+    
+    @property
+    def last_bio_update(self):
+        return self.state.get_time("last_bio_update")
+    
+    @last_bio_update.setter
+    def last_bio_update(self, value):
+        self.state.set_time("last_bio_update", value)
+    
+    @property
+    def followers(self):
+        return self.state.followers
+    
+    @followers.setter
+    def followers(self, usernames):
+        self.state.set_followers(usernames)
+    
+    @property
+    def blacklisted_users(self):
+        return self.state.blacklist
+    
+    @property
+    def engagement_history(self):
+        """Most recent engagements as (tweet_id, author, action, engaged_at) rows."""
+        return self.state.recent_engagements()
+    
+    def navigate(self, url):
+        """driver.get, timed as its own phase."""
+        with timing.span("navigate"):
+            self.driver.get(url)
+    
     def setup_driver(self):
         """Set up Chrome driver with options."""
         chrome_options = Options()
@@ -74,15 +270,57 @@ class IntelligentTwitterBot:
             logger.info("Trying to use system ChromeDriver...")
             self.driver = webdriver.Chrome(options=chrome_options)
         
+        self.commands.attach(self.driver)
         self.wait = WebDriverWait(self.driver, 10)
+        self.watchdog.reset()
         logger.info("✅ Chrome driver setup complete")
     
+    @timed("recycle")
+    def recycle_driver(self, reason):
+        """Restart Chrome, carrying the session cookies over so no re-login is needed."""
+        logger.info(f"♻️ Recycling browser: {reason}")
+        session = None
+        try:
+            session = capture_session(self.driver)
+        except Exception as e:
+            logger.warning(f"⚠️ Could not capture session before recycling: {e}")
+        try:
+            self.driver.quit()
+        except Exception as e:
+            logger.warning(f"⚠️ Error closing old browser: {e}")
+        
+        self.setup_driver()
+        self.watchdog.recycles += 1
+        if session:
+            restored = restore_session(self.driver, session)
+            logger.info(f"🍪 Restored {restored} cookies")
+        
+        # Confirm the carried-over session is still logged in, else log in again
+        try:
+            self.navigate("https://twitter.com/home")
+            self.wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, '[data-testid="AppTabBar_Home_Link"]')))
+            self.logged_in = True
+        except TimeoutException:
+            logger.warning("⚠️ Session not restored after recycling, logging in again")
+            self.login_to_twitter()
+        log_event("browser_recycled", reason=reason, restored_session=bool(session), logged_in=self.logged_in)
+    
+    def check_browser(self):
+        """Scheduled task: sample browser memory and recycle the driver when it's over a limit."""
+        if not self.driver:
+            return
+        sample = self.watchdog.sample(self.driver)
+        reason = self.watchdog.recycle_reason(sample)
+        if reason:
+            self.recycle_driver(reason)
+    
+    @timed("login")
     def login_to_twitter(self):
         """Log in to Twitter using credentials."""
         try:
             logger.info("🔐 Logging into Twitter...")
-            self.driver.get("https://twitter.com/i/flow/login")
-            time.sleep(3)
+            self.navigate("https://twitter.com/i/flow/login")
+            timing.sleep(3)
             
             # Enter username
             username_input = self.wait.until(
@@ -93,7 +331,7 @@ class IntelligentTwitterBot:
             # Click Next
             next_button = self.driver.find_element(By.XPATH, '//span[text()="Next"]/..')
             next_button.click()
-            time.sleep(2)
+            timing.sleep(2)
             
             # Enter password
             password_input = self.wait.until(
@@ -114,29 +352,23 @@ class IntelligentTwitterBot:
             logger.error(f"❌ Error logging in to Twitter: {e}")
             self.logged_in = False
     
-    def generate_content(self, prompt, content_type="tweet"):
+    @timed("generate")
+    def generate_content(self, prompt, content_type="tweet", candidates=None):
         """Generate content using OpenAI with personality."""
+        candidates = candidates or GENERATION_CANDIDATES
+        if candidates > 1 or STREAM_GENERATION:
+            return self.generate_from_candidates(prompt, content_type, candidates)
         try:
             logger.info(f"🧠 Generating {content_type}...")
             
-            # Use personality system prompt
-            system_prompt = get_system_prompt()
-            
-            # Add extremely strict instructions for clean content
-            enhanced_prompt = f"{prompt}\n\nCRITICAL RULES - NEVER BREAK THESE:\n1. NO emojis of any kind (no 🚀💎😀🤔💻🔥💯)\n2. NO hashtags ever (no #, no #rekt, no #ngmi)\n3. NO symbols except basic punctuation and crypto tickers (.,!? and $BTC etc are OK)\n4. Under 150 characters total\n5. Crypto tickers like $BTC $ETH are allowed and encouraged\n6. Be savage but avoid emoji/hashtag symbols\n7. Don't include any usernames or @mentions in the reply content itself\n8. MOST IMPORTANT: Your reply MUST directly respond to their content - don't generate random roasts, respond to what they actually said\n9. NEVER mention other usernames that aren't the person you're replying to\n10. Stay focused on the specific tweet content you're responding to"
-            
-            response = client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": enhanced_prompt}
-                ],
+            # Shared rules live in the fixed system prefix - only the variable part goes in the user message
+            content = self.llm.complete(
+                content_type,
+                prompts.content_messages(prompt),
                 max_tokens=50,  # Increased to ensure complete sentences
                 temperature=0.5  # Lower for more focused content
             )
             
-            content = response.choices[0].message.content.strip()
-            
             # Ensure complete sentences
             content = self.ensure_complete_sentence(content)
             
@@ -151,17 +383,12 @@ class IntelligentTwitterBot:
                 attempt += 1
                 logger.warning(f"⚠️  Content failed validation (attempt {attempt}), regenerating...")
                 
-                response = client.chat.completions.create(
-                    model="gpt-3.5-turbo",
-                    messages=[
-                        {"role": "system", "content": system_prompt},
-                        {"role": "user", "content": f"{enhanced_prompt}\n\nPrevious attempt failed - make it shorter and cleaner but complete the sentence."}
-                    ],
+                content = self.llm.complete(
+                    f"{content_type} retry",
+                    prompts.content_messages(prompt, retry=True),
                     max_tokens=40,  # Increased to ensure complete sentences on retries
                     temperature=0.4
                 )
-                
-                content = response.choices[0].message.content.strip()
             
             if attempt >= max_attempts:
                 logger.error("❌ Failed to generate valid content after maximum attempts")
@@ -169,7 +396,58 @@ class IntelligentTwitterBot:
             
             logger.info(f"✅ Generated {content_type}: {content}")
             return content
+        
+        except LLMUnavailable as e:
+            logger.warning(f"⚠️ Skipping {content_type} generation - LLM unavailable ({e.kind})")
+            return None
+        except Exception as e:
+            logger.error(f"❌ Error generating content: {e}")
+            return None
+    
+    def generate_from_candidates(self, prompt, content_type, candidates, stream=None):
+        """Sample several completions per request, filter them locally and proofread only the best.
+        
+        When streaming, candidates are checked as their tokens arrive and the request is cut off
+        as soon as every one of them has broken a hard rule.
+        """
+        stream = STREAM_GENERATION if stream is None else stream
+        max_rounds = max(3, 8 // candidates)
+        try:
+            for round_number in range(1, max_rounds + 1):
+                logger.info(f"🧠 Generating {candidates} {content_type} candidates (round {round_number})...")
+                call_site = content_type if round_number == 1 else f"{content_type} retry"
+                messages = prompts.content_messages(prompt, retry=round_number > 1)
+                temperature = 0.8 if candidates > 1 else 0.5  # Enough spread that the candidates actually differ
+                if stream:
+                    outcome = self.llm.stream(call_site, messages, max_tokens=50, temperature=temperature,
+                                              check=lambda text: content_violation(text, partial=True), n=candidates)
+                    if outcome.aborted:
+                        logger.warning(f"✂️ Cut off {content_type} stream after {outcome.time_to_verdict * 1000:.0f}ms: "
+                                       f"{', '.join(sorted(set(outcome.verdicts)))}")
+                        continue
+                    texts = outcome.accepted
+                else:
+                    texts = self.llm.complete(call_site, messages, max_tokens=50, temperature=temperature, n=candidates)
+                    texts = [texts] if isinstance(texts, str) else texts
+                survivors = []
+                for text in dict.fromkeys(self.ensure_complete_sentence(text) for text in texts):
+                    if self.check_content_locally(text):
+                        survivors.append(text)
                 
+                # Proofread the best-looking survivor first - usually the only LLM check needed
+                for content in sorted(survivors, key=candidate_score, reverse=True)[:2]:
+                    if self.ai_proofread(content):
+                        logger.info(f"✅ Generated {content_type}: {content} "
+                                    f"({len(survivors)}/{len(texts)} candidates passed local checks)")
+                        return content
+                logger.warning(f"⚠️ No usable {content_type} among {len(texts)} candidates, sampling again...")
+            
+            logger.error("❌ Failed to generate valid content after maximum attempts")
+            return None
+        
+        except LLMUnavailable as e:
+            logger.warning(f"⚠️ Skipping {content_type} generation - LLM unavailable ({e.kind})")
+            return None
         except Exception as e:
             logger.error(f"❌ Error generating content: {e}")
             return None
@@ -193,59 +471,34 @@ class IntelligentTwitterBot:
         
         return content
     
+    @timed("validate")
     def validate_content(self, content):
         """Validate content before posting - keep it short and clean."""
-        logger.info(f"🔍 Validating content: {content}")
-        
-        # Check for hashtags
-        if '#' in content:
-            logger.warning("❌ Content contains hashtags")
-            return False
-            
-        # Check for emojis - no emojis allowed (comprehensive pattern)
-        import re
-        emoji_pattern = r'[\U0001F600-\U0001F64F]|[\U0001F300-\U0001F5FF]|[\U0001F680-\U0001F6FF]|[\U0001F1E0-\U0001F1FF]|[\U00002600-\U000027BF]|[\U0001F900-\U0001F9FF]|[\U000024C2-\U0001F251]|[\U0001F004]|[\U0001F0CF]|[\U0001F170-\U0001F171]|[\U0001F17E-\U0001F17F]|[\U0001F18E]|[\U0001F191-\U0001F19A]|[\U0001F1E6-\U0001F1FF]'
-        # Also check for common text emojis
-        text_emojis = ['🤔', '😀', '😃', '😄', '😁', '😆', '😅', '🤣', '😂', '🙂', '🙃', '😉', '😊', '😇', '🥰', '😍', '🤩', '😘', '😗', '😚', '😙', '😋', '😛', '😜', '🤪', '😝', '🤑', '🤗', '🤭', '🤫', '🤨', '😐', '😑', '😶', '😏', '😒', '🙄', '😬', '🤥', '😌', '😔', '😪', '🤤', '😴', '😷', '🤒', '🤕', '🤢', '🤮', '🤧', '🥵', '🥶', '🥴', '😵', '🤯', '🤠', '🥳', '😎', '🤓', '🧐', '😕', '😟', '🙁', '😮', '😯', '😲', '😳', '🥺', '😦', '😧', '😨', '😰', '😥', '😢', '😭', '😱', '😖', '😣', '😞', '😓', '😩', '😫', '🥱', '😤', '😡', '😠', '🤬', '😈', '👿', '💀', '☠️', '💩', '🤡', '👹', '👺', '👻', '👽', '👾', '🤖', '😺', '😸', '😹', '😻', '😼', '😽', '🙀', '😿', '😾', '🚀', '💎', '🙌', '💰', '💸', '🔥', '💯', '⚡', '🎯', '📈', '🌕', '🌙']
-        if re.search(emoji_pattern, content) or any(emoji in content for emoji in text_emojis):
-            logger.warning("❌ Content contains emojis")
-            return False
-        
-        # Length check - allow complete sentences
-        if len(content) > 200:
-            logger.warning("❌ Content too long")
-            return False
-        
-        # Only block truly dangerous content
-        dangerous_words = ['kys', 'kill yourself', 'suicide', 'terrorist', 'bomb', 'murder']
-        if any(word in content.lower() for word in dangerous_words):
-            logger.warning("❌ Content crosses the line")
-            return False
+        # More lenient proofreading
+        return self.check_content_locally(content) and self.ai_proofread(content)
+    
+    def check_content_locally(self, content):
+        """The LLM-free part of validate_content: hashtags, emojis, length, crossing the line."""
+        logger.info("🔍 Validating content: %s", content)
         
-        # Check if it's too short or meaningless
-        if len(content) < 10:
-            logger.warning("❌ Content too short")
+        reason = content_violation(content)
+        if reason:
+            logger.warning(f"❌ {reason}")
             return False
-        
-        # More lenient proofreading
-        return self.ai_proofread(content)
+        return True
     
     def ai_proofread(self, content):
         """Use AI to proofread and validate content quality."""
         try:
             logger.info("📝 AI proofreading content...")
             
-            response = client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[
-                    {"role": "system", "content": "Rate this Twitter reply from 1-10. Be very lenient with edgy/savage content as that's the personality. Only rate 1-2 for spam/gibberish. Rate 5+ for decent replies, 7+ for good ones. Respond with just a number."},
-                    {"role": "user", "content": f"Rate this reply: {content}"}
-                ],
+            rating = self.llm.complete(
+                "proofread",
+                prompts.classifier_messages(prompts.PROOFREAD_PROMPT, content=content),
                 max_tokens=5,
-                temperature=0.1
+                temperature=0.1,
+                parse=int
             )
-            
-            rating = int(response.choices[0].message.content.strip())
             logger.info(f"📊 Content rating: {rating}/10")
             
             if rating >= 4:  # Lower threshold - let savage personality shine
@@ -254,14 +507,20 @@ class IntelligentTwitterBot:
             else:
                 logger.warning("❌ Content failed AI proofreading")
                 return False
-                
+        
+        except LLMUnavailable as e:
+            # Local checks in validate_content already passed - that's all we can do without the LLM
+            logger.warning(f"⚠️ Skipping AI proofreading - LLM unavailable ({e.kind})")
+            return True
         except Exception as e:
             logger.error(f"❌ Error in AI proofreading: {e}")
             return True  # Default to allowing if proofreading fails
     
+    @timed("validate_relevance")
     def validate_reply_relevance(self, reply_content, original_tweet_text, expected_username):
-        """Validate that the generated reply is actually relevant to the tweet being replied to."""
+        """Validate that the generated reply is actually relevant to the tweet (text or TextFeatures) being replied to."""
         try:
+            original = text_features(original_tweet_text)
             logger.info(f"🔍 Validating reply relevance for @{expected_username}")
             
             # Check if reply mentions wrong usernames (common issue)
@@ -273,61 +532,33 @@ class IntelligentTwitterBot:
                 logger.warning(f"❌ Reply mentions wrong usernames: {wrong_usernames}")
                 return False
             
-            # Simplified relevance check - look for key overlap
-            # Extract key terms from both tweets (remove common words)
-            original_words = set(re.findall(r'\b\w+\b', original_tweet_text.lower()))
-            reply_words = set(re.findall(r'\b\w+\b', reply_content.lower()))
-            
-            # Remove common stop words
-            stop_words = {'the', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by', 'a', 'an', 'is', 'are', 'was', 'were', 'you', 'your', 'this', 'that', 'will', 'be', 'have', 'has', 'had', 'do', 'does', 'did', 'can', 'could', 'would', 'should', 'may', 'might', 'must', 'shall', 'going', 'get', 'got', 'like', 'more', 'much', 'many', 'most', 'some', 'any', 'all', 'if', 'then', 'so', 'just', 'only', 'also', 'even', 'still', 'now', 'here', 'there', 'when', 'where', 'why', 'how', 'what', 'who', 'which', 'about', 'after', 'before', 'during', 'while', 'until', 'since', 'from', 'into', 'through', 'over', 'under', 'up', 'down', 'out', 'off', 'between', 'among', 'i', 'me', 'my', 'mine', 'we', 'us', 'our', 'ours', 'he', 'him', 'his', 'she', 'her', 'hers', 'it', 'its', 'they', 'them', 'their', 'theirs'}
-            
-            original_words -= stop_words
-            reply_words -= stop_words
-            
-            # Check for word overlap (crypto tweets often share tickers, technical terms)
-            word_overlap = len(original_words & reply_words)
-            
-            # Check for crypto tickers specifically (high relevance indicator)
-            crypto_tickers = re.findall(r'\$[A-Z]{2,6}', original_tweet_text.upper())
-            ticker_overlap = any(ticker in reply_content.upper() for ticker in crypto_tickers)
-            
-            # More lenient validation - if there's good overlap or shared crypto context, it's likely relevant
-            if word_overlap >= 2 or ticker_overlap or len(original_words & reply_words) > 0:
-                logger.info(f"✅ WORD OVERLAP VALIDATION: Found {word_overlap} overlapping words, ticker overlap: {ticker_overlap}")
+            # Local TF-IDF relevance score - the LLM is only asked when the score is uncertain
+            verdict, score = self.relevance_scorer.classify(reply_content, original)
+            if verdict is True:
+                logger.info(f"✅ LOCAL RELEVANCE: score {score:.3f}")
                 return True
+            if verdict is False:
+                logger.warning(f"❌ LOCAL RELEVANCE: score {score:.3f} - reply looks unrelated")
+                return False
             
-            # For very short tweets, be more lenient
-            if len(original_tweet_text.split()) <= 10:
-                logger.info("✅ SHORT TWEET VALIDATION: Being lenient with short tweets")
-                return True
+            logger.info(f"🤔 LOCAL RELEVANCE uncertain (score {score:.3f}), asking AI tie-breaker")
             
-            # If basic checks fail, use AI but with more lenient instructions
-            validation_prompt = f"""
-            Original tweet: "{original_tweet_text}"
-            Reply: "{reply_content}"
-            
-            IMPORTANT: This reply should be considered relevant if it:
-            - References the same topic (crypto, trading, etc.)
-            - Responds to the sentiment or question
-            - Makes sense as a reaction to the original tweet
-            - Shares context even if it's sarcastic or critical
-            
-            BE LENIENT - most crypto replies that mention similar topics are relevant.
-            Answer YES if it makes sense as a response, NO only if it's completely unrelated.
-            """
-            
-            response = client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[
-                    {"role": "system", "content": "You are checking if a Twitter reply makes sense. Be LENIENT - if replies share context or respond to the topic, answer YES. Only say NO if completely unrelated."},
-                    {"role": "user", "content": validation_prompt}
-                ],
-                max_tokens=10,
-                temperature=0.1
-            )
+            # Uncertain scores fall back to AI with lenient instructions
+            try:
+                relevance_check = self.llm.complete(
+                    "relevance",
+                    prompts.relevance_messages(reply_content, original.text),
+                    max_tokens=10,
+                    temperature=0.1,
+                    parse=parse_yes_no
+                )
+            except LLMUnavailable as e:
+                # No tie-breaker available - split the uncertain band down the middle
+                midpoint = (self.relevance_scorer.accept_threshold + self.relevance_scorer.reject_threshold) / 2
+                logger.warning(f"⚠️ LLM unavailable ({e.kind}), deciding relevance locally at {midpoint:.3f}")
+                return score >= midpoint
             
-            relevance_check = response.choices[0].message.content.strip().upper()
-            is_relevant = "YES" in relevance_check
+            is_relevant = relevance_check == "YES"
             
             logger.info(f"🤖 LENIENT AI relevance check: {relevance_check} - {'✅ PASS' if is_relevant else '❌ FAIL'}")
             
@@ -407,50 +638,50 @@ class IntelligentTwitterBot:
             return None
                 
         except Exception as e:
-            logger.error(f"❌ Error extracting tweet author: {e}")
+            logger.error("❌ Error extracting tweet author: %s", e)
             return None
 
-    def should_engage(self, tweet_text, username):
-        """Decide whether to engage using personality system."""
-        logger.info(f"🤔 Deciding whether to engage with @{username}")
+    def should_engage(self, tweet_text, username, decision=None):
+        """Decide whether to engage using personality system (decision: precomputed batch result)."""
+        logger.info("🤔 Deciding whether to engage with @%s", username)
+        tweet = text_features(tweet_text)
         
         # Check blacklist
-        if username in self.blacklisted_users:
-            logger.info(f"❌ User @{username} is blacklisted")
+        if self.state.is_blacklisted(username):
+            logger.info("❌ User @%s is blacklisted", username)
             return False
         
         # Use personality-based engagement
-        should_engage = should_engage_with_content(tweet_text)
+        should_engage = decision if decision is not None else should_engage_with_content(tweet, rng=self.rng)
         
         if should_engage:
-            logger.info(f"🎯 ENGAGING - Tweet matches interests: {tweet_text[:50]}...")
+            logger.info("🎯 ENGAGING - Tweet matches interests: %s...", tweet.text[:50])
         else:
-            logger.info(f"🤷 NOT ENGAGING - Not interested in: {tweet_text[:50]}...")
+            logger.info("🤷 NOT ENGAGING - Not interested in: %s...", tweet.text[:50])
         
         return should_engage
     
     def should_tweet_now(self):
         """Decide if it's a good time to tweet - pure AI mood."""
         try:
-            response = client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[
-                    {"role": "system", "content": "You are a chill person who likes tech and internet culture. Decide if you feel like tweeting something interesting. Answer YES or NO."},
-                    {"role": "user", "content": "Do you feel like tweeting something right now? What's your mood?"}
-                ],
+            decision = self.llm.complete(
+                "mood",
+                prompts.classifier_messages(prompts.MOOD_PROMPT),
                 max_tokens=30,
                 temperature=0.8
             )
-            
-            decision = response.choices[0].message.content.strip()
             should_tweet = "YES" in decision.upper() or "SURE" in decision.upper() or "YEAH" in decision.upper()
             
             logger.info(f"🎲 AI mood check: {decision}")
             return should_tweet
-            
+        
+        except LLMUnavailable as e:
+            # Writing the tweet needs the LLM too - don't start what can't be finished
+            logger.warning(f"⚠️ Skipping tweet slot - LLM unavailable ({e.kind})")
+            return False
         except Exception as e:
             logger.error(f"❌ Error checking tweet mood: {e}")
-            return random.random() < 0.3  # 30% fallback chance
+            return self.rng.random() < 0.3  # 30% fallback chance
     
     def should_update_bio(self):
         """Decide if it's time to update bio."""
@@ -459,21 +690,25 @@ class IntelligentTwitterBot:
         
         time_since_update = datetime.now() - self.last_bio_update
         if time_since_update > timedelta(hours=6):  # Update bio every 6+ hours
-            return random.random() < 0.3  # 30% chance
+            return self.rng.random() < 0.3  # 30% chance
         
         return False
     
+    @timed("bio_update")
     def update_bio(self):
         """Update Twitter bio with new personality using improved navigation."""
         try:
             logger.info("📝 Updating bio...")
-            new_bio = get_bio_update()
+            new_bio = get_bio_update(rng=self.rng)
             logger.info(f"🎯 New bio content: {new_bio}")
+            if self.dry_run:
+                self.last_bio_update = datetime.now()
+                return self.recorder.record("bio", content=new_bio)
             
             # Method 1: Try the direct profile edit URL
             logger.info("🔗 Trying direct profile settings URL...")
-            self.driver.get("https://twitter.com/settings/profile")
-            time.sleep(5)
+            self.navigate("https://twitter.com/settings/profile")
+            timing.sleep(5)
             
             # Look for bio textarea with improved selectors
             bio_textarea = None
@@ -504,8 +739,8 @@ class IntelligentTwitterBot:
             # Method 2: Try going through profile page first
             if not bio_textarea:
                 logger.info("🔄 Trying profile page route...")
-                self.driver.get(f"https://twitter.com/{TWITTER_USERNAME}")
-                time.sleep(3)
+                self.navigate(f"https://twitter.com/{TWITTER_USERNAME}")
+                timing.sleep(3)
                 
                 # Try to find and click "Edit profile" button
                 try:
@@ -513,7 +748,7 @@ class IntelligentTwitterBot:
                         EC.element_to_be_clickable((By.XPATH, "//span[text()='Edit profile']/.." or By.CSS_SELECTOR, "[data-testid='editProfileButton']"))
                     )
                     edit_button.click()
-                    time.sleep(3)
+                    timing.sleep(3)
                     
                     # Now try to find bio textarea again
                     for selector in bio_selectors:
@@ -539,8 +774,8 @@ class IntelligentTwitterBot:
                 
                 for url in alternative_urls:
                     try:
-                        self.driver.get(url)
-                        time.sleep(4)
+                        self.navigate(url)
+                        timing.sleep(4)
                         
                         for selector in bio_selectors:
                             try:
@@ -563,7 +798,7 @@ class IntelligentTwitterBot:
             
             # Clear existing bio and enter new one
             bio_textarea.click()
-            time.sleep(1)
+            timing.sleep(1)
             
             # Clear existing content using multiple methods
             try:
@@ -576,11 +811,11 @@ class IntelligentTwitterBot:
                 except:
                     pass
             
-            time.sleep(1)
+            timing.sleep(1)
             
             # Type new bio
             bio_textarea.send_keys(new_bio)
-            time.sleep(2)
+            timing.sleep(2)
             
             # Find and click save button with improved selectors
             save_button = None
@@ -633,7 +868,7 @@ class IntelligentTwitterBot:
             except:
                 # Fallback to JavaScript click
                 self.driver.execute_script("arguments[0].click();", save_button)
-            time.sleep(3)
+            timing.sleep(3)
             
             logger.info("✅ Bio updated successfully!")
             self.last_bio_update = datetime.now()
@@ -643,16 +878,19 @@ class IntelligentTwitterBot:
             logger.error(f"❌ Error updating bio: {e}")
             return False
     
+    @timed("follow")
     def follow_user(self, username):
         """Follow a user that Baggy finds interesting."""
+        if self.dry_run:
+            return self.recorder.record("follow", username)
         try:
             logger.info(f"👤 Following @{username}...")
             
             # Navigate to user's profile
             profile_url = f"https://twitter.com/{username}"
             logger.info(f"🔗 Navigating to {profile_url}")
-            self.driver.get(profile_url)
-            time.sleep(3)
+            self.navigate(profile_url)
+            timing.sleep(3)
             
             # Look for the follow button with multiple strategies
             follow_button = None
@@ -722,7 +960,7 @@ class IntelligentTwitterBot:
             try:
                 # Scroll to make sure button is visible
                 self.driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", follow_button)
-                time.sleep(1)
+                timing.sleep(1)
                 
                 # Try regular click first
                 follow_button.click()
@@ -737,7 +975,7 @@ class IntelligentTwitterBot:
                     logger.error(f"❌ Failed to click follow button: {click_e}, {js_e}")
                     return False
             
-            time.sleep(2)
+            timing.sleep(2)
             
             # Verify the follow action worked by checking if button changed
             try:
@@ -748,7 +986,7 @@ class IntelligentTwitterBot:
                     return True
                 else:
                     # Sometimes it takes a moment to update, try once more
-                    time.sleep(2)
+                    timing.sleep(2)
                     following_check = self.driver.find_elements(By.XPATH, "//div[@role='button' and contains(text(), 'Following')]")
                     if following_check:
                         logger.info(f"✅ Successfully followed @{username}!")
@@ -764,69 +1002,39 @@ class IntelligentTwitterBot:
             logger.error(f"❌ Error following user @{username}: {e}")
             return False
     
-    def get_followers(self):
-        """Get list of followers to potentially interact with."""
+    @timed("followers")
+    def get_followers(self, full=None):
+        """Crawl the followers page and fold new/lost followers into the stored list.
+        
+        Incremental by default - stops once it only sees known followers. A full crawl (needed
+        to notice unfollows) runs when there's no stored list or the last one is too old.
+        """
+        known = self.followers
+        if full is None:
+            full_age = self.state.followers_age(full=True)
+            full = not known or full_age is None or full_age > FOLLOWERS_FULL_CRAWL_DAYS * 86400
         try:
-            logger.info("👥 Getting followers list...")
-            # Use correct URL for followers
-            self.driver.get(f"https://twitter.com/{TWITTER_USERNAME}/followers")
-            time.sleep(5)
-            
-            followers = []
-            try:
-                # Use Selenium instead of BeautifulSoup for better element detection
-                user_elements = self.driver.find_elements(By.CSS_SELECTOR, '[data-testid="cellInnerDiv"]')
-                
-                if not user_elements:
-                    # Try alternative selectors
-                    user_elements = self.driver.find_elements(By.CSS_SELECTOR, '[data-testid="UserCell"]')
-                
-                if not user_elements:
-                    # Try even more generic approach
-                    user_elements = self.driver.find_elements(By.CSS_SELECTOR, 'div[dir="ltr"]')
-                
-                logger.info(f"📊 Found {len(user_elements)} potential user elements")
-                
-                for user_elem in user_elements[:20]:  # Process first 20 elements
-                    try:
-                        # Try to find username links
-                        username_links = user_elem.find_elements(By.CSS_SELECTOR, 'a[href^="/"][href!="/notifications"][href!="/messages"]')
-                        
-                        for link in username_links:
-                            href = link.get_attribute('href')
-                            if href and '/' in href:
-                                potential_username = href.split('/')[-1]
-                                # Filter out obvious non-usernames
-                                if (potential_username and 
-                                    not potential_username.startswith('status') and
-                                    not potential_username in ['home', 'notifications', 'messages', 'explore'] and
-                                    len(potential_username) > 0 and
-                                    potential_username != TWITTER_USERNAME):
-                                    
-                                    if potential_username not in followers:
-                                        followers.append(potential_username)
-                                        logger.info(f"👤 Found follower: @{potential_username}")
-                                    break
-                    except Exception as e:
-                        continue
-                
-                # If we still don't have followers, create a placeholder
-                if not followers:
-                    logger.info("📊 No followers detected, using engagement approach")
-                    followers = ['placeholder_for_engagement']  # This prevents the 0 follower issue
-                    
-            except Exception as e:
-                logger.warning(f"⚠️ Could not parse followers: {e}")
-                followers = ['placeholder_for_engagement']
-            
-            self.followers = followers
-            logger.info(f"✅ Found {len(self.followers)} followers")
+            logger.info(f"👥 {'Full' if full else 'Incremental'} follower crawl ({len(known)} known)...")
+            self.navigate(f"https://twitter.com/{TWITTER_USERNAME}/followers")
+            timing.sleep(5)
+            
+            crawler = FollowerCrawler(self.driver, own_username=TWITTER_USERNAME, rng=self.rng)
+            result = crawler.crawl(known, full=full)
+            if not result.seen:
+                logger.warning("⚠️ No follower cells found - keeping the stored list")
+                return known
+            
+            self.state.apply_follower_diff(result.new, result.lost, full=full and result.exhausted)
+            log_event("followers_crawled", full=full, pages=result.pages, seen=len(result.seen),
+                      new=len(result.new), lost=len(result.lost), exhausted=result.exhausted)
+            for username in result.new[:10]:
+                logger.info(f"👤 New follower: @{username}")
+            logger.info(f"✅ {len(self.followers)} followers ({len(result.new)} new, {len(result.lost)} lost)")
             return self.followers
             
         except Exception as e:
             logger.error(f"❌ Error getting followers: {e}")
-            self.followers = ['placeholder_for_engagement']
-            return self.followers
+            return known
     
     def scroll_and_engage(self, tab="home"):
         """Scroll through timeline and selectively engage with threads."""
@@ -843,14 +1051,14 @@ class IntelligentTwitterBot:
                 success = False
                 for url in following_urls:
                     try:
-                        self.driver.get(url)
-                        time.sleep(3)
+                        self.navigate(url)
+                        timing.sleep(3)
                         
                         # Check if we successfully loaded the Following tab
                         # Look for Following tab indicator or tweets
                         tweets = self.driver.find_elements(By.CSS_SELECTOR, 'article[data-testid="tweet"]')
                         if tweets:
-                            logger.info(f"✅ Successfully loaded Following tab via {url}")
+                            logger.info("✅ Successfully loaded Following tab via %s", url)
                             success = True
                             break
                     except:
@@ -859,8 +1067,8 @@ class IntelligentTwitterBot:
                 if not success:
                     logger.info("🔄 Trying to click Following tab manually...")
                     # Go to home and try to click the Following tab
-                    self.driver.get("https://twitter.com/home")
-                    time.sleep(2)
+                    self.navigate("https://twitter.com/home")
+                    timing.sleep(2)
                     
                     try:
                         # Try to find and click the Following tab
@@ -876,7 +1084,7 @@ class IntelligentTwitterBot:
                             try:
                                 following_tab = self.driver.find_element(By.CSS_SELECTOR, selector)
                                 following_tab.click()
-                                time.sleep(3)
+                                timing.sleep(3)
                                 logger.info("✅ Successfully clicked Following tab")
                                 clicked = True
                                 break
@@ -895,7 +1103,7 @@ class IntelligentTwitterBot:
                                 try:
                                     following_tab = self.driver.find_element(By.XPATH, xpath)
                                     following_tab.click()
-                                    time.sleep(3)
+                                    timing.sleep(3)
                                     logger.info("✅ Successfully clicked Following tab via XPath")
                                     clicked = True
                                     break
@@ -907,209 +1115,335 @@ class IntelligentTwitterBot:
                             tab = "home"
                         
                     except Exception as tab_e:
-                        logger.warning(f"⚠️ Error clicking Following tab: {tab_e}, staying on For You")
+                        logger.warning("⚠️ Error clicking Following tab: %s, staying on For You", tab_e)
                         tab = "home"
             else:
                 logger.info("📱 Scrolling through For You timeline...")
-                self.driver.get("https://twitter.com/home")
+                self.navigate("https://twitter.com/home")
             
-            time.sleep(2)
+            timing.sleep(2)
             
             # Scroll very few times to be ultra chill
-            scrolls = random.randint(1, 2)  # Minimal scrolling (was 2-4)
-            logger.info(f"📜 Will scroll {scrolls} times on {tab.upper()} tab")
+            scrolls = self.rng.randint(1, 2)  # Minimal scrolling (was 2-4)
+            logger.info("📜 Will scroll %s times on %s tab", scrolls, tab.upper())
+            
+            # This thread only reads the DOM and clicks - decisions and replies happen on the workers
+            self.pipeline.start()
+            tweet_elements_by_id = {}
+            deferred_follows = []
             
             for scroll in range(scrolls):
-                logger.info(f"📜 Scroll {scroll + 1}/{scrolls}")
-                
-                # Get tweet elements directly with Selenium
-                tweet_elements = self.driver.find_elements(By.CSS_SELECTOR, 'article[data-testid="tweet"]')
-                
-                # Look at fewer tweets per scroll to reduce API calls
-                for i, tweet_element in enumerate(tweet_elements[:3]):  # Check first 3 tweets each scroll (was 5)
-                    try:
-                        # Re-find the element to avoid stale reference
-                        current_tweets = self.driver.find_elements(By.CSS_SELECTOR, 'article[data-testid="tweet"]')
-                        if i >= len(current_tweets):
+                with self.pipeline.browser_span():
+                    logger.info("📜 Scroll %s/%s", scroll + 1, scrolls)
+                    
+                    # Look at fewer tweets per scroll to reduce API calls
+                    scroll_records = self.extract_tweet_records(limit=3)  # Check first 3 tweets each scroll (was 5)
+                    self.classify_records([record for record, _ in scroll_records])
+                    
+                    fresh_records = []
+                    for record, tweet_element in scroll_records:
+                        # Skip if we've already engaged with (or are still deciding on) this tweet
+                        if record.tweet_id in tweet_elements_by_id or self.state.has_engaged(record.tweet_id):
+                            logger.info("🔄 Already engaged with @%s's tweet: %s...", record.username, record.text[:30])
                             continue
-                        tweet_element = current_tweets[i]
-                        # Extract tweet info using Selenium
-                        text_elem = tweet_element.find_element(By.CSS_SELECTOR, '[data-testid="tweetText"]')
-                        
-                        # Get the actual tweet author's username - improved accuracy
-                        tweet_author = None
-                        try:
-                            # Method 1: Most specific - look for the author link in the tweet header area only
-                            # This targets the actual tweet author, not mentions in content
-                            username_element = tweet_element.find_element(By.CSS_SELECTOR, '[data-testid="User-Name"] [tabindex="-1"]')
-                            href = username_element.get_attribute('href')
-                            if href and '/' in href and not '/status/' in href:
-                                tweet_author = href.split('/')[-1].split('?')[0]  # Remove query params
-                                if tweet_author and not tweet_author.startswith('status') and len(tweet_author) > 0:
-                                    logger.debug(f"🎯 Method 1 - Found author: @{tweet_author}")
-                        except:
-                            pass
-                        
-                        # Method 2: Alternative header selector - target the profile link specifically
-                        if not tweet_author:
-                            try:
-                                username_element = tweet_element.find_element(By.CSS_SELECTOR, '[data-testid="User-Names"] a[tabindex="-1"]')
-                                href = username_element.get_attribute('href')
-                                if href and '/' in href and not '/status/' in href:
-                                    tweet_author = href.split('/')[-1].split('?')[0]  # Remove query params
-                                    if tweet_author and not tweet_author.startswith('status') and len(tweet_author) > 0:
-                                        logger.debug(f"🎯 Method 2 - Found author: @{tweet_author}")
-                            except:
-                                pass
-                        
-                        # Method 3: Look specifically in the tweet header div (most reliable area)
-                        if not tweet_author:
-                            try:
-                                # Find the tweet header section first
-                                header_section = tweet_element.find_element(By.CSS_SELECTOR, '[data-testid="User-Name"]')
-                                # Then look for the first username link within that header only
-                                username_links = header_section.find_elements(By.CSS_SELECTOR, 'a[href^="/"]')
-                                
-                                for link in username_links[:1]:  # Only check the first link in header
-                                    href = link.get_attribute('href')
-                                    if (href and '/' in href and 
-                                        not '/status/' in href and 
-                                        not '/notifications' in href and 
-                                        not '/messages' in href and
-                                        not '/home' in href and
-                                        not '/search' in href):
-                                        
-                                        potential_author = href.split('/')[-1].split('?')[0]  # Remove query params
-                                        if (potential_author and 
-                                            not potential_author.startswith('status') and
-                                            len(potential_author) > 0 and
-                                            not potential_author in ['i', 'compose', 'settings']):
-                                            
-                                            tweet_author = potential_author
-                                            logger.debug(f"🎯 Method 3 - Found author: @{tweet_author}")
-                                            break
-                            except:
-                                pass
-                        
-                        # Method 4: Fallback - look for span with username format @username in header area
-                        if not tweet_author:
-                            try:
-                                header_section = tweet_element.find_element(By.CSS_SELECTOR, '[data-testid="User-Names"]')
-                                username_spans = header_section.find_elements(By.TAG_NAME, 'span')
-                                for span in username_spans:
-                                    text = span.text.strip()
-                                    if text.startswith('@') and len(text) > 1:
-                                        tweet_author = text[1:]  # Remove @ symbol
-                                        logger.debug(f"🎯 Method 4 - Found author from @text: @{tweet_author}")
-                                        break
-                            except:
-                                pass
                         
-                        if text_elem and tweet_author:
-                            tweet_text = text_elem.text.strip()
-                            username = tweet_author
-                            
-                            # Skip our own tweets
-                            if username.lower() == TWITTER_USERNAME.lower():
-                                logger.info(f"🚫 Skipping our own tweet: {tweet_text[:50]}...")
-                                continue
-                            
-                            # Create a unique identifier for this tweet to prevent duplicate engagement
-                            tweet_id = f"{username}:{hash(tweet_text[:100])}"  # Use username + text hash
-                            
-                            # Skip if we've already engaged with this tweet
-                            if tweet_id in self.engaged_tweets:
-                                logger.info(f"🔄 Already engaged with @{username}'s tweet: {tweet_text[:30]}...")
-                                continue
-                            
-                            logger.info(f"👀 Looking at tweet from @{username}: {tweet_text[:50]}...")
-                            logger.info(f"🎯 CONFIRMED AUTHOR: @{username} - Will reply to this user specifically")
-                            
-                            # Check if it's a thread (simplified check)
-                            is_thread = "Show this thread" in tweet_element.get_attribute('innerHTML') or "🧵" in tweet_text
-                            
-                            if is_thread:
-                                logger.info("🧵 Thread detected!")
-                                # Use thread content for engagement decision
-                                should_engage = self.should_engage_with_thread(tweet_text)
-                                content_to_analyze = tweet_text
-                            else:
-                                # Regular tweet engagement
-                                should_engage = self.should_engage(tweet_text, username)
-                                content_to_analyze = tweet_text
-                            
-                            if should_engage:
-                                # Determine engagement style based on content
-                                engagement_style = get_engagement_style(content_to_analyze)
-                                
-                                                # Choose engagement type - heavily favor likes over API-heavy replies
-                                engagement_type = random.choices(
-                                    ['like', 'reply', 'retweet', 'follow'], 
-                                    weights=[60, 15, 20, 5]  # Heavily favor likes (no API calls)
-                                )[0]
-                                
-                                # For retweets, do additional content check
-                                if engagement_type == 'retweet':
-                                    if not should_retweet_content(tweet_text):
-                                        logger.info("🔄 Content not worthy of retweet, switching to like")
-                                        engagement_type = 'like'
-                                
-                                logger.info(f"🎯 Engaging with {engagement_type} on {'thread' if is_thread else 'tweet'}")
-                                
-                                # Mark this tweet as engaged with BEFORE attempting engagement
-                                self.engaged_tweets.add(tweet_id)
-                                
-                                if engagement_type == 'like':
-                                    self.like_tweet(tweet_element)
-                                    time.sleep(random.randint(2, 5))
-                                elif engagement_type == 'reply':
-                                    # Final validation before replying - ensure we have the right tweet element
-                                    logger.info(f"🎯 FINAL CHECK: About to reply to @{username} for tweet: {tweet_text[:50]}...")
-                                    
-                                    # Re-confirm we're looking at the right tweet by checking the username again
-                                    try:
-                                        # Scroll to make sure the tweet is still visible and clickable
-                                        self.driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", tweet_element)
-                                        time.sleep(1)
-                                        
-                                        # Double-check we have the right username from this specific tweet element
-                                        confirmation_author = self.extract_tweet_author(tweet_element)
-                                        if confirmation_author and confirmation_author.lower() == username.lower():
-                                            logger.info(f"✅ CONFIRMED: Tweet element matches expected author @{username}")
-                                            # Use the proper reply function with tweet element
-                                            self.reply_to_tweet(tweet_element, tweet_text, username, engagement_style)
-                                        else:
-                                            logger.error(f"❌ MISMATCH: Tweet element shows @{confirmation_author} but expected @{username}")
-                                            logger.error("❌ Skipping reply to prevent wrong user reply")
-                                    except Exception as validation_e:
-                                        logger.error(f"❌ Error validating tweet element: {validation_e}")
-                                        logger.error("❌ Skipping reply for safety")
-                                    
-                                    time.sleep(random.randint(30, 60))  # Longer wait after replies
-                                elif engagement_type == 'retweet':
-                                    # Retweet the tweet (already passed content check)
-                                    if self.retweet_tweet(tweet_element):
-                                        logger.info("✅ Successfully retweeted content")
-                                    time.sleep(random.randint(5, 10))
-                                elif engagement_type == 'follow':
-                                    self.follow_user(username)
-                                    time.sleep(random.randint(3, 8))
-                            else:
-                                logger.info(f"🤷 Not engaging with @{username}")
+                        logger.info("👀 Looking at tweet from @%s: %s...", record.username, record.text[:50])
+                        tweet_elements_by_id[record.tweet_id] = tweet_element
+                        fresh_records.append(record)
+                    # One unit per scroll, so the replies it rolls can be generated together
+                    self.pipeline.submit_batch(fresh_records)
                     
-                    except Exception as e:
-                        logger.error(f"❌ Error processing tweet: {e}")
-                        continue
+                    # Carry out whatever the workers have finished so far
+                    for action in self.pipeline.poll_actions():
+                        if action.action == 'follow':
+                            deferred_follows.append(action)  # Follows navigate away from the timeline
+                            continue
+                        self.execute_engagement(action, tweet_elements_by_id.get(action.record.tweet_id))
+                    
+                    # Natural scrolling behavior
+                    scroll_amount = self.rng.randint(400, 1200)
+                    self.driver.execute_script(f"window.scrollTo(0, window.pageYOffset + {scroll_amount});")
+                    
+                    # Slower, more natural reading pace - workers keep generating meanwhile
+                    timing.sleep(self.rng.randint(5, 15))  # Longer pauses between scrolls
+            
+            # Finish the replies still being prepared before leaving this page
+            for action in self.pipeline.drain(timeout=120):
+                if action.action == 'follow':
+                    deferred_follows.append(action)
+                    continue
+                with self.pipeline.browser_span():
+                    self.execute_engagement(action, tweet_elements_by_id.get(action.record.tweet_id))
+            
+            for action in deferred_follows:
+                self.execute_engagement(action, None)
+            
+            logger.info("📊 Pipeline: %s", self.pipeline.format_metrics())
+                
+        except Exception as e:
+            logger.error("❌ Error scrolling timeline: %s", e)
+    
+    @timed("extract")
+    def extract_tweet_records(self, limit=3, source="timeline"):
+        """Snapshot the first visible tweets into plain records (browser thread only, limit=None for all)."""
+        records = []
+        tweet_elements = self.driver.find_elements(By.CSS_SELECTOR, 'article[data-testid="tweet"]')
+        if limit is not None:
+            tweet_elements = tweet_elements[:limit]
+        
+        for tweet_element in tweet_elements:
+            try:
+                text_elem = tweet_element.find_element(By.CSS_SELECTOR, '[data-testid="tweetText"]')
+                tweet_author = self.extract_tweet_author(tweet_element)
+                
+                if not text_elem or not tweet_author:
+                    continue
+                
+                tweet_text = text_elem.text.strip()
+                
+                # Skip our own tweets
+                if tweet_author.lower() == TWITTER_USERNAME.lower():
+                    logger.info("🚫 Skipping our own tweet: %s...", tweet_text[:50])
+                    continue
+                
+                # Create a unique identifier for this tweet to prevent duplicate engagement
+                tweet_id = f"{tweet_author}:{text_fingerprint(tweet_text[:100])}"  # Username + stable text hash
+                
+                # Check if it's a thread (the text's own markers first - no browser round trip)
+                is_thread = has_thread_marker(tweet_text) or self.is_thread_tweet(tweet_element)
+                
+                # Mentions need the permalink ID for the watermark
+                status_id, created_at = None, None
+                if source == "mentions":
+                    status_id, created_at = self.extract_status_info(tweet_element)
+                
+                records.append((TweetRecord(tweet_id, tweet_author, tweet_text, is_thread, source,
+                                            status_id=status_id, created_at=created_at), tweet_element))
+            except Exception as e:
+                logger.error("❌ Error processing tweet: %s", e)
+                continue
+        
+        return records
+    
+    @timed("classify")
+    def classify_records(self, records):
+        """Run the personality decisions for a whole batch of records in one call."""
+        if not records:
+            return records
+        self.tweets_evaluated += len(records)
+        config = keywords.active()
+        decisions = classify_batch([record.text for record in records],
+                                   rng=np.random.default_rng(self.rng.getrandbits(64)), config=config)
+        # The matrix already has every keyword-category hit - seed each record's TextFeatures with them
+        categories = [name for name, _ in config.feature_categories]
+        category_hits = (decisions["features"][:, :len(categories)] > 0).tolist()
+        for i, record in enumerate(records):
+            self.text_features.put(record.tweet_id, TextFeatures(record.text, config, zip(categories, category_hits[i])))
+            record.engage = bool(decisions["engage"][i])
+            record.retweet = bool(decisions["retweet"][i])
+            record.engagement_style = str(decisions["style"][i])
+            log_event("tweet_evaluated", tweet_id=record.tweet_id, author=record.username, source=record.source,
+                      chars=len(record.text), is_thread=record.is_thread, engage=record.engage,
+                      retweet=record.retweet, style=record.engagement_style)
+        return records
+    
+    def extract_status_info(self, tweet_element):
+        """Return (status_id, created_at) from the tweet's timestamp permalink."""
+        try:
+            time_elem = tweet_element.find_element(By.CSS_SELECTOR, 'a[href*="/status/"] time')
+            permalink = time_elem.find_element(By.XPATH, './..').get_attribute('href') or ''
+            match = re.search(r'/status/(\d+)', permalink)
+            if not match:
+                return None, None
+            status_id = int(match.group(1))
+            
+            stamp = time_elem.get_attribute('datetime')
+            if stamp:
+                created_at = datetime.fromisoformat(stamp.replace('Z', '+00:00')).timestamp()
+            else:
+                created_at = status_id_timestamp(status_id)
+            return status_id, created_at
+        except Exception:
+            return None, None
+    
+    @timed("prepare")
+    def prepare_engagement(self, record):
+        """Decide how to engage with a tweet record - runs on a pipeline worker, never touches the driver."""
+        action = self.decide_engagement(record)
+        if action.action != 'reply':
+            return action
+        
+        reply_content = self.prepare_reply(self.features_for(record), record.username, action.engagement_style)
+        if not reply_content:
+            return ActionRequest(record, "skip", action.engagement_style)
+        action.content = reply_content
+        return action
+    
+    def prepare_engagement_batch(self, records):
+        """prepare_engagement for a whole intake batch: every reply it rolls shares one generation request."""
+        replies = []
+        for record in records:
+            action = self.decide_engagement(record)
+            if action.action == 'reply':
+                replies.append(action)
+            else:
+                yield action
+        
+        if not replies:
+            return
+        contents = self.prepare_replies([(action.record.tweet_id, action.record.username,
+                                          self.features_for(action.record), action.engagement_style)
+                                         for action in replies])
+        for action in replies:
+            action.content = contents.get(action.record.tweet_id)
+            yield action if action.content else ActionRequest(action.record, "skip", action.engagement_style)
+    
+    def features_for(self, record):
+        """The record's TextFeatures, shared by every check on it (cached by tweet ID)."""
+        return self.text_features.get(record.tweet_id, record.text)
+    
+    def record_rng(self, record):
+        """Random source for one record's worker-side draws.
+        
+        Seeded runs derive it from the tweet ID, so the order in which workers pick records up
+        can't change which tweet gets which draw.
+        """
+        if self._record_seed is None:
+            return self.rng
+        return random.Random(f"{self._record_seed}:{record.tweet_id}")
+    
+    def decide_engagement(self, record):
+        """Engagement decision for a record; a 'reply' comes back without its content yet."""
+        rng = self.record_rng(record)
+        tweet = self.features_for(record)
+        if record.is_thread:
+            logger.info("🧵 Thread detected!")
+            # Use thread content for engagement decision
+            should_engage = self.should_engage_with_thread(tweet, decision=record.engage)
+        else:
+            # Regular tweet engagement
+            should_engage = self.should_engage(tweet, record.username, decision=record.engage)
+        
+        if not should_engage:
+            logger.info("🤷 Not engaging with @%s", record.username)
+            return ActionRequest(record, "skip", engaged=False)
+        
+        # Determine engagement style based on content
+        engagement_style = record.engagement_style or get_engagement_style(tweet, rng=rng)
+        
+        # Choose engagement type - heavily favor likes over API-heavy replies
+        engagement_type = rng.choices(
+            ['like', 'reply', 'retweet', 'follow'], 
+            weights=[60, 15, 20, 5]  # Heavily favor likes (no API calls)
+        )[0]
+        
+        # For retweets, do additional content check
+        if engagement_type == 'retweet':
+            retweet_worthy = record.retweet if record.retweet is not None else should_retweet_content(tweet, rng=rng)
+            if not retweet_worthy:
+                logger.info("🔄 Content not worthy of retweet, switching to like")
+                engagement_type = 'like'
+        
+        if engagement_type == 'reply' and not self.llm.available:
+            logger.info("🔴 LLM circuit open, liking instead of replying")
+            engagement_type = 'like'
+        
+        return ActionRequest(record, engagement_type, engagement_style)
+    
+    def refresh_tweet_element(self, record, tweet_element):
+        """Return a live element for the record, re-finding it if the cached one went stale."""
+        if tweet_element is not None:
+            try:
+                tweet_element.is_displayed()
+                return tweet_element
+            except StaleElementReferenceException:
+                pass
+        
+        for candidate in self.driver.find_elements(By.CSS_SELECTOR, 'article[data-testid="tweet"]'):
+            try:
+                text_elem = candidate.find_element(By.CSS_SELECTOR, '[data-testid="tweetText"]')
+                if (text_elem.text.strip()[:100] == record.text[:100] and
+                    (self.extract_tweet_author(candidate) or "").lower() == record.username.lower()):
+                    return candidate
+            except Exception:
+                continue
+        return None
+    
+    def execute_engagement(self, action, tweet_element):
+        """Carry out a prepared action on the browser thread."""
+        queued_ms = round((time.time() - action.ready_at) * 1000)  # Ready on a worker -> picked up here
+        start = time.perf_counter()
+        done = self.perform_engagement(action, tweet_element)
+        self.count_action(action.action, done)
+        log_event("action", tweet_id=action.record.tweet_id, author=action.record.username, action=action.action,
+                  style=action.engagement_style, ok=done, queued_ms=queued_ms,
+                  ms=round((time.perf_counter() - start) * 1000))
+        return done
+    
+    def count_action(self, action, ok):
+        key = (action, bool(ok))
+        self.action_counts[key] = self.action_counts.get(key, 0) + 1
+    
+    @timed("engage")
+    def perform_engagement(self, action, tweet_element):
+        """Click through a prepared action (like/reply/retweet/follow)."""
+        record = action.record
+        
+        # Mark this tweet as engaged with BEFORE attempting engagement
+        if action.engaged:
+            self.state.record_engagement(record.tweet_id, record.username, action.action)
+        
+        if action.action == "skip":
+            return False
+        
+        if self.dry_run:
+            return self.recorder.record(action.action, record.username, action.content, action.engagement_style,
+                                        record.tweet_id)
+        
+        if action.action == 'follow':
+            logger.info("🎯 Engaging with follow on %s", 'thread' if record.is_thread else 'tweet')
+            self.follow_user(record.username)
+            timing.sleep(self.rng.randint(3, 8))
+            return True
+        
+        tweet_element = self.refresh_tweet_element(record, tweet_element)
+        if tweet_element is None:
+            logger.warning("⚠️ Tweet from @%s is no longer on the page, skipping %s", record.username, action.action)
+            return False
+        
+        logger.info("🎯 Engaging with %s on %s", action.action, 'thread' if record.is_thread else 'tweet')
+        
+        try:
+            if action.action == 'like':
+                self.like_tweet(tweet_element)
+                timing.sleep(self.rng.randint(2, 5))
+            elif action.action == 'reply':
+                # Final validation before replying - ensure we have the right tweet element
+                logger.info("🎯 FINAL CHECK: About to reply to @%s for tweet: %s...", record.username, record.text[:50])
                 
-                # Natural scrolling behavior
-                scroll_amount = random.randint(400, 1200)
-                self.driver.execute_script(f"window.scrollTo(0, window.pageYOffset + {scroll_amount});")
+                # Scroll to make sure the tweet is still visible and clickable
+                self.driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", tweet_element)
+                timing.sleep(1)
                 
-                # Slower, more natural reading pace
-                time.sleep(random.randint(5, 15))  # Longer pauses between scrolls
+                # Double-check we have the right username from this specific tweet element
+                confirmation_author = self.extract_tweet_author(tweet_element)
+                if confirmation_author and confirmation_author.lower() == record.username.lower():
+                    logger.info("✅ CONFIRMED: Tweet element matches expected author @%s", record.username)
+                    self.post_actual_reply(tweet_element, action.content)
+                else:
+                    logger.error("❌ MISMATCH: Tweet element shows @%s but expected @%s", confirmation_author, record.username)
+                    logger.error("❌ Skipping reply to prevent wrong user reply")
                 
+                timing.sleep(self.rng.randint(30, 60))  # Longer wait after replies
+            elif action.action == 'retweet':
+                # Retweet the tweet (already passed content check)
+                if self.retweet_tweet(tweet_element):
+                    logger.info("✅ Successfully retweeted content")
+                timing.sleep(self.rng.randint(5, 10))
+            return True
         except Exception as e:
-            logger.error(f"❌ Error scrolling timeline: {e}")
+            logger.error("❌ Error executing %s for @%s: %s", action.action, record.username, e)
+            return False
     
     def like_tweet(self, tweet_element):
         """Like a tweet."""
@@ -1118,7 +1452,7 @@ class IntelligentTwitterBot:
             like_button = tweet_element.find_element(By.CSS_SELECTOR, '[data-testid="like"]')
             like_button.click()
             logger.info("❤️  Liked a tweet")
-            time.sleep(1)
+            timing.sleep(1)
         except Exception as e:
             logger.error(f"❌ Error liking tweet: {e}")
     
@@ -1130,7 +1464,7 @@ class IntelligentTwitterBot:
             # Find and click the retweet button
             retweet_button = tweet_element.find_element(By.CSS_SELECTOR, '[data-testid="retweet"]')
             retweet_button.click()
-            time.sleep(2)
+            timing.sleep(2)
             
             # Handle the retweet modal - look for "Retweet" confirmation button
             try:
@@ -1156,7 +1490,7 @@ class IntelligentTwitterBot:
                 
                 if retweet_confirmed:
                     logger.info("✅ Tweet retweeted successfully!")
-                    time.sleep(2)
+                    timing.sleep(2)
                     return True
                 else:
                     logger.error("❌ Could not find retweet confirmation button")
@@ -1170,8 +1504,12 @@ class IntelligentTwitterBot:
             logger.error(f"❌ Error retweeting tweet: {e}")
             return False
     
+    @timed("post_tweet")
     def post_tweet(self, content):
         """Post a tweet with validation."""
+        if self.dry_run:
+            self.last_tweet_time = datetime.now()
+            return self.recorder.record("post", content=content)
         try:
             if not self.logged_in:
                 logger.error("❌ Not logged in to Twitter")
@@ -1180,8 +1518,8 @@ class IntelligentTwitterBot:
             logger.info(f"📝 Posting tweet: {content}")
             
             # Navigate to home and wait for load
-            self.driver.get("https://twitter.com/home")
-            time.sleep(3)
+            self.navigate("https://twitter.com/home")
+            timing.sleep(3)
             
             # Try multiple strategies to find the tweet textarea
             tweet_textarea = None
@@ -1207,11 +1545,11 @@ class IntelligentTwitterBot:
             
             # Clear any existing content and type new content
             tweet_textarea.click()
-            time.sleep(1)
+            timing.sleep(1)
             tweet_textarea.clear()
             tweet_textarea.send_keys(content)
             
-            time.sleep(2)
+            timing.sleep(2)
             
             # Try multiple selectors for the tweet button
             tweet_button = None
@@ -1239,62 +1577,55 @@ class IntelligentTwitterBot:
             
             self.last_tweet_time = datetime.now()
             logger.info("✅ Tweet posted successfully!")
-            time.sleep(3)
+            timing.sleep(3)
             return True
             
         except Exception as e:
             logger.error(f"❌ Error posting tweet: {e}")
             return False
     
+    @timed("reply")
     def reply_to_tweet(self, tweet_element, tweet_text, username, engagement_style="roasting"):
         """Generate and post a proper reply using the reply interface with validation."""
         try:
+            reply_content = self.prepare_reply(tweet_text, username, engagement_style)
+            
+            if reply_content:
+                return self.post_actual_reply(tweet_element, reply_content)
+            
+            return False
+            
+        except Exception as e:
+            logger.error(f"❌ Error replying to tweet: {e}")
+            return False
+    
+    def prepare_reply(self, tweet_text, username, engagement_style="roasting"):
+        """Generate and validate reply text (with @username prefix) - no browser access, safe on workers.
+        
+        tweet_text may be a TextFeatures, so both relevance checks reuse the tweet's n-grams.
+        """
+        try:
+            tweet = text_features(tweet_text)
             logger.info(f"💬 Replying to @{username} with {engagement_style} style")
-            logger.info(f"📋 Original tweet content: {tweet_text}")
+            logger.info(f"📋 Original tweet content: {tweet.text}")
             
             # Generate reply based on engagement style and personality - RESPOND TO THE ACTUAL CONTENT
-            if engagement_style == "relatable_life_roast":
-                prompt = f"IMPORTANT: You are replying to @{username} who posted: '{tweet_text}'. Write a funny, relatable reply that sympathizes with their struggle but roasts them gently. Be supportive but with humor. Respond directly to their content. Do NOT mention any other usernames."
-            elif engagement_style == "dating_comedy":
-                prompt = f"IMPORTANT: You are replying to @{username} who posted: '{tweet_text}'. Write a funny reply about dating/relationships that responds to what @{username} said. Be humorous but not mean-spirited. Address their actual content. Do NOT mention any other usernames."
-            elif engagement_style == "entertainment_banter":
-                prompt = f"IMPORTANT: You are replying to @{username} who posted: '{tweet_text}'. Write a fun, engaging reply about movies/TV/entertainment that directly responds to what @{username} said. Be conversational and entertaining. Do NOT mention any other usernames."
-            elif engagement_style == "lifestyle_jokes":
-                prompt = f"IMPORTANT: You are replying to @{username} who posted: '{tweet_text}'. Write a playful, funny reply about food/coffee/lifestyle that responds to what @{username} said. Be light-hearted and relatable. Do NOT mention any other usernames."
-            elif engagement_style == "gaming_banter":
-                prompt = f"IMPORTANT: You are replying to @{username} who posted: '{tweet_text}'. Write a funny gaming-related reply that responds to what @{username} said. Use gamer humor but be engaging. Do NOT mention any other usernames."
-            elif engagement_style == "wholesome_funny":
-                prompt = f"IMPORTANT: You are replying to @{username} who posted: '{tweet_text}'. Write a wholesome but funny reply about pets/animals that responds to what @{username} said. Be positive and humorous. Do NOT mention any other usernames."
-            elif engagement_style == "helpful_sarcasm":
-                prompt = f"IMPORTANT: You are replying to @{username} who posted: '{tweet_text}'. Write a helpful but slightly sarcastic reply that actually answers their question or responds to their content. Be useful but with humor. Do NOT mention any other usernames."
-            elif engagement_style == "opinion_roast":
-                prompt = f"IMPORTANT: You are replying to @{username} who posted: '{tweet_text}'. Write a funny reply that playfully roasts their opinion while responding to what @{username} said. Be witty but not too harsh. Do NOT mention any other usernames."
-            elif engagement_style == "financial_destruction":
-                prompt = f"IMPORTANT: You are replying to @{username} who posted: '{tweet_text}'. Write a savage reply that directly responds to what @{username} said, mocking their financial decisions. Be brutal but relevant to their actual words. Do NOT mention any other usernames."
-            elif engagement_style == "crypto_annihilation":
-                prompt = f"IMPORTANT: You are replying to @{username} who posted: '{tweet_text}'. Write a savage reply that directly responds to what @{username} said, calling out their crypto delusions. Be brutal but address their content. Do NOT mention any other usernames."
-            elif engagement_style == "skill_issue":
-                prompt = f"IMPORTANT: You are replying to @{username} who posted: '{tweet_text}'. Write a savage reply that directly responds to what @{username} said, calling it a skill issue. Be brutal but respond to their actual words. Do NOT mention any other usernames."
-            elif engagement_style == "rare_respect":
-                prompt = f"IMPORTANT: You are replying to @{username} who posted: '{tweet_text}'. Write a reply that actually respects what @{username} said, acknowledging they're based. Be positive but still edgy, responding to their actual content. Do NOT mention any other usernames."
-            else:
-                prompt = f"IMPORTANT: You are replying to @{username} who posted: '{tweet_text}'. Write a funny, engaging reply that directly responds to what @{username} said. Be humorous and relatable but make sure your reply makes sense as a response to their content. Do NOT mention any other usernames."
+            prompt = prompts.reply_prompt(username, tweet.text, engagement_style)
             
             reply_content = self.generate_content(prompt, "reply")
             
             if reply_content:
                 # Validate that the reply is actually relevant to this specific tweet and user
-                if not self.validate_reply_relevance(reply_content, tweet_text, username):
+                if not self.validate_reply_relevance(reply_content, tweet, username):
                     logger.warning(f"⚠️ Generated reply not relevant to @{username}'s tweet, regenerating...")
                     
                     # Try again with even more specific prompt
-                    enhanced_prompt = f"CRITICAL: Reply ONLY to @{username}'s tweet: '{tweet_text}'. Your reply must reference what they said about '{tweet_text[:30]}...' and be a direct response. Do not mention other users or unrelated content."
-                    reply_content = self.generate_content(enhanced_prompt, "reply")
+                    reply_content = self.generate_content(prompts.strict_reply_prompt(username, tweet.text), "strict reply")
                     
                     # Final validation
-                    if reply_content and not self.validate_reply_relevance(reply_content, tweet_text, username):
+                    if reply_content and not self.validate_reply_relevance(reply_content, tweet, username):
                         logger.error(f"❌ Still generating irrelevant replies, skipping @{username}")
-                        return False
+                        return None
                 
                 if reply_content:
                     # Remove any existing @username from the content to avoid duplicates
@@ -1305,16 +1636,83 @@ class IntelligentTwitterBot:
                     
                     logger.info(f"📝 Final validated reply content: {reply_content}")
                     logger.info(f"🎯 Confirmed replying to: @{username}")
-                    return self.post_actual_reply(tweet_element, reply_content)
+                    return reply_content
             
-            return False
+            return None
             
         except Exception as e:
-            logger.error(f"❌ Error replying to tweet: {e}")
-            return False
+            logger.error(f"❌ Error preparing reply: {e}")
+            return None
+    
+    @timed("generate_batch")
+    def prepare_replies(self, items):
+        """prepare_reply for several tweets at once: one generation request per REPLY_BATCH_SIZE tweets.
+        
+        items are (tweet_id, username, tweet_text or TextFeatures, engagement_style); returns
+        {tweet_id: reply or None}. Replies that fail the local checks, or that the model left out,
+        are regenerated one by one.
+        """
+        items = [(tweet_id, username, text_features(tweet), style) for tweet_id, username, tweet, style in items]
+        results = {}
+        if len(items) > 1 and self.llm.available:
+            for start in range(0, len(items), REPLY_BATCH_SIZE):
+                chunk = items[start:start + REPLY_BATCH_SIZE]
+                if len(chunk) > 1:
+                    results.update(self.generate_reply_batch(chunk))
+        
+        for tweet_id, username, tweet, engagement_style in items:
+            if tweet_id not in results:
+                results[tweet_id] = self.prepare_reply(tweet, username, engagement_style)
+        return results
     
+    def generate_reply_batch(self, items):
+        """One request for replies to several tweets; returns {tweet_id: reply} for those passing local checks."""
+        keyed = {str(i): item for i, item in enumerate(items, 1)}  # Short keys instead of long tweet IDs
+        logger.info(f"🧠 Generating {len(items)} replies in one request...")
+        try:
+            replies = self.llm.complete(
+                "reply batch",
+                prompts.content_messages(prompts.batch_reply_prompt(
+                    [(key, username, tweet.text, style) for key, (_, username, tweet, style) in keyed.items()])),
+                max_tokens=BATCH_REPLY_TOKENS * len(items),
+                temperature=0.5,
+                parse=prompts.parse_batch_replies
+            )
+        except LLMUnavailable as e:
+            logger.warning(f"⚠️ Batched reply generation failed ({e.kind}), replying one by one")
+            return {}
+        
+        accepted = {}
+        for key, (tweet_id, username, tweet, _) in keyed.items():
+            reply = self.check_batch_reply(replies.get(key), tweet, username)
+            if reply:
+                accepted[tweet_id] = f"@{username} {reply}"
+                logger.info(f"📝 Batched reply for @{username}: {reply}")
+        logger.info(f"✅ {len(accepted)}/{len(items)} batched replies passed local checks")
+        return accepted
+    
+    def check_batch_reply(self, reply, tweet_text, username):
+        """Local-only checks for one reply out of a batch: output rules, usernames and TF-IDF relevance."""
+        if not reply:
+            return None
+        reply = self.ensure_complete_sentence(re.sub(f'^@{username}\\s*', '', reply))
+        if not self.check_content_locally(reply):
+            return None
+        if any(other.lower() != username.lower() for other in re.findall(r'@(\w+)', reply)):
+            logger.warning(f"❌ Batched reply for @{username} mentions other users")
+            return None
+        # The tweet sat right next to its reply in the prompt - only a clearly unrelated score is rejected
+        verdict, score = self.relevance_scorer.classify(reply, tweet_text)
+        if verdict is False:
+            logger.warning(f"❌ LOCAL RELEVANCE: score {score:.3f} - batched reply for @{username} looks unrelated")
+            return None
+        return reply
+    
+    @timed("post_reply")
     def post_actual_reply(self, tweet_element, content):
         """Post an actual reply using the Twitter reply interface with validation."""
+        if self.dry_run:
+            return self.recorder.record("reply", content=content)
         try:
             logger.info(f"🔗 Posting actual reply: {content}")
             
@@ -1331,7 +1729,7 @@ class IntelligentTwitterBot:
             try:
                 # Scroll to ensure the tweet element is visible and clickable
                 self.driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", tweet_element)
-                time.sleep(2)
+                timing.sleep(2)
                 
                 # Find the reply button within this specific tweet element
                 reply_button = tweet_element.find_element(By.CSS_SELECTOR, '[data-testid="reply"]')
@@ -1340,7 +1738,7 @@ class IntelligentTwitterBot:
                 logger.info(f"🎯 Clicking reply button for @{expected_username}'s specific tweet")
                 self.driver.execute_script("arguments[0].click();", reply_button)
                 logger.info("✅ Used JavaScript click on specific tweet's reply button")
-                time.sleep(3)
+                timing.sleep(3)
                 
             except Exception as click_e:
                 logger.warning(f"⚠️ Failed to click specific tweet reply button: {click_e}")
@@ -1365,7 +1763,7 @@ class IntelligentTwitterBot:
                 try:
                     close_button = self.driver.find_element(By.CSS_SELECTOR, '[data-testid="app-bar-close"]')
                     close_button.click()
-                    time.sleep(1)
+                    timing.sleep(1)
                 except:
                     pass
                 logger.info("🚫 Reply modal mismatch, skipping reply")
@@ -1401,11 +1799,11 @@ class IntelligentTwitterBot:
             
             # Clear and type the reply content
             reply_textarea.click()
-            time.sleep(1)
+            timing.sleep(1)
             reply_textarea.clear()
             reply_textarea.send_keys(content)
             
-            time.sleep(2)
+            timing.sleep(2)
             
             # Final validation: Check the content in the textarea matches what we expect
             try:
@@ -1449,7 +1847,7 @@ class IntelligentTwitterBot:
             post_reply_button.click()
             
             logger.info("✅ Reply posted successfully!")
-            time.sleep(3)
+            timing.sleep(3)
             return True
             
         except Exception as e:
@@ -1463,8 +1861,8 @@ class IntelligentTwitterBot:
             logger.info("📝 Using compose method as reply fallback")
             
             # Navigate to home and use the main compose box
-            self.driver.get("https://twitter.com/home")
-            time.sleep(3)
+            self.navigate("https://twitter.com/home")
+            timing.sleep(3)
             
             # Find the main tweet compose box
             tweet_textarea = None
@@ -1490,11 +1888,11 @@ class IntelligentTwitterBot:
             
             # Type the content (which should already include @username)
             tweet_textarea.click()
-            time.sleep(1)
+            timing.sleep(1)
             tweet_textarea.clear()
             tweet_textarea.send_keys(content)
             
-            time.sleep(2)
+            timing.sleep(2)
             
             # Find and click post button
             post_button = None
@@ -1519,7 +1917,7 @@ class IntelligentTwitterBot:
             
             post_button.click()
             logger.info("✅ Posted mention reply successfully!")
-            time.sleep(3)
+            timing.sleep(3)
             return True
             
         except Exception as e:
@@ -1527,185 +1925,229 @@ class IntelligentTwitterBot:
             return False
     
     def check_mentions(self):
-        """Check for mentions and respond selectively to newer, non-spam mentions."""
+        """Check for mentions newer than the watermark and respond selectively to non-spam ones."""
         try:
             logger.info("🔔 Checking mentions...")
-            self.driver.get("https://twitter.com/notifications/mentions")
-            time.sleep(3)
+            if not self.llm.available:
+                # Mentions stay behind the watermark and get answered once the LLM is back
+                logger.info("🔴 LLM circuit open, leaving mentions for later (%s)", self.llm.format_metrics())
+                return
+            self.navigate("https://twitter.com/notifications/mentions")
+            timing.sleep(3)
             
-            # Use Selenium to find tweets instead of BeautifulSoup for better element handling
-            tweet_elements = self.driver.find_elements(By.CSS_SELECTOR, 'article[data-testid="tweet"]')
+            new_mentions = self.collect_new_mentions()
+            self.mention_tracker.record_backlog(len(new_mentions))
+            
+            if not new_mentions:
+                logger.info("📭 No new mentions since last check")
+                return
+            
+            logger.info("📬 %s new mentions since last check", len(new_mentions))
+            self.classify_records([record for record, _ in new_mentions])
+            prepared = self.prepare_mention_replies(new_mentions) if BATCH_REPLIES else {}
             
             processed_mentions = 0
-            for tweet_element in tweet_elements[:5]:  # Check first 5 mentions
+            # Oldest first, so the watermark only ever moves past mentions we've handled
+            for record, tweet_element in new_mentions:
+                # Limit to 2 replies per cycle to avoid spam - the rest stays in the backlog
+                if processed_mentions >= 2:
+                    logger.info("✅ Processed maximum mentions for this cycle")
+                    break
+                
                 try:
-                    # Extract tweet text and username using Selenium
-                    try:
-                        text_elem = tweet_element.find_element(By.CSS_SELECTOR, '[data-testid="tweetText"]')
-                        mention_text = text_elem.text.strip()
-                    except:
-                        logger.warning("⚠️  Could not extract tweet text from mention")
-                        continue
-                    
-                    try:
-                        # Get the actual tweet author's username - improved accuracy (same as timeline)
-                        tweet_author = None
-                        try:
-                            # Method 1: Most specific - look for the author link in the tweet header area only
-                            username_element = tweet_element.find_element(By.CSS_SELECTOR, '[data-testid="User-Name"] [tabindex="-1"]')
-                            href = username_element.get_attribute('href')
-                            if href and '/' in href and not '/status/' in href:
-                                tweet_author = href.split('/')[-1].split('?')[0]  # Remove query params
-                                if tweet_author and not tweet_author.startswith('status') and len(tweet_author) > 0:
-                                    logger.debug(f"🎯 Mention Method 1 - Found author: @{tweet_author}")
-                        except:
-                            pass
-                        
-                        # Method 2: Alternative header selector - target the profile link specifically
-                        if not tweet_author:
-                            try:
-                                username_element = tweet_element.find_element(By.CSS_SELECTOR, '[data-testid="User-Names"] a[tabindex="-1"]')
-                                href = username_element.get_attribute('href')
-                                if href and '/' in href and not '/status/' in href:
-                                    tweet_author = href.split('/')[-1].split('?')[0]  # Remove query params
-                                    if tweet_author and not tweet_author.startswith('status') and len(tweet_author) > 0:
-                                        logger.debug(f"🎯 Mention Method 2 - Found author: @{tweet_author}")
-                            except:
-                                pass
-                        
-                        # Method 3: Look specifically in the tweet header div (most reliable area)
-                        if not tweet_author:
-                            try:
-                                # Find the tweet header section first
-                                header_section = tweet_element.find_element(By.CSS_SELECTOR, '[data-testid="User-Name"]')
-                                # Then look for the first username link within that header only
-                                username_links = header_section.find_elements(By.CSS_SELECTOR, 'a[href^="/"]')
-                                
-                                for link in username_links[:1]:  # Only check the first link in header
-                                    href = link.get_attribute('href')
-                                    if (href and '/' in href and 
-                                        not '/status/' in href and 
-                                        not '/notifications' in href and 
-                                        not '/messages' in href and
-                                        not '/home' in href and
-                                        not '/search' in href):
-                                        
-                                        potential_author = href.split('/')[-1].split('?')[0]  # Remove query params
-                                        if (potential_author and 
-                                            not potential_author.startswith('status') and
-                                            len(potential_author) > 0 and
-                                            not potential_author in ['i', 'compose', 'settings']):
-                                            
-                                            tweet_author = potential_author
-                                            logger.debug(f"🎯 Mention Method 3 - Found author: @{tweet_author}")
-                                            break
-                            except:
-                                pass
-                        
-                        # Method 4: Fallback - look for span with username format @username in header area
-                        if not tweet_author:
-                            try:
-                                header_section = tweet_element.find_element(By.CSS_SELECTOR, '[data-testid="User-Names"]')
-                                username_spans = header_section.find_elements(By.TAG_NAME, 'span')
-                                for span in username_spans:
-                                    text = span.text.strip()
-                                    if text.startswith('@') and len(text) > 1:
-                                        tweet_author = text[1:]  # Remove @ symbol
-                                        logger.debug(f"🎯 Mention Method 4 - Found author from @text: @{tweet_author}")
-                                        break
-                            except:
-                                pass
-                        
-                        if not tweet_author:
-                            logger.warning("⚠️  Could not extract username from mention")
-                            continue
-                        
-                        username = tweet_author
-                        
-                        # Don't reply to our own mentions (but do process mentions of us)
-                        if username.lower() == TWITTER_USERNAME.lower():
-                            logger.info(f"🚫 Skipping mention from ourselves: @{username}")
-                            continue
-                        
-                        # Create unique identifier for this mention to prevent duplicate replies
-                        mention_id = f"mention:{username}:{hash(mention_text[:100])}"
-                        
-                        # Skip if we've already replied to this mention
-                        if mention_id in self.engaged_tweets:
-                            logger.info(f"🔄 Already replied to @{username}'s mention: {mention_text[:30]}...")
-                            continue
-                            
-                    except:
-                        logger.warning("⚠️  Could not extract username from mention")
-                        continue
-                    
-                    logger.info(f"📩 Mention from @{username}: {mention_text[:50]}...")
-                    
-                    # SPAM FILTER - Skip obvious spam mentions
-                    spam_indicators = [
-                        "click here", "follow for follow", "dm me", "check this out",
-                        "free money", "guaranteed profit", "investment opportunity",
-                        "you're in the spotlight", "start your", "limited time"
-                    ]
-                    
-                    if any(spam in mention_text.lower() for spam in spam_indicators):
-                        logger.info(f"🚫 Skipping spam mention from @{username}")
-                        continue
-                    
-                    # Skip mentions that are too short or just @mentions
-                    if len(mention_text.strip()) < 10 or mention_text.strip().startswith('@'):
-                        logger.info(f"🚫 Skipping low-quality mention from @{username}")
-                        continue
-                    
-                    # Check if mention is part of a thread
-                    is_thread = self.is_thread_tweet(tweet_element)
-                    
-                    if is_thread:
-                        logger.info("🧵 Mention is part of a thread!")
-                        thread_content = self.read_thread(tweet_element)
-                        should_engage = self.should_engage_with_thread(thread_content)
-                        content_to_analyze = thread_content
-                    else:
-                        should_engage = self.should_engage(mention_text, username)
-                        content_to_analyze = mention_text
-                    
-                    if should_engage:
-                        # Mark this mention as engaged with BEFORE attempting engagement
-                        self.engaged_tweets.add(mention_id)
-                        
-                        engagement_style = get_engagement_style(content_to_analyze)
-                        
-                        if is_thread:
-                            # Thread-aware mention reply - use actual reply function
-                            reply_content = self.generate_thread_response(thread_content, username, engagement_style)
-                            if reply_content:
-                                # Validate thread reply relevance
-                                if self.validate_reply_relevance(reply_content, thread_content, username):
-                                    # Include @username in the reply content for fallback method
-                                    full_reply = f"@{username} {reply_content}"
-                                    self.post_actual_reply(tweet_element, full_reply)
-                                    logger.info(f"🧵 Replied to thread mention from @{username}")
-                                else:
-                                    logger.warning(f"⚠️ Thread reply not relevant to @{username}, skipping")
-                        else:
-                            # Regular mention reply - use proper reply function with tweet element (already has validation)
-                            self.reply_to_tweet(tweet_element, mention_text, username, engagement_style)
-                            logger.info(f"💬 Replied to mention from @{username}")
-                        
-                        processed_mentions += 1
-                        time.sleep(random.randint(15, 45))
-                        
-                        # Limit to 2 replies per cycle to avoid spam
-                        if processed_mentions >= 2:
-                            logger.info("✅ Processed maximum mentions for this cycle")
-                            break
-            
+                    engaged = self.handle_mention(record, tweet_element, prepared)
                 except Exception as e:
-                    logger.error(f"❌ Error processing mention: {e}")
-                    continue
+                    if self.mention_tracker.record_failure(record.status_id, MENTION_MAX_ATTEMPTS):
+                        # Leave the watermark just before this mention so the next check retries it
+                        logger.error("❌ Error processing mention, retrying it next check: %s", e)
+                        break
+                    logger.error("❌ Error processing mention, giving up after %s attempts: %s", MENTION_MAX_ATTEMPTS, e)
+                    engaged = False
+                log_event("mention", tweet_id=record.tweet_id, status_id=record.status_id, author=record.username,
+                          engaged=engaged, style=record.engagement_style)
+                
+                # Answered, deliberately skipped or given up on - either way it's handled
+                self.mention_tracker.advance(record.status_id)
+                self.mention_tracker.save()
+                if engaged:
+                    processed_mentions += 1
+                    timing.sleep(self.rng.randint(15, 45))
+            
+            logger.info("📊 Mentions: %s", self.mention_tracker.format_metrics())
                     
         except Exception as e:
-            logger.error(f"❌ Error checking mentions: {e}")
+            logger.error("❌ Error checking mentions: %s", e)
+    
+    @timed("extract")
+    def collect_new_mentions(self, max_pages=10):
+        """Page back through the mentions tab until we reach the watermark. Returns (record, element) oldest first."""
+        watermark = self.mention_tracker.watermark
+        found = {}
+        
+        for page in range(max_pages):
+            reached_watermark = False
+            new_on_page = 0
+            
+            for record, tweet_element in self.extract_tweet_records(limit=None, source="mentions"):
+                if record.status_id is None:
+                    continue
+                if not self.mention_tracker.is_new(record.status_id):
+                    reached_watermark = True
+                    continue
+                if record.status_id not in found:
+                    found[record.status_id] = (record, tweet_element)
+                    new_on_page += 1
+            
+            # First run has no watermark - just take the newest page instead of replying to history
+            if watermark is None or reached_watermark or new_on_page == 0:
+                break
+            
+            logger.info("📜 Watermark not reached yet, paging back through mentions (page %s)...", page + 2)
+            self.driver.execute_script("window.scrollBy(0, window.innerHeight * 2);")
+            timing.sleep(2)
+        else:
+            self.mention_tracker.record_truncation(min(found, key=int))
+        
+        new_mentions = [found[status_id] for status_id in sorted(found, key=int)]
+        if watermark is None:
+            new_mentions = new_mentions[-5:]  # Check newest 5 mentions on first run
+        return new_mentions
+    
+    def locate_mention_element(self, record, tweet_element):
+        """Get a live element for a mention, opening its status page if paging left it stale."""
+        tweet_element = self.refresh_tweet_element(record, tweet_element)
+        if tweet_element is not None or record.status_id is None:
+            return tweet_element
+        
+        logger.info("🔗 Opening mention from @%s directly", record.username)
+        self.navigate(f"https://twitter.com/{record.username}/status/{record.status_id}")
+        timing.sleep(3)
+        for candidate in self.driver.find_elements(By.CSS_SELECTOR, 'article[data-testid="tweet"]'):
+            if self.extract_status_info(candidate)[0] == record.status_id:
+                return candidate
+        return None
+    
+    def mention_skip_reason(self, record):
+        """Why a mention gets no reply at all (already answered, spam, too short), or None."""
+        mention_text = record.text
+        
+        # Skip if we've already replied to this mention
+        if self.state.has_engaged(f"mention:{record.username}:{text_fingerprint(mention_text[:100])}"):
+            return "already replied"
+        
+        # SPAM FILTER - Skip obvious spam mentions
+        if self.features_for(record).matches("mention_spam"):
+            return "spam"
+        
+        # Skip mentions that are too short or just @mentions
+        if len(mention_text.strip()) < 10 or mention_text.strip().startswith('@'):
+            return "low-quality"
+        return None
+    
+    def prepare_mention_replies(self, new_mentions, limit=2):
+        """Generate the replies for the mentions this cycle will answer in one batched request.
+        
+        Follows check_mentions: oldest first, up to `limit` engaged mentions. Thread mentions take
+        a slot but are answered with their thread context later, so they aren't batched.
+        """
+        batch = []
+        slots = 0
+        for record, _ in new_mentions:
+            if slots >= limit:
+                break
+            if (self.mention_skip_reason(record) or not record.engage or
+                    self.state.is_blacklisted(record.username)):
+                continue
+            slots += 1
+            if not record.is_thread:
+                tweet = self.features_for(record)
+                batch.append((record.tweet_id, record.username, tweet,
+                              record.engagement_style or get_engagement_style(tweet, rng=self.rng)))
+        if len(batch) < 2:
+            return {}
+        return self.prepare_replies(batch)
+    
+    def handle_mention(self, record, tweet_element, prepared=None):
+        """Decide on and reply to a single mention. Returns True if we engaged.
+        
+        Raises if a reply was decided on but couldn't be posted, so the caller can retry the mention.
+        
+        prepared: {tweet_id: reply} from prepare_mention_replies, used instead of generating here.
+        """
+        username = record.username
+        mention_text = record.text
+        
+        # Create unique identifier for this mention to prevent duplicate replies
+        mention_id = f"mention:{username}:{text_fingerprint(mention_text[:100])}"
+        
+        skip_reason = self.mention_skip_reason(record)
+        if skip_reason == "already replied":
+            logger.info("🔄 Already replied to @%s's mention: %s...", username, mention_text[:30])
+            return False
+        
+        logger.info("📩 Mention from @%s: %s...", username, mention_text[:50])
+        
+        if skip_reason:
+            logger.info("🚫 Skipping %s mention from @%s", skip_reason, username)
+            return False
+        
+        # Check if mention is part of a thread
+        is_thread = has_thread_marker(mention_text) or self.is_thread_tweet(tweet_element)
+        
+        if is_thread:
+            logger.info("🧵 Mention is part of a thread!")
+            thread_content = self.read_thread(record)
+            should_engage = self.should_engage_with_thread(thread_content)
+            content_to_analyze = thread_content
+        else:
+            content_to_analyze = self.features_for(record)
+            should_engage = self.should_engage(content_to_analyze, username, decision=record.engage)
+        
+        if not should_engage:
+            return False
+        
+        # Mark this mention as engaged with BEFORE attempting engagement
+        self.state.record_engagement(mention_id, username, "mention")
+        
+        try:
+            if is_thread or record.engagement_style is None:
+                engagement_style = get_engagement_style(content_to_analyze, rng=self.rng)
+            else:
+                engagement_style = record.engagement_style
+        
+            if is_thread:
+                # Thread-aware mention reply
+                full_reply = None
+                reply_content = self.generate_thread_response(thread_content, username, engagement_style)
+                if reply_content:
+                    # Validate thread reply relevance
+                    if self.validate_reply_relevance(reply_content, thread_content, username):
+                        full_reply = f"@{username} {reply_content}"
+                    else:
+                        logger.warning("⚠️ Thread reply not relevant to @%s, skipping", username)
+            elif prepared and record.tweet_id in prepared:
+                full_reply = prepared[record.tweet_id]  # Generated with the other mentions of this cycle
+            else:
+                # Regular mention reply (prepare_reply already validates relevance)
+                full_reply = self.prepare_reply(content_to_analyze, username, engagement_style)
+        
+            if full_reply:
+                # Generation can take a while - make sure the element is still usable before posting
+                tweet_element = self.locate_mention_element(record, tweet_element)
+                if tweet_element is None:
+                    raise RuntimeError(f"could not find the mention from @{username} anymore")
+                if not self.post_actual_reply(tweet_element, full_reply):
+                    self.count_action("mention_reply", False)
+                    raise RuntimeError(f"reply to @{username}'s mention was not posted")
+                self.count_action("mention_reply", True)
+                self.mention_tracker.record_response(record.created_at)
+                logger.info("💬 Replied to mention from @%s", username)
+        
+        except Exception:
+            self.state.forget_engagement(mention_id)  # Not answered - the retry on the next check may reply
+            raise
+        
+        return True
     
     def create_original_tweet(self):
         """Generate and post a single original tweet using personality system."""
@@ -1713,11 +2155,13 @@ class IntelligentTwitterBot:
             logger.info("🐦 Creating single original tweet...")
             
             # Use personality system for single tweet generation
-            prompt = get_random_tweet_prompt()
+            prompt = get_random_tweet_prompt(rng=self.rng)
             content = self.generate_content(prompt, "original tweet")
             
             if content:
-                return self.post_tweet(content)
+                posted = self.post_tweet(content)
+                self.count_action("post", posted)
+                return posted
             return False
             
         except Exception as e:
@@ -1725,67 +2169,81 @@ class IntelligentTwitterBot:
             return False
     
     def cleanup_engagement_history(self):
-        """Clean up old engagement history to prevent memory bloat."""
-        if len(self.engaged_tweets) > 1000:  # If we have more than 1000 engaged tweets
-            # Keep only the most recent 500 to prevent duplicate engagement in current session
-            # but allow re-engagement with very old tweets
-            logger.info(f"🧹 Cleaning up engagement history: {len(self.engaged_tweets)} -> 500")
-            # Convert to list, keep last 500, convert back to set
-            recent_engagements = list(self.engaged_tweets)[-500:]
-            self.engaged_tweets = set(recent_engagements)
+        """Flush buffered engagements and drop very old ones so they can be engaged with again."""
+        self.state.flush()
+        self.state.compact(max_age_days=ENGAGEMENT_RETENTION_DAYS)
             
-    def run_intelligent_cycle(self):
-        """Run one cycle of intelligent bot behavior - focused on engagement."""
-        logger.info("🔄 Starting intelligent cycle...")
+    def build_scheduler(self):
+        """Set up the recurring tasks - interval (s), deadline (s) and priority (lower runs first)."""
+        scheduler = TaskScheduler(min_gap=(20, 60), rng=self.rng)  # Human-like pause between consecutive tasks
         
-        # Clean up engagement history periodically
+        # Mentions are the most time-sensitive - poll often and answer quickly
+        scheduler.add(ScheduledTask("mentions", self.as_cycle("mentions", self.check_mentions),
+                                    interval=(240, 480), deadline=120, priority=0, first_run=0))
+        # Scroll and engage a few times an hour, alternating tabs
+        scheduler.add(ScheduledTask("timeline", self.as_cycle("timeline", self.run_timeline_pass),
+                                    interval=(900, 1800), deadline=600, priority=1, first_run=60))
+        # Original tweets stay rare - the mood check still decides when the slot comes up
+        scheduler.add(ScheduledTask("tweet", self.as_cycle("tweet", self.maybe_create_original_tweet),
+                                    interval=(3 * 3600, 6 * 3600), deadline=1800, priority=2, first_run=3 * 3600))
+        # Bio updates are very rare - should_update_bio() gates the actual update
+        scheduler.add(ScheduledTask("bio", self.as_cycle("bio", self.maybe_update_bio),
+                                    interval=(3 * 3600, 8 * 3600), deadline=3600, priority=3, first_run=6 * 3600))
+        scheduler.add(ScheduledTask("maintenance", self.as_cycle("maintenance", self.run_maintenance),
+                                    interval=(600, 900), deadline=600, priority=4, first_run=600))
+        # New followers show up at the top of the list - a cheap incremental crawl picks them up
+        scheduler.add(ScheduledTask("followers", self.as_cycle("followers", self.get_followers),
+                                    interval=(FOLLOWERS_REFRESH_HOURS * 3600, FOLLOWERS_REFRESH_HOURS * 1.5 * 3600),
+                                    deadline=3600, priority=4, first_run=FOLLOWERS_REFRESH_HOURS * 3600))
+        # Runs between the other tasks, so a recycle never lands mid-pass
+        scheduler.add(ScheduledTask("browser", self.as_cycle("browser", self.check_browser),
+                                    interval=(300, 600), deadline=600, priority=5, first_run=300))
+        return scheduler
+    
+    def as_cycle(self, name, fn):
+        """Wrap a scheduled task so each run gets a per-phase timing breakdown."""
+        def run_cycle():
+            with timing.cycle(name):
+                return fn()
+        return run_cycle
+    
+    def run_timeline_pass(self):
+        """Scheduled task: scroll one of the tabs and engage."""
+        tab = self.rng.choice(["home", "following"])
+        logger.info(f"📱 Scrolling and engaging with others on {tab.upper()} tab...")
+        self.scroll_and_engage(tab=tab)
+    
+    def maybe_create_original_tweet(self):
+        """Scheduled task: post an original tweet if the mood is right."""
+        if self.should_tweet_now():
+            self.create_original_tweet()
+    
+    def maybe_update_bio(self):
+        """Scheduled task: update the bio when it is eligible."""
+        if self.should_update_bio():
+            self.update_bio()
+    
+    def run_maintenance(self):
+        """Scheduled task: housekeeping and metrics."""
         self.cleanup_engagement_history()
-        
-        # Randomly choose what to do - MUCH more selective to reduce API calls
-        actions = []
-        
-        # Tweet extremely rarely (only 5% of the time)
-        if self.should_tweet_now() and random.random() < 0.05:
-            actions.append("tweet")
-        
-        # Check mentions even less frequently
-        if random.random() < 0.2:  # 20% chance (was 40%)
-            actions.append("mentions")
-        
-        # Scroll and engage much less frequently
-        if random.random() < 0.4:  # 40% chance (was 70%)
-            tab_choice = random.choice(["home", "following"])
-            actions.append(("engage", tab_choice))
-        
-        # Update bio extremely rarely
-        if self.should_update_bio() and random.random() < 0.1:  # Only 10% of the time when eligible
-            actions.append("bio")
-        
-        # Execute chosen actions
-        for action in actions:
-            try:
-                if action == "tweet":
-                    logger.info("🐦 Creating single original tweet...")
-                    self.create_original_tweet()
-                    time.sleep(random.randint(120, 300))  # Much longer wait after tweeting (2-5 minutes)
-                elif action == "mentions":
-                    logger.info("🔔 Checking mentions...")
-                    self.check_mentions()
-                    time.sleep(random.randint(60, 120))  # Much longer wait after checking mentions (1-2 minutes)
-                elif isinstance(action, tuple) and action[0] == "engage":
-                    tab = action[1]
-                    logger.info(f"📱 Scrolling and engaging with others on {tab.upper()} tab...")
-                    self.scroll_and_engage(tab=tab)
-                    # No wait - continuous scrolling
-                elif action == "bio":
-                    logger.info("📝 Updating bio...")
-                    self.update_bio()
-                    time.sleep(random.randint(60, 180))  # Much longer wait after bio update (1-3 minutes)
-                    
-            except Exception as e:
-                logger.error(f"❌ Error in action {action}: {e}")
-        
-        logger.info("✅ Cycle completed")
+        logger.info(f"📊 Scheduler: {self.scheduler.format_metrics()}")
+        logger.info(f"📊 LLM input tokens: {self.token_ledger.format_metrics()}")
+        logger.info(f"📊 LLM calls: {self.llm.format_metrics()}")
+        logger.info(f"📊 State store: {self.state.format_metrics()}")
+        logger.info(f"📊 Browser: {self.watchdog.format_metrics()}")
+        logger.info(f"📊 WebDriver: {self.commands.format_metrics()}")
+        logger.info(f"📊 Conversations: {self.conversations.cache.format_metrics()}")
+        logger.info(f"📊 Keywords: {self.keywords.format_metrics()}")
+        logger.info(f"📊 Text features: {self.text_features.format_metrics()}")
+        logger.info(f"📊 Phase timings:\n{timing.TIMINGS.format_metrics()}")
+    
+    def run_intelligent_cycle(self):
+        """Run one cycle of intelligent bot behavior - every task that is currently due."""
+        logger.info("🔄 Starting intelligent cycle...")
+        with timing.cycle("intelligent_cycle"):
+            ran = self.scheduler.run_pending()
+        logger.info(f"✅ Cycle completed ({ran} tasks run)")
+        return ran
     
     def run(self):
         """Main function to run the intelligent bot."""
@@ -1801,6 +2259,9 @@ class IntelligentTwitterBot:
             return
         
         try:
+            if CONTROL_ADDRESS:
+                self.control_server = ControlServer(self, CONTROL_ADDRESS).start()
+            
             # Set up browser and login
             self.setup_driver()
             self.login_to_twitter()
@@ -1809,8 +2270,12 @@ class IntelligentTwitterBot:
                 logger.error("❌ Failed to log in to Twitter")
                 return
             
-            # Get initial followers
-            self.get_followers()
+            # Only re-crawl followers when the stored list is missing or stale
+            followers_age = self.state.followers_age()
+            if followers_age is None or followers_age > FOLLOWERS_REFRESH_HOURS * 3600:
+                self.get_followers()
+            else:
+                logger.info(f"👥 Using {len(self.followers)} stored followers ({followers_age / 3600:.1f}h old)")
             
             # Post initial tweet
             logger.info("🎯 Posting initial tweet...")
@@ -1820,95 +2285,61 @@ class IntelligentTwitterBot:
             logger.info("🔄 Starting continuous behavior loop...")
             while True:
                 try:
-                    # Run intelligent cycle immediately - no waiting
-                    self.run_intelligent_cycle()
-                    
-                    # Very long pause to be extremely chill and natural
-                    time.sleep(random.randint(300, 900))  # 5-15 minutes between cycles
+                    # Run tasks as they come due and idle only until the next one (pause/drain apply between tasks)
+                    self.scheduler.run_forever(stop_event=self.control.stop_event, checkpoint=self.control.checkpoint)
+                    if self.control.mode == "draining":
+                        logger.info("🛑 Drained - current task finished, shutting down")
+                    break
                     
                 except KeyboardInterrupt:
                     logger.info("👋 Bot stopped by user")
                     break
                 except Exception as e:
                     logger.error(f"❌ Error in main loop: {e}")
-                    time.sleep(10)  # Brief wait before retrying
+                    timing.sleep(10)  # Brief wait before retrying
                     
         except Exception as e:
             logger.error(f"❌ Fatal error: {e}")
         finally:
+            if self.control_server:
+                self.control_server.stop()
+            self.pipeline.stop()
+            self.state.close()
             if self.driver:
-                self.driver.quit()
-                logger.info("🖥 Browser closed")
-
-    def read_thread(self, tweet_element):
-        """Read the full thread context for better responses."""
-        try:
-            logger.info("📖 Reading thread context...")
-            
-            # Find thread indicators
-            thread_context = []
-            
-            # Get the main tweet text
-            text_elem = tweet_element.find('div', {'data-testid': 'tweetText'})
-            if text_elem:
-                main_tweet = text_elem.get_text(strip=True)
-                thread_context.append(main_tweet)
-            
-            # Look for "Show this thread" or thread continuation indicators
-            thread_indicators = tweet_element.find_all(string=lambda text: text and 
-                any(indicator in text.lower() for indicator in 
-                    ["show this thread", "thread", "1/", "2/", "3/", "🧵"]))
-            
-            if thread_indicators:
-                logger.info("🧵 Thread detected, reading full context...")
-                
-                # Try to click "Show this thread" if available
                 try:
-                    show_thread_link = tweet_element.find('a', string=lambda text: 
-                        text and "show this thread" in text.lower())
-                    if show_thread_link:
-                        # In a real implementation, we'd click and read the full thread
-                        logger.info("🔗 Would click 'Show this thread' link")
-                except:
-                    pass
-                
-                # For now, we'll simulate reading a thread by looking at nearby tweets
-                # In a real implementation, this would navigate to the full thread
-                
-            return " ".join(thread_context) if len(thread_context) > 1 else thread_context[0] if thread_context else ""
-            
-        except Exception as e:
-            logger.error(f"❌ Error reading thread: {e}")
-            return ""
+                    self.driver.quit()
+                    logger.info("🖥 Browser closed")
+                except Exception as e:
+                    logger.error(f"❌ Error closing the browser: {e}")
+            stop_logging()  # Last, so the shutdown messages above still reach the log
+
+    def read_thread(self, record):
+        """Full conversation context (parent chain, root, the author's self-replies) for a tweet record."""
+        if not record.status_id:
+            return record.text
+        logger.info("📖 Reading thread context...")
+        conversation = self.conversations.get(self.driver, record.username, record.status_id)
+        if conversation is None:
+            return record.text
+        return conversation.context_text() or record.text
     
     def is_thread_tweet(self, tweet_element):
-        """Check if a tweet is part of a thread."""
+        """Check if a tweet element shows a "Show this thread" link (see has_thread_marker for the text)."""
         try:
-            # Look for thread indicators
-            tweet_html = str(tweet_element)
-            thread_indicators = [
-                "show this thread",
-                "🧵",
-                "/",  # Like "1/5", "2/10"
-                "thread",
-                "continue reading",
-                "read more"
-            ]
-            
-            return any(indicator in tweet_html.lower() for indicator in thread_indicators)
-            
+            return bool(self.driver.execute_script(THREAD_MARKER_SCRIPT, tweet_element))
         except Exception as e:
             logger.error(f"❌ Error checking if thread: {e}")
             return False
     
-    def should_engage_with_thread(self, thread_content):
+    def should_engage_with_thread(self, thread_content, decision=None):
         """Decide if we should engage with a thread based on full context."""
         # Use personality system but consider full thread context
-        should_engage = should_engage_with_content(thread_content)
+        thread = text_features(thread_content)
+        should_engage = decision if decision is not None else should_engage_with_content(thread, rng=self.rng)
         
         # Threads often have more context, so be slightly more likely to engage
-        if should_engage and len(thread_content) > 200:  # Long threads
-            boost_chance = random.random() < 0.3  # 30% boost
+        if should_engage and len(thread.text) > 200:  # Long threads
+            boost_chance = self.rng.random() < 0.3  # 30% boost
             if boost_chance:
                 logger.info("🧵 Thread engagement boost applied")
                 return True
@@ -1921,16 +2352,7 @@ class IntelligentTwitterBot:
             logger.info(f"🧵 Generating thread response to @{username}")
             
             # Different prompts based on engagement style and thread nature
-            if engagement_style == "tech":
-                prompt = f"Reply to @{username}'s tech thread: '{thread_content}' - share your knowledge or experience casually considering the full context"
-            elif engagement_style == "curious":
-                prompt = f"Reply to @{username}'s thread: '{thread_content}' - ask a follow-up question or show interest in the thread topic"
-            elif engagement_style == "funny":
-                prompt = f"Reply to @{username}'s thread: '{thread_content}' - be playful and engaging, considering the full thread context"
-            elif engagement_style == "disagreement":
-                prompt = f"Reply to @{username}'s thread: '{thread_content}' - politely offer a different perspective on the thread topic"
-            else:
-                prompt = f"Reply to @{username}'s thread: '{thread_content}' - engage naturally and conversationally with the full thread context"
+            prompt = prompts.thread_reply_prompt(username, thread_content, engagement_style)
             
             return self.generate_content(prompt, "thread reply")
             
@@ -1943,7 +2365,7 @@ class IntelligentTwitterBot:
         try:
             logger.info("🧵 Continuing thread...")
             
-            prompt = f"Add your thoughts to this thread: '{original_tweet_content}'. Be conversational and engaging. Share your perspective or ask a follow-up question."
+            prompt = prompts.thread_continuation_prompt(original_tweet_content)
             
             continuation = self.generate_content(prompt, "thread continuation")
             
@@ -1972,8 +2394,8 @@ class IntelligentTwitterBot:
             
             # STRATEGY 1: Go to our profile to find the latest tweet
             logger.info("📱 Going to profile to find latest tweet...")
-            self.driver.get(f"https://twitter.com/{TWITTER_USERNAME}")
-            time.sleep(4)
+            self.navigate(f"https://twitter.com/{TWITTER_USERNAME}")
+            timing.sleep(4)
             
             # Find our latest tweet on our profile
             tweet_elements = self.driver.find_elements(By.CSS_SELECTOR, 'article[data-testid="tweet"]')
@@ -1985,12 +2407,12 @@ class IntelligentTwitterBot:
                 try:
                     # Scroll to the tweet and use JavaScript click
                     self.driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", latest_tweet)
-                    time.sleep(2)
+                    timing.sleep(2)
                     
                     # Find the reply button and use JavaScript click to avoid interception
                     reply_button = latest_tweet.find_element(By.CSS_SELECTOR, '[data-testid="reply"]')
                     self.driver.execute_script("arguments[0].click();", reply_button)
-                    time.sleep(3)
+                    timing.sleep(3)
                     
                     # Find the reply textarea with multiple strategies
                     reply_textarea = None
@@ -2016,10 +2438,10 @@ class IntelligentTwitterBot:
                     
                     # Type the content
                     reply_textarea.click()
-                    time.sleep(1)
+                    timing.sleep(1)
                     reply_textarea.clear()
                     reply_textarea.send_keys(content)
-                    time.sleep(2)
+                    timing.sleep(2)
                     
                     # Find and click post button
                     post_button = None
@@ -2045,7 +2467,7 @@ class IntelligentTwitterBot:
                     
                     post_button.click()
                     logger.info("✅ Reply to own tweet posted successfully!")
-                    time.sleep(3)
+                    timing.sleep(3)
                     return True
                     
                 except Exception as profile_e:
@@ -2066,7 +2488,7 @@ class IntelligentTwitterBot:
             
             # Add thread-like indicators to make it feel connected
             thread_indicators = ["Also,", "Plus,", "And", "Another thing:", "Speaking of which,"]
-            indicator = random.choice(thread_indicators)
+            indicator = self.rng.choice(thread_indicators)
             
             threaded_content = f"{indicator} {content}"
             
@@ -2076,8 +2498,44 @@ class IntelligentTwitterBot:
             logger.error(f"❌ Error in compose fallback: {e}")
             return False
 
-def main():
-    bot = IntelligentTwitterBot()
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Baggy Moonz Twitter Bot")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="run live but record likes/replies/retweets/follows/posts instead of performing them")
+    parser.add_argument("--simulate", action="store_true",
+                        help="dry-run fixture tweets through the full pipeline offline with the mock LLM")
+    parser.add_argument("--tweets", type=int, default=500, help="simulate: number of fixture tweets")
+    parser.add_argument("--llm-latency", type=float, default=0.0, help="simulate: mock LLM seconds per call")
+    parser.add_argument("--profile", action="store_true",
+                        help="replay fixture tweets offline under cProfile/tracemalloc instead of running the bot")
+    parser.add_argument("--cycles", type=int, default=20, help="profile: number of replay cycles")
+    parser.add_argument("--batch", type=int, default=8, help="profile/soak/simulate: fixture tweets per cycle")
+    parser.add_argument("--report", help="profile: also write the report here (and cProfile stats next to it)")
+    parser.add_argument("--soak", action="store_true",
+                        help="replay fixture tweets offline for --cycles cycles and chart memory over time")
+    parser.add_argument("--csv", help="soak: also write the memory samples here")
+    parser.add_argument("--chart-events", metavar="EVENTS_FILE",
+                        help="chart browser memory from the browser_memory events of a live run")
+    args = parser.parse_args(argv)
+    
+    if args.simulate:
+        from simulation import run_simulation
+        print(run_simulation(IntelligentTwitterBot, tweets=args.tweets, batch=args.batch, llm_latency=args.llm_latency))
+        return
+    if args.profile:
+        from profiling import run_profile
+        print(run_profile(IntelligentTwitterBot, cycles=args.cycles, batch=args.batch, report_path=args.report))
+        return
+    if args.soak:
+        from profiling import run_soak
+        print(run_soak(IntelligentTwitterBot, cycles=args.cycles, batch=args.batch, csv_path=args.csv))
+        return
+    if args.chart_events:
+        from profiling import chart_events
+        print(chart_events(args.chart_events))
+        return
+    
+    bot = IntelligentTwitterBot(dry_run=args.dry_run)
     bot.run()
 
 if __name__ == "__main__":
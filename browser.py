@@ -0,0 +1,196 @@
+"""
+Browser memory watchdog for Baggy Moonz Twitter Bot
+Samples the RSS of chromedriver and every Chrome process under it (from /proc) plus the
+renderer's JS heap and DOM size (CDP Performance.getMetrics). When memory or session age
+crosses a limit the bot recycles the driver between cycles, carrying the session cookies
+over so the new browser is still logged in. CommandCounter counts the WebDriver commands
+the bot sends, by command name.
+"""
+import os
+import time
+import logging
+from collections import deque
+from urllib.parse import urlsplit
+
+from logs import log_event
+
+logger = logging.getLogger("BaggyMoonz")
+
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+CDP_METRICS = ("JSHeapUsedSize", "JSHeapTotalSize", "Nodes", "Documents", "JSEventListeners")
+
+
+def process_rss(pid):
+    """Resident set size of one process in bytes (None if it's gone or /proc isn't available)."""
+    try:
+        with open(f"/proc/{pid}/statm") as f:
+            return int(f.read().split()[1]) * PAGE_SIZE
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def child_pids():
+    """{parent pid: [child pids]} for every process visible in /proc."""
+    children = {}
+    try:
+        entries = os.listdir("/proc")
+    except OSError:
+        return children
+    for entry in entries:
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                stat = f.read()
+        except OSError:
+            continue
+        # The command name may contain spaces/parens - fields resume after the last ')'
+        fields = stat[stat.rfind(")") + 2:].split()
+        if len(fields) > 1:
+            children.setdefault(int(fields[1]), []).append(int(entry))
+    return children
+
+
+def process_tree_rss(root_pid):
+    """(total RSS bytes, process count) for root_pid and all its descendants."""
+    if process_rss(root_pid) is None:
+        return None, 0
+    children = child_pids()
+    total, count, stack = 0, 0, [root_pid]
+    while stack:
+        pid = stack.pop()
+        rss = process_rss(pid)
+        if rss is None:
+            continue
+        total += rss
+        count += 1
+        stack.extend(children.get(pid, ()))
+    return total, count
+
+
+def driver_pid(driver):
+    """PID of the chromedriver process Selenium started (Chrome runs as its descendants)."""
+    process = getattr(getattr(driver, "service", None), "process", None)
+    return getattr(process, "pid", None)
+
+
+class BrowserWatchdog:
+    """Tracks browser memory and age, and says when the driver should be recycled."""
+
+    def __init__(self, max_rss_mb=1500, max_heap_mb=400, max_nodes=150000, max_age_hours=6, history=500):
+        self.max_rss = max_rss_mb * 1024 * 1024
+        self.max_heap = max_heap_mb * 1024 * 1024
+        self.max_nodes = max_nodes
+        self.max_age = max_age_hours * 3600
+        self.started_at = time.time()
+        self.samples = deque(maxlen=history)
+        self.recycles = 0
+        self._cdp_enabled = False
+
+    def reset(self):
+        """A fresh driver was started."""
+        self.started_at = time.time()
+        self._cdp_enabled = False
+
+    def page_metrics(self, driver):
+        """Renderer metrics from CDP (empty when the driver doesn't support it)."""
+        try:
+            if not self._cdp_enabled:
+                driver.execute_cdp_cmd("Performance.enable", {})
+                self._cdp_enabled = True
+            result = driver.execute_cdp_cmd("Performance.getMetrics", {})
+        except Exception as e:
+            logger.debug(f"CDP metrics unavailable: {e}")
+            return {}
+        return {metric["name"]: metric["value"] for metric in result.get("metrics", []) if metric["name"] in CDP_METRICS}
+
+    def sample(self, driver):
+        """Take one memory sample of the running browser."""
+        pid = driver_pid(driver)
+        rss, processes = process_tree_rss(pid) if pid else (None, 0)
+        page = self.page_metrics(driver)
+        sample = {
+            "ts": time.time(),
+            "age_s": round(time.time() - self.started_at),
+            "rss_mb": round(rss / 1024 / 1024, 1) if rss is not None else None,
+            "processes": processes,
+            "heap_mb": round(page["JSHeapUsedSize"] / 1024 / 1024, 1) if "JSHeapUsedSize" in page else None,
+            "heap_total_mb": round(page["JSHeapTotalSize"] / 1024 / 1024, 1) if "JSHeapTotalSize" in page else None,
+            "nodes": int(page["Nodes"]) if "Nodes" in page else None,
+            "listeners": int(page["JSEventListeners"]) if "JSEventListeners" in page else None,
+        }
+        self.samples.append(sample)
+        log_event("browser_memory", **sample)
+        return sample
+
+    def recycle_reason(self, sample):
+        """Why the browser should be restarted, or None if it's fine."""
+        if sample["rss_mb"] is not None and sample["rss_mb"] * 1024 * 1024 > self.max_rss:
+            return f"RSS {sample['rss_mb']:.0f}MB over {self.max_rss / 1024 / 1024:.0f}MB"
+        if sample["heap_mb"] is not None and sample["heap_mb"] * 1024 * 1024 > self.max_heap:
+            return f"JS heap {sample['heap_mb']:.0f}MB over {self.max_heap / 1024 / 1024:.0f}MB"
+        if sample["nodes"] is not None and sample["nodes"] > self.max_nodes:
+            return f"{sample['nodes']} DOM nodes over {self.max_nodes}"
+        if sample["age_s"] > self.max_age:
+            return f"session age {sample['age_s'] / 3600:.1f}h over {self.max_age / 3600:.0f}h"
+        return None
+
+    def format_metrics(self):
+        """One-line summary of the latest sample."""
+        if not self.samples:
+            return "no samples"
+        s = self.samples[-1]
+        return (f"rss={s['rss_mb']}MB ({s['processes']} procs) heap={s['heap_mb']}MB nodes={s['nodes']} "
+                f"age={s['age_s'] / 3600:.1f}h recycles={self.recycles}")
+
+
+class CommandCounter:
+    """Counts WebDriver commands by name by wrapping the driver's execute() (every command goes through it)."""
+
+    def __init__(self):
+        self.counts = {}
+
+    def attach(self, driver):
+        execute = driver.execute
+        counts = self.counts
+
+        def counted_execute(driver_command, params=None):
+            counts[driver_command] = counts.get(driver_command, 0) + 1
+            return execute(driver_command, params)
+
+        driver.execute = counted_execute
+        return driver
+
+    def format_metrics(self):
+        total = sum(self.counts.values())
+        top = sorted(self.counts.items(), key=lambda item: -item[1])[:5]
+        return f"commands={total} " + " ".join(f"{name}={count}" for name, count in top)
+
+
+def capture_session(driver):
+    """Cookies and location of the current session, to restore in a new browser."""
+    return {"url": driver.current_url, "cookies": driver.get_cookies()}
+
+
+def restore_session(driver, session):
+    """Load saved cookies into a fresh driver and reopen the page it was on.
+
+    Cookies can only be set for the domain that is currently loaded, so the site's origin
+    is opened first.
+    """
+    parts = urlsplit(session["url"])
+    driver.get(f"{parts.scheme}://{parts.netloc}/")
+    restored = 0
+    for cookie in session["cookies"]:
+        cookie = dict(cookie)
+        if "expiry" in cookie:
+            cookie["expiry"] = int(cookie["expiry"])
+        if cookie.get("sameSite") not in (None, "Strict", "Lax", "None"):
+            cookie.pop("sameSite")
+        try:
+            driver.add_cookie(cookie)
+            restored += 1
+        except Exception as e:
+            logger.debug(f"Skipped cookie {cookie.get('name')}: {e}")
+    driver.get(session["url"])
+    return restored
@@ -0,0 +1,283 @@
+"""
+Control endpoint for Baggy Moonz Twitter Bot
+A small HTTP server on a background thread, bound to localhost or a Unix socket, that a
+running bot can leave on: it does nothing until asked, and each request only reads the
+counters the bot keeps anyway.
+
+    GET  /metrics   OpenMetrics text: task runs, tweets evaluated, actions, LLM calls, tokens
+                    and latency, phase timings, WebDriver commands, browser memory
+    GET  /status    JSON: run state, current and next task, LLM circuit breakers, pipeline
+    POST /pause     hold the main loop at the next safe point (between scheduled tasks)
+    POST /resume    carry on after a pause
+    POST /drain     finish the task in progress, then shut down cleanly
+
+Usage:
+    CONTROL_ADDRESS=127.0.0.1:8787 python bot.py
+    curl -s localhost:8787/status
+    curl -s --unix-socket /tmp/baggy.sock -X POST http://bot/pause   (CONTROL_ADDRESS=unix:/tmp/baggy.sock)
+"""
+import os
+import json
+import time
+import logging
+import threading
+import socketserver
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import timing
+
+logger = logging.getLogger("BaggyMoonz")
+
+OPENMETRICS_CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+
+
+class BotControl:
+    """Pause/resume/drain requests, applied by the main loop when it reaches a safe point."""
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self.stop_event = threading.Event()  # Wakes the scheduler's idle wait on drain
+        self.mode = "running"  # running, paused or draining
+        self.holding = False  # The main loop is parked at a safe point right now
+        self.changed_at = time.time()
+
+    def command(self, name):
+        """Apply pause/resume/drain; returns the resulting state (ValueError for anything else)."""
+        with self._cond:
+            if name == "pause":
+                if self.mode == "running":
+                    self._set("paused")
+            elif name == "resume":
+                if self.mode == "paused":
+                    self._set("running")
+            elif name == "drain":
+                if self.mode != "draining":
+                    self._set("draining")
+                    self.stop_event.set()
+            else:
+                raise ValueError(f"unknown command {name!r}")
+            self._cond.notify_all()
+            return self.state()
+
+    def _set(self, mode):
+        logger.info(f"🎛️ Control: {self.mode} -> {mode}")
+        self.mode = mode
+        self.changed_at = time.time()
+
+    def checkpoint(self):
+        """Called by the main loop between tasks: blocks while paused, False once draining."""
+        with self._cond:
+            while self.mode == "paused":
+                self.holding = True
+                self._cond.wait()
+            self.holding = False
+            return self.mode != "draining"
+
+    def state(self):
+        return {"mode": self.mode, "holding": self.holding, "since": round(self.changed_at, 3)}
+
+
+def _label_value(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_label_value(value)}"' for key, value in labels.items()) + "}"
+
+
+def _number(value):
+    if value == float("inf"):
+        return "+Inf"
+    if isinstance(value, float):
+        return repr(round(value, 6))
+    return str(int(value))
+
+
+class MetricsWriter:
+    """Builds an OpenMetrics text exposition, one metric family at a time."""
+
+    def __init__(self, prefix="baggy_"):
+        self.prefix = prefix
+        self.lines = []
+
+    def _family(self, name, kind, help_text):
+        self.lines.append(f"# TYPE {self.prefix}{name} {kind}")
+        self.lines.append(f"# HELP {self.prefix}{name} {help_text}")
+
+    def counter(self, name, help_text, samples):
+        """samples: [(labels dict, value)]; the _total suffix is added here."""
+        self._family(name, "counter", help_text)
+        for labels, value in samples:
+            self.lines.append(f"{self.prefix}{name}_total{_labels(labels)} {_number(value)}")
+
+    def gauge(self, name, help_text, samples):
+        samples = [(labels, value) for labels, value in samples if value is not None]
+        self._family(name, "gauge", help_text)
+        for labels, value in samples:
+            self.lines.append(f"{self.prefix}{name}{_labels(labels)} {_number(value)}")
+
+    def histogram(self, name, help_text, samples):
+        """samples: [(labels dict, cumulative [(le, count)] ending at +Inf, sum)]."""
+        self._family(name, "histogram", help_text)
+        for labels, buckets, total in samples:
+            for bound, count in buckets:
+                self.lines.append(f"{self.prefix}{name}_bucket{_labels({**labels, 'le': _number(float(bound))})} {count}")
+            self.lines.append(f"{self.prefix}{name}_count{_labels(labels)} {buckets[-1][1] if buckets else 0}")
+            self.lines.append(f"{self.prefix}{name}_sum{_labels(labels)} {_number(float(total))}")
+
+    def text(self):
+        return "\n".join(self.lines + ["# EOF"]) + "\n"
+
+
+def render_metrics(bot):
+    """OpenMetrics text for the bot's counters and histograms."""
+    out = MetricsWriter()
+    scheduler = bot.scheduler.metrics()
+    out.counter("task_runs", "Scheduled task runs (cycles) by task.",
+                [({"task": name}, task["runs"]) for name, task in scheduler["tasks"].items()])
+    out.counter("task_failures", "Scheduled task runs that raised.",
+                [({"task": name}, task["failures"]) for name, task in scheduler["tasks"].items()])
+    out.counter("task_missed_deadlines", "Scheduled task runs that started after their deadline.",
+                [({"task": name}, task["missed_deadlines"]) for name, task in scheduler["tasks"].items()])
+    out.counter("tweets_evaluated", "Tweets run through the engagement decisions.", [({}, bot.tweets_evaluated)])
+    out.counter("actions", "Actions carried out, by type and whether they went through.",
+                [({"action": action, "ok": str(ok).lower()}, count)
+                 for (action, ok), count in sorted(dict(bot.action_counts).items())])
+
+    pipeline = bot.pipeline.metrics()
+    out.counter("pipeline_records", "Records through the worker pipeline, by outcome.",
+                [({"outcome": key}, pipeline[key]) for key in ("submitted", "completed", "dropped", "failed")])
+    out.gauge("pipeline_queue_depth", "Records waiting for a worker and actions waiting for the browser.",
+              [({"queue": "intake"}, pipeline["intake_depth"]), ({"queue": "actions"}, pipeline["action_depth"])])
+
+    llm = bot.llm.metrics()
+    out.counter("llm_calls", "LLM calls by call site.", [({"site": name}, site["calls"]) for name, site in llm["sites"].items()])
+    out.counter("llm_retries", "LLM call retries by call site.",
+                [({"site": name}, site["retries"]) for name, site in llm["sites"].items()])
+    out.counter("llm_failures", "Failed LLM attempts by call site and error kind.",
+                [({"site": name, "kind": kind}, count) for name, site in llm["sites"].items()
+                 for kind, count in site["failures"].items()])
+    out.counter("llm_tokens", "LLM tokens by route and direction.",
+                [({"route": name, "direction": direction}, route[f"{direction}_tokens"])
+                 for name, route in llm["routes"].items() for direction in ("input", "output")])
+    out.counter("llm_route_failures", "Failed LLM attempts by route (timeouts, 5xx, bad output...).",
+                [({"route": name}, route["failures"]) for name, route in llm["routes"].items()])
+    out.histogram("llm_latency_seconds", "LLM request latency by route, failed attempts included.",
+                  [({"route": name}, route["latency_buckets"], route["latency_sum"]) for name, route in llm["routes"].items()])
+    out.gauge("llm_circuit_open", "1 while a backend's circuit breaker is open.",
+              [({"backend": name}, int(state == "open")) for name, state in llm["backends"].items()])
+
+    out.histogram("phase_seconds", "Time spent per phase (navigation, extraction, LLM, posting, sleep...).",
+                  [({"phase": phase}, m["buckets"], m["total"]) for phase, m in sorted(timing.TIMINGS.metrics().items())])
+
+    out.counter("webdriver_commands", "WebDriver commands sent, by command.",
+                [({"command": name}, count) for name, count in sorted(dict(bot.commands.counts).items())])
+    sample = bot.watchdog.samples[-1] if bot.watchdog.samples else {}
+    megabytes = lambda key: sample[key] * 1024 * 1024 if sample.get(key) is not None else None
+    out.gauge("browser_rss_bytes", "Chrome and chromedriver resident memory (last sample).", [({}, megabytes("rss_mb"))])
+    out.gauge("browser_js_heap_bytes", "Renderer JS heap in use (last sample).", [({}, megabytes("heap_mb"))])
+    out.gauge("browser_dom_nodes", "DOM nodes in the renderer (last sample).", [({}, sample.get("nodes"))])
+    out.counter("browser_recycles", "Browser restarts by the memory watchdog.", [({}, bot.watchdog.recycles)])
+    out.gauge("paused", "1 while paused or draining.", [({}, int(bot.control.mode != "running"))])
+    return out.text()
+
+
+def bot_status(bot):
+    """JSON-able snapshot of what the bot is doing and what it will do next."""
+    task, when = bot.scheduler.next_task()
+    llm = bot.llm.metrics()
+    pipeline = bot.pipeline.metrics()
+    return {
+        "control": bot.control.state(),
+        "uptime_s": round(time.time() - bot.started_at),
+        "logged_in": bot.logged_in,
+        "dry_run": bot.dry_run,
+        "current_task": bot.scheduler.current_task,
+        "next_task": {"name": task.name, "in_s": round(max(0.0, when - bot.scheduler.clock()), 1)} if task else None,
+        "llm": {"circuit": llm["state"], "backends": llm["backends"],
+                "seconds_until_probe": llm["seconds_until_probe"], "skipped": llm["skipped"]},
+        "pipeline": {key: pipeline[key] for key in ("outstanding", "intake_depth", "action_depth")},
+        "browser": bot.watchdog.samples[-1] if bot.watchdog.samples else None,
+        "tweets_evaluated": bot.tweets_evaluated,
+    }
+
+
+class ControlHandler(BaseHTTPRequestHandler):
+    server_version = "BaggyMoonzControl/1.0"
+
+    def do_GET(self):
+        try:
+            if self.path == "/metrics":
+                self._reply(200, render_metrics(self.server.bot), OPENMETRICS_CONTENT_TYPE)
+            elif self.path == "/status":
+                self._json(200, bot_status(self.server.bot))
+            else:
+                self._json(404, {"error": "not found"})
+        except Exception as e:  # A broken scrape must never take the bot down
+            logger.warning(f"⚠️ Control request {self.path} failed: {e}")
+            self._json(500, {"error": str(e)})
+
+    def do_POST(self):
+        try:
+            state = self.server.bot.control.command(self.path.strip("/"))
+        except ValueError as e:
+            self._json(404, {"error": str(e)})
+            return
+        self._json(200, state)
+
+    def _json(self, status, payload):
+        self._reply(status, json.dumps(payload, default=str), "application/json")
+
+    def _reply(self, status, body, content_type):
+        data = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def address_string(self):
+        return self.client_address[0] if isinstance(self.client_address, tuple) else "unix"
+
+    def log_message(self, format, *args):
+        logger.debug("Control: " + format, *args)
+
+
+class UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+class ControlServer:
+    """Serves the control endpoint from a daemon thread; address is "host:port" or "unix:/path"."""
+
+    def __init__(self, bot, address):
+        self.address = address
+        if address.startswith("unix:"):
+            path = address[len("unix:"):]
+            if os.path.exists(path):
+                os.unlink(path)  # Left over from a previous run
+            self.httpd = UnixHTTPServer(path, ControlHandler)
+        else:
+            host, _, port = address.rpartition(":")
+            self.httpd = ThreadingHTTPServer((host or "127.0.0.1", int(port)), ControlHandler)
+            self.httpd.daemon_threads = True
+        self.httpd.bot = bot
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, kwargs={"poll_interval": 1.0},
+                                        name="control", daemon=True)
+        self._thread.start()
+        logger.info(f"🎛️ Control endpoint on {self.address} (/metrics, /status, POST /pause /resume /drain)")
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        if self.address.startswith("unix:"):
+            try:
+                os.unlink(self.address[len("unix:"):])
+            except OSError:
+                pass
@@ -0,0 +1,208 @@
+"""
+Conversation context for Baggy Moonz Twitter Bot
+Opens a tweet's conversation in a background tab, reads the parent chain, root tweet and
+the root author's self-replies with a single script call, and keeps the result in a
+bounded LRU cache with a TTL. Every status ID seen on the page points at the cached
+conversation, so several mentions in the same conversation share one fetch.
+"""
+import re
+import time
+import logging
+import threading
+from collections import OrderedDict
+
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+
+import timing
+
+logger = logging.getLogger("BaggyMoonz")
+
+# Every tweet article on a conversation page, in page order (parents, focal tweet, replies)
+EXTRACT_CONVERSATION_SCRIPT = """
+const tweets = [];
+for (const article of document.querySelectorAll('article[data-testid="tweet"]')) {
+    const time = article.querySelector('a[href*="/status/"] time');
+    const href = time ? (time.parentElement.getAttribute('href') || '') : '';
+    const match = href.match(/^\\/([A-Za-z0-9_]+)\\/status\\/(\\d+)/);
+    const text = article.querySelector('[data-testid="tweetText"]');
+    tweets.push({
+        author: match ? match[1] : null,
+        status_id: match ? match[2] : null,
+        text: text ? text.innerText : '',
+    });
+}
+return tweets;
+"""
+
+# Cheap "Show this thread" check on a single tweet element - only a boolean crosses the wire
+THREAD_MARKER_SCRIPT = """
+const tweet = arguments[0];
+for (const span of tweet.querySelectorAll('a span, div[role="link"] span')) {
+    if (span.textContent.trim().toLowerCase() === 'show this thread') return true;
+}
+return false;
+"""
+
+# Thread numbering: a bare "1/" opening the text, or "3/7" closing it - in parentheses, on its own
+# line or after the last sentence ("... ship it. 3/7")
+LEADING_THREAD_NUMBER = re.compile(r'^\d{1,2}/\s')
+TRAILING_THREAD_NUMBER = re.compile(r'(?:\(|(?:^|\n|[.!?:]\s)\s*)(\d{1,2})/(\d{1,2})\)?$')
+
+
+def has_thread_marker(text):
+    """Whether the tweet text marks itself as part of a thread (🧵, or n/ or n/m numbering).
+
+    Fractions, dates and "24/7" inside ordinary text don't count, and a closing n/m needs m >= n.
+    """
+    if "🧵" in text:
+        return True
+    text = text.strip()
+    if LEADING_THREAD_NUMBER.match(text):
+        return True
+    match = TRAILING_THREAD_NUMBER.search(text)
+    return match is not None and 1 <= int(match.group(1)) <= int(match.group(2))
+
+
+class Conversation:
+    """Root tweet, parent chain, focal tweet and the root author's self-replies."""
+
+    def __init__(self, conversation_id, tweets, focal_index):
+        self.conversation_id = conversation_id
+        self.tweets = tweets  # Dicts with author/status_id/text, page order
+        self.focal = tweets[focal_index]
+        self.parents = tweets[:focal_index]  # Root first
+        self.root = self.parents[0] if self.parents else self.focal
+        root_author = (self.root["author"] or "").lower()
+        # The root author continuing their own thread, above and right below the focal tweet
+        following = []
+        for tweet in tweets[focal_index + 1:]:
+            if (tweet["author"] or "").lower() != root_author:
+                break
+            following.append(tweet)
+        self.self_replies = [tweet for tweet in self.parents[1:] if (tweet["author"] or "").lower() == root_author]
+        self.self_replies += following
+        self._following = following
+        self.fetched_at = time.time()
+
+    @property
+    def status_ids(self):
+        return [tweet["status_id"] for tweet in self.tweets if tweet["status_id"]]
+
+    @property
+    def is_thread(self):
+        return bool(self.self_replies)
+
+    def context_text(self):
+        """The conversation up to the focal tweet plus the root author's continuation, oldest first."""
+        lines = [f"@{tweet['author']}: {tweet['text']}" for tweet in self.parents + [self.focal] + self._following
+                 if tweet["text"]]
+        return "\n".join(lines)
+
+
+class ConversationCache:
+    """LRU of conversations with a TTL, indexed by conversation ID and by every member status ID."""
+
+    def __init__(self, maxsize=128, ttl=900, clock=time.time):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._conversations = OrderedDict()  # conversation_id -> Conversation
+        self._index = {}  # status_id -> conversation_id
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, status_id):
+        with self._lock:
+            conversation_id = self._index.get(str(status_id))
+            conversation = self._conversations.get(conversation_id)
+            if conversation is None or self.clock() - conversation.fetched_at > self.ttl:
+                if conversation is not None:
+                    self._drop(conversation_id)
+                self.misses += 1
+                return None
+            self._conversations.move_to_end(conversation_id)
+            self.hits += 1
+            return conversation
+
+    def put(self, conversation):
+        with self._lock:
+            if conversation.conversation_id in self._conversations:
+                self._drop(conversation.conversation_id)
+            self._conversations[conversation.conversation_id] = conversation
+            for status_id in conversation.status_ids:
+                self._index[status_id] = conversation.conversation_id
+            while len(self._conversations) > self.maxsize:
+                self._drop(next(iter(self._conversations)))
+                self.evictions += 1
+
+    def _drop(self, conversation_id):
+        conversation = self._conversations.pop(conversation_id)
+        for status_id in conversation.status_ids:
+            if self._index.get(status_id) == conversation_id:
+                del self._index[status_id]
+
+    def format_metrics(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return (f"cached={len(self._conversations)} hits={self.hits} misses={self.misses} "
+                    f"hit_rate={self.hits / lookups if lookups else 0:.0%} evictions={self.evictions}")
+
+
+class ConversationFetcher:
+    """Loads conversations in a separate browser tab so the main tab keeps its place."""
+
+    def __init__(self, cache=None, page_timeout=10):
+        self.cache = cache or ConversationCache()
+        self.page_timeout = page_timeout
+        self._driver = None
+        self._tab = None
+        self.fetches = 0
+
+    def _worker_tab(self, driver):
+        """Handle of our background tab, opening it on first use (or after the driver was recycled)."""
+        if self._driver is not driver or self._tab not in driver.window_handles:
+            main = driver.current_window_handle
+            driver.switch_to.new_window("tab")
+            self._tab = driver.current_window_handle
+            self._driver = driver
+            driver.switch_to.window(main)
+        return self._tab
+
+    def get(self, driver, username, status_id):
+        """Conversation around a status, from the cache or fetched in the worker tab (None on failure)."""
+        conversation = self.cache.get(status_id)
+        if conversation is not None:
+            logger.info(f"📚 Conversation for {status_id} from cache")
+            return conversation
+
+        main = driver.current_window_handle
+        try:
+            with timing.span("conversation"):
+                driver.switch_to.window(self._worker_tab(driver))
+                driver.get(f"https://twitter.com/{username}/status/{status_id}")
+                WebDriverWait(driver, self.page_timeout).until(
+                    EC.presence_of_element_located((By.CSS_SELECTOR, 'article[data-testid="tweet"]')))
+                timing.sleep(1)  # Let the parent chain render above the focal tweet
+                tweets = driver.execute_script(EXTRACT_CONVERSATION_SCRIPT) or []
+        except Exception as e:
+            logger.warning(f"⚠️ Could not load conversation for {status_id}: {e}")
+            return None
+        finally:
+            try:
+                driver.switch_to.window(main)
+            except Exception:
+                pass
+
+        self.fetches += 1
+        if not tweets:
+            return None
+        focal_index = next((i for i, tweet in enumerate(tweets) if tweet["status_id"] == str(status_id)), 0)
+        conversation = Conversation(tweets[0]["status_id"] or str(status_id), tweets, focal_index)
+        self.cache.put(conversation)
+        logger.info(f"📚 Fetched conversation {conversation.conversation_id}: {len(conversation.parents)} parents, "
+                    f"{len(conversation.self_replies)} self-replies")
+        return conversation
@@ -0,0 +1,133 @@
+"""
+Text features for Baggy Moonz Twitter Bot
+A TextFeatures value is everything the per-tweet checks read from one tweet's text: the
+lowercased text, word tokens, $TICKERs, @mentions, links, question marks, keyword-category
+hits and the relevance scorer's character n-grams. It's built once per tweet and cached by
+tweet ID, so the engagement decision, style, retweet check, spam filter and reply validation
+share one pass over the text instead of each lowercasing and scanning it again. Everything
+beyond the lowercased text is computed on first use.
+"""
+import re
+import threading
+from collections import OrderedDict
+
+import keywords
+from relevance import URL_PATTERN, WORD_PATTERN, normalize_text, char_ngrams, extract_tickers
+
+HANDLE_PATTERN = re.compile(r'@(\w+)')
+
+
+class TextFeatures:
+    """Tokenize-once view of a tweet, matched against one keyword config version."""
+
+    def __init__(self, text, config=None, hits=None):
+        self.text = text
+        self.lower = text.lower()
+        self.config = config or keywords.active()
+        self.hits = dict(hits) if hits else {}  # Keyword category -> bool, filled on first check
+        self._style = None
+        self._tokens = None
+        self._tickers = None
+        self._mentions = None
+        self._urls = None
+        self._ngrams = {}
+
+    @property
+    def tokens(self):
+        """Set of lowercased word tokens."""
+        if self._tokens is None:
+            self._tokens = frozenset(WORD_PATTERN.findall(self.lower))
+        return self._tokens
+
+    @property
+    def tickers(self):
+        """Uppercased $TICKER symbols."""
+        if self._tickers is None:
+            self._tickers = extract_tickers(self.text)
+        return self._tickers
+
+    @property
+    def mentions(self):
+        """@handles in order of appearance, without the @."""
+        if self._mentions is None:
+            self._mentions = HANDLE_PATTERN.findall(self.text)
+        return self._mentions
+
+    @property
+    def urls(self):
+        if self._urls is None:
+            self._urls = URL_PATTERN.findall(self.text)
+        return self._urls
+
+    @property
+    def question_marks(self):
+        return self.text.count("?")
+
+    @property
+    def has_question(self):
+        return "?" in self.text
+
+    def matches(self, category):
+        """Whether any keyword of the category occurs in the text (cached per category)."""
+        hit = self.hits.get(category)
+        if hit is None:
+            hit = self.hits[category] = self.config.matches(category, self.lower)
+        return hit
+
+    @property
+    def engagement_style(self):
+        """First matching engagement style in priority order, or None ("" caches a miss)."""
+        if self._style is None:
+            self._style = self.config.engagement_style(self.lower) or ""
+        return self._style or None
+
+    def char_ngrams(self, ngram_range):
+        """Character n-grams of the normalized text, as the relevance scorer builds them."""
+        grams = self._ngrams.get(ngram_range)
+        if grams is None:
+            grams = self._ngrams[ngram_range] = char_ngrams(normalize_text(self.text), ngram_range)
+        return grams
+
+    def __str__(self):
+        return self.text
+
+
+def text_features(value, config=None):
+    """TextFeatures for a string; a TextFeatures is returned as is."""
+    return value if isinstance(value, TextFeatures) else TextFeatures(value, config)
+
+
+class TextFeatureCache:
+    """Bounded LRU of TextFeatures by tweet ID; an entry is rebuilt when its text or keyword config changed."""
+
+    def __init__(self, maxsize=512):
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+        self._items = OrderedDict()  # tweet_id -> TextFeatures
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, tweet_id, text, config=None):
+        config = config or keywords.active()
+        with self._lock:
+            features = self._items.get(tweet_id)
+            if features is not None and features.text == text and features.config is config:
+                self._items.move_to_end(tweet_id)
+                self.hits += 1
+                return features
+            self.misses += 1
+        return self.put(tweet_id, TextFeatures(text, config))
+
+    def put(self, tweet_id, features):
+        with self._lock:
+            self._items[tweet_id] = features
+            self._items.move_to_end(tweet_id)
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+        return features
+
+    def format_metrics(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return (f"cached={len(self._items)} hits={self.hits} misses={self.misses} "
+                    f"hit_rate={self.hits / lookups if lookups else 0:.0%}")
@@ -0,0 +1,93 @@
+"""
+Follower crawling for Baggy Moonz Twitter Bot
+Scrolls the /followers page and reads every rendered user cell with a single script call
+per page. The list is newest-first, so an incremental crawl stops as soon as it's only
+seeing followers we already know; a full crawl scrolls to the end, which is the only way
+to notice who unfollowed.
+"""
+import random
+import logging
+
+import timing
+
+logger = logging.getLogger("BaggyMoonz")
+
+# Handles of every user cell currently in the DOM (the list is virtualized - cells are recycled while scrolling)
+EXTRACT_USER_CELLS_SCRIPT = """
+const handles = [];
+for (const cell of document.querySelectorAll('[data-testid="UserCell"]')) {
+    for (const link of cell.querySelectorAll('a[href^="/"]')) {
+        const match = (link.getAttribute('href') || '').split('?')[0].match(/^\\/([A-Za-z0-9_]{1,15})$/);
+        if (match) {
+            handles.push(match[1]);
+            break;
+        }
+    }
+}
+return handles;
+"""
+SCROLL_SCRIPT = "window.scrollBy(0, window.innerHeight * 2); return document.body.scrollHeight;"
+
+
+class CrawlResult:
+    """Followers seen in one crawl and how they differ from what we knew."""
+
+    def __init__(self, seen, new, lost, exhausted, pages):
+        self.seen = seen  # Handles in page order (newest followers first)
+        self.new = new
+        self.lost = lost  # Only known after a full crawl reached the end of the list
+        self.exhausted = exhausted
+        self.pages = pages
+
+
+class FollowerCrawler:
+    """Paginated /followers crawl with early stop at known followers."""
+
+    def __init__(self, driver, own_username=None, max_pages=200, known_pages_to_stop=2, idle_pages_to_stop=3,
+                 sleep_fn=timing.sleep, rng=random):
+        self.driver = driver
+        self.own_username = (own_username or "").lower()
+        self.max_pages = max_pages
+        self.known_pages_to_stop = known_pages_to_stop  # Consecutive all-known pages before an incremental crawl stops
+        self.idle_pages_to_stop = idle_pages_to_stop  # Consecutive scrolls with nothing new = end of the list
+        self.sleep_fn = sleep_fn
+        self.rng = rng
+
+    def page_handles(self):
+        """Handles of the user cells rendered right now (one round trip)."""
+        handles = self.driver.execute_script(EXTRACT_USER_CELLS_SCRIPT) or []
+        return [handle for handle in handles if handle.lower() != self.own_username]
+
+    def crawl(self, known=(), full=False):
+        """Scroll the followers page (already loaded) and diff against `known` handles."""
+        known = {name.lower(): name for name in known}
+        seen = {}  # lowercase -> handle, in first-seen order
+        known_streak = idle_streak = pages = 0
+        exhausted = False
+        last_height = None
+
+        while pages < self.max_pages:
+            pages += 1
+            fresh = [handle for handle in self.page_handles() if handle.lower() not in seen]
+            for handle in fresh:
+                seen[handle.lower()] = handle
+
+            if not full and known:
+                known_streak = known_streak + 1 if fresh and all(h.lower() in known for h in fresh) else 0
+                if known_streak >= self.known_pages_to_stop:
+                    break
+
+            height = self.driver.execute_script(SCROLL_SCRIPT)
+            idle_streak = idle_streak + 1 if not fresh and height == last_height else 0
+            if idle_streak >= self.idle_pages_to_stop:
+                exhausted = True
+                break
+            last_height = height
+            self.sleep_fn(self.rng.uniform(1.5, 3))  # Let the next page of cells load
+
+        new = [handle for key, handle in seen.items() if key not in known]
+        # Unfollows only show up as absences, which a partial crawl can't tell apart from "not reached yet"
+        lost = [handle for key, handle in known.items() if key not in seen] if exhausted else []
+        logger.info(f"👥 Follower crawl: {len(seen)} seen over {pages} pages, {len(new)} new, {len(lost)} lost"
+                    f"{' (end of list)' if exhausted else ''}")
+        return CrawlResult(list(seen.values()), new, lost, exhausted, pages)
@@ -0,0 +1,272 @@
+"""
+Keyword configuration for Baggy Moonz Twitter Bot
+Topics, interest tiers, retweet/spam keywords, engagement-style keywords and the mention spam
+indicators live in keywords.json. Each keyword list is compiled into one prefix-trie regex, and
+the running bot picks up edits by watching the file's mtime: the new version is loaded and
+compiled off to the side, then swapped in with a single assignment, so every tweet is matched
+against one consistent version. A file that fails to load keeps the previous version running.
+"""
+import os
+import re
+import json
+import time
+import logging
+import threading
+
+from logs import log_event
+
+logger = logging.getLogger("BaggyMoonz")
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_KEYWORDS_FILE = os.path.join(BASE_DIR, "keywords.json")
+SAMPLE_TWEETS_FILE = os.path.join(BASE_DIR, "fixtures", "tweets.json")  # Match-throughput sample
+
+
+def trie_pattern(keywords):
+    """Regex source matching any of the keywords, with shared prefixes factored out.
+
+    A flat "a|b|c" alternation retries every keyword at every position; the trie form
+    only follows branches whose prefix actually matched.
+    """
+    trie = {}
+    for keyword in keywords:
+        node = trie
+        for char in keyword:
+            node = node.setdefault(char, {})
+        node[""] = {}  # End of a keyword
+
+    def build(node):
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else f"(?:{'|'.join(branches)})"
+        return f"(?:{body})?" if "" in node else body
+
+    return build(trie)
+
+
+def _no_match(text):
+    return None
+
+
+class KeywordMatcher:
+    """Substring test for a list of keywords (same result as `any(k in text for k in keywords)`)."""
+
+    def __init__(self, keywords):
+        self.keywords = list(keywords)
+        words = [keyword for keyword in self.keywords if keyword]
+        self.search = re.compile(trie_pattern(words)).search if words else _no_match
+
+    def matches(self, text):
+        return self.search(text) is not None
+
+    def __len__(self):
+        return len(self.keywords)
+
+
+class KeywordConfig:
+    """One compiled version of the keyword file."""
+
+    def __init__(self, data, version=None):
+        self.version = version  # File mtime (ns) it was loaded from
+        self.engagement_topics = list(data["engagement_topics"])
+        self.response_templates = dict(data["response_templates"])
+        tiers = data["interest_tiers"]
+        self.engagement_styles = [(entry["style"], list(entry["keywords"])) for entry in data["engagement_styles"]]
+        self.default_engagement_styles = list(data["default_engagement_styles"])
+        if not self.engagement_styles or not self.default_engagement_styles:
+            raise ValueError("engagement_styles and default_engagement_styles must not be empty")
+        self.mention_spam_indicators = list(data["mention_spam_indicators"])
+
+        # Column layout of the batch feature matrix: keyword-category hit counts, then text stats
+        self.feature_categories = [
+            ("very_high_interest", list(tiers["very_high_interest"])),
+            ("high_interest", list(tiers["high_interest"])),
+            ("medium_interest", list(tiers["medium_interest"])),
+            ("engaging_patterns", list(tiers["engaging_patterns"])),
+            ("spam", list(data["spam_keywords"])),
+            ("retweet", list(data["retweet_keywords"])),
+            ("decent_retweet", list(data["decent_retweet_keywords"])),
+        ] + self.engagement_styles
+        self.feature_columns = [name for name, _ in self.feature_categories] + ["question_marks", "length"]
+        self.keywords = dict(self.feature_categories)
+        self.keywords["mention_spam"] = self.mention_spam_indicators
+        self.interest_keywords = [keyword for name in ("very_high_interest", "high_interest", "medium_interest",
+                                                       "engaging_patterns") for keyword in self.keywords[name]]
+
+        self.matchers = {name: KeywordMatcher(keywords) for name, keywords in self.keywords.items()}
+        # Bound regex searches, called directly on the per-tweet path
+        self._searches = {name: matcher.search for name, matcher in self.matchers.items()}
+
+        # All style keywords in one zero-width pattern: a single scan reports the longest keyword starting at
+        # every position, and each keyword maps to the best-priority style among it and its shorter prefixes
+        # (those match at the same position). One pass instead of one per style.
+        style_owners = {}
+        for rank, (_, words) in enumerate(self.engagement_styles):
+            for keyword in words:
+                if keyword:
+                    style_owners.setdefault(keyword, rank)
+        self._style_rank = {keyword: min(rank for prefix, rank in style_owners.items() if keyword.startswith(prefix))
+                            for keyword in style_owners}
+        self._style_scan = re.compile(f"(?=({trie_pattern(style_owners)}))").finditer if style_owners else None
+
+        # Each distinct keyword as bytes, with the feature columns it counts towards
+        columns = {}
+        for column, (_, keywords) in enumerate(self.feature_categories):
+            for keyword in keywords:
+                columns.setdefault(keyword, []).append(column)
+        self.keyword_index = [(keyword.encode("utf-8"), cols) for keyword, cols in columns.items() if keyword]
+
+    @classmethod
+    def from_file(cls, path):
+        version = os.stat(path).st_mtime_ns
+        with open(path, encoding="utf-8") as f:
+            return cls(json.load(f), version=version)
+
+    def matches(self, category, text_lower):
+        """Whether any keyword of the category occurs in the (already lowercased) text."""
+        return self._searches[category](text_lower) is not None
+
+    def engagement_style(self, text_lower):
+        """First style in priority order whose keywords occur in the text, or None."""
+        if self._style_scan is None:
+            return None
+        best = len(self.engagement_styles)
+        for match in self._style_scan(text_lower):
+            rank = self._style_rank[match.group(1)]
+            if rank < best:
+                best = rank
+                if rank == 0:
+                    break
+        return self.engagement_styles[best][0] if best < len(self.engagement_styles) else None
+
+    @property
+    def keyword_count(self):
+        return sum(len(keywords) for keywords in self.keywords.values())
+
+
+def measure_throughput(config, texts, passes=3):
+    """Tweets/s through the per-tweet matching (engage tiers, retweet/spam, style) with this config."""
+    lowered = [text.lower() for text in texts]
+    start = time.perf_counter()
+    for _ in range(passes):
+        for text in lowered:
+            for tier in ("very_high_interest", "high_interest", "medium_interest", "engaging_patterns"):
+                if config.matches(tier, text):
+                    break
+            config.matches("spam", text) or config.matches("retweet", text) or config.matches("decent_retweet", text)
+            config.engagement_style(text)
+    elapsed = time.perf_counter() - start
+    return len(lowered) * passes / elapsed if elapsed > 0 else 0.0
+
+
+class KeywordStore:
+    """The active KeywordConfig, reloaded when the file's mtime changes (checked at most every check_interval s)."""
+
+    def __init__(self, path=DEFAULT_KEYWORDS_FILE, check_interval=5.0, clock=time.monotonic):
+        self.path = path
+        self.check_interval = check_interval
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._next_check = 0.0
+        self._sample = None
+        self.config = None
+        self.reloads = 0
+        self.failures = 0
+        self.compile_ms = 0.0  # Last successful load + compile
+        self.throughput = 0.0  # Tweets/s matched by the last compiled version
+        self.reload()
+        if self.config is None:
+            raise ValueError(f"could not load keyword file {path}")
+
+    def get(self):
+        """The current config; cheap enough to call per tweet."""
+        now = self.clock()
+        if now >= self._next_check:
+            self._next_check = now + self.check_interval
+            self.maybe_reload()
+        return self.config
+
+    def maybe_reload(self):
+        """Reload if the file changed since the active version. Returns True when a new version went live."""
+        try:
+            version = os.stat(self.path).st_mtime_ns
+        except OSError as e:
+            logger.warning(f"⚠️ Keyword file unavailable, keeping the current version: {e}")
+            return False
+        if self.config is not None and version == self.config.version:
+            return False
+        return self.reload()
+
+    def reload(self):
+        if not self._lock.acquire(blocking=False):
+            return False  # Another thread is already compiling - keep matching with the current version
+        try:
+            start = time.perf_counter()
+            try:
+                config = KeywordConfig.from_file(self.path)
+            except (OSError, ValueError, KeyError, TypeError) as e:
+                self.failures += 1
+                logger.error(f"❌ Keyword file {self.path} rejected, keeping the current version: {e}")
+                log_event("keywords_reload", ok=False, error=str(e))
+                if self.config is not None:
+                    self.config.version = self._file_version()  # Don't retry the same broken file every check
+                return False
+            compile_ms = (time.perf_counter() - start) * 1000
+            throughput = measure_throughput(config, self._sample_texts())
+
+            first = self.config is None
+            self.config = config  # Atomic swap - readers see the old or the new version, never a mix
+            self.compile_ms = compile_ms
+            self.throughput = throughput
+            if not first:
+                self.reloads += 1
+            logger.info(f"🔑 Keywords {'loaded' if first else 'reloaded'}: {config.keyword_count} keywords "
+                        f"compiled in {compile_ms:.1f}ms, matching {throughput:,.0f} tweets/s")
+            log_event("keywords_reload", ok=True, keywords=config.keyword_count, compile_ms=round(compile_ms, 2),
+                      tweets_per_s=round(throughput))
+            return True
+        finally:
+            self._lock.release()
+
+    def _file_version(self):
+        try:
+            return os.stat(self.path).st_mtime_ns
+        except OSError:
+            return None
+
+    def _sample_texts(self):
+        if self._sample is None:
+            try:
+                with open(SAMPLE_TWEETS_FILE) as f:
+                    self._sample = [item["text"] for item in json.load(f)]
+            except (OSError, ValueError):
+                self._sample = []
+        return self._sample
+
+    def format_metrics(self):
+        """One-line summary for the log."""
+        return (f"keywords={self.config.keyword_count} reloads={self.reloads} failures={self.failures} "
+                f"compile={self.compile_ms:.1f}ms match={self.throughput:,.0f} tweets/s")
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def configure(path=DEFAULT_KEYWORDS_FILE, check_interval=5.0):
+    """Use the keyword file at `path` (keeps the current store if it already watches that file)."""
+    global _store
+    with _store_lock:
+        if _store is None or _store.path != path or _store.check_interval != check_interval:
+            _store = KeywordStore(path, check_interval)
+        return _store
+
+
+def store():
+    return _store or configure()
+
+
+def active():
+    """The keyword config every decision should use right now."""
+    return (_store or configure()).get()
@@ -0,0 +1,482 @@
+"""
+LLM call wrapper for Baggy Moonz Twitter Bot
+Every chat completion goes through LLMClient: errors are classified (rate limit, timeout,
+5xx, bad output, ...), retryable ones back off exponentially with full jitter, and a
+circuit breaker stops calling the API after repeated failures so the bot can fall back
+to LLM-free actions until it recovers. Each call site is routed to a backend and model
+(e.g. a small or local model for the YES/NO and rating checks, the generation model for
+content), with latency and token usage reported per route.
+"""
+import time
+import random
+import logging
+import threading
+
+import openai
+
+from logs import log_event
+import timing
+
+logger = logging.getLogger("BaggyMoonz")
+
+# Error kinds
+RATE_LIMIT = "rate_limit"
+TIMEOUT = "timeout"
+CONNECTION = "connection"
+SERVER = "server"
+BAD_OUTPUT = "bad_output"
+CLIENT = "client"  # Auth / bad request - retrying won't help
+
+RETRYABLE = {RATE_LIMIT, TIMEOUT, CONNECTION, SERVER, BAD_OUTPUT}
+BREAKER_FAILURES = {RATE_LIMIT, TIMEOUT, CONNECTION, SERVER}  # Signs the API itself is unhealthy
+
+
+class LLMUnavailable(Exception):
+    """The call was not made (circuit open) or every attempt failed."""
+
+    def __init__(self, message, kind=None):
+        super().__init__(message)
+        self.kind = kind
+
+
+class BadOutput(ValueError):
+    """The model answered, but not in a usable form."""
+
+
+def classify_error(error):
+    """Map an exception from the OpenAI client (or a parser) to an error kind."""
+    if isinstance(error, BadOutput):
+        return BAD_OUTPUT
+    if isinstance(error, openai.RateLimitError):
+        return RATE_LIMIT
+    if isinstance(error, openai.APITimeoutError):
+        return TIMEOUT
+    if isinstance(error, openai.APIConnectionError):
+        return CONNECTION
+    if isinstance(error, openai.APIStatusError):
+        return SERVER if error.status_code >= 500 else CLIENT
+    return CLIENT
+
+
+def retry_after_seconds(error):
+    """Server-suggested wait from a Retry-After header, if any."""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+def close_stream(response):
+    """Close a streamed completion's HTTP response (the SDK's Stream only exposes it as .response)."""
+    close = getattr(getattr(response, "response", response), "close", None)
+    if close is not None:
+        try:
+            close()
+        except Exception as e:  # Closing is best effort - the stream's result is already in hand
+            logger.debug(f"Closing LLM stream failed: {e}")
+
+
+class RetryPolicy:
+    """Exponential backoff with full jitter."""
+
+    def __init__(self, max_attempts=3, base_delay=1.0, max_delay=30.0):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def delay(self, attempt, error=None):
+        """Seconds to wait before retry number `attempt` (1-based)."""
+        suggested = retry_after_seconds(error) if error is not None else None
+        if suggested is not None:
+            return min(self.max_delay, suggested)
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+
+
+class CircuitBreaker:
+    """Opens after `failure_threshold` consecutive API failures; lets one probe through after `reset_timeout`."""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold=5, reset_timeout=300, clock=time.time):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._state = self.CLOSED
+        self._opened_at = None
+        self._probe_in_flight = False
+        self.consecutive_failures = 0
+        self.times_opened = 0
+
+    @property
+    def state(self):
+        with self._lock:
+            return self._current_state()
+
+    def _current_state(self):
+        if self._state == self.OPEN and self.clock() - self._opened_at >= self.reset_timeout:
+            self._state = self.HALF_OPEN
+        return self._state
+
+    def allow(self):
+        """Whether a call may go out now (a half-open breaker admits a single probe)."""
+        with self._lock:
+            state = self._current_state()
+            if state == self.CLOSED:
+                return True
+            if state == self.HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            if self._state != self.CLOSED:
+                logger.info("🟢 LLM circuit closed - API is responding again")
+            self._state = self.CLOSED
+            self._probe_in_flight = False
+            self.consecutive_failures = 0
+
+    def release_probe(self):
+        """End a probe whose outcome says nothing about the API's health (e.g. a 4xx) - the next call probes again."""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.consecutive_failures += 1
+            self._probe_in_flight = False
+            if self._state == self.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+                if self._state != self.OPEN:
+                    self.times_opened += 1
+                    logger.warning(f"🔴 LLM circuit open after {self.consecutive_failures} failures - "
+                                   f"pausing LLM calls for {self.reset_timeout}s")
+                self._state = self.OPEN
+                self._opened_at = self.clock()
+
+    def seconds_until_probe(self):
+        with self._lock:
+            if self._current_state() != self.OPEN:
+                return 0.0
+            return max(0.0, self.reset_timeout - (self.clock() - self._opened_at))
+
+
+class Route:
+    """Where one call site's requests go: backend name, model and the latency it should stay under."""
+
+    def __init__(self, backend="openai", model="gpt-3.5-turbo", latency_target=None, timeout=None):
+        self.backend = backend
+        self.model = model
+        self.latency_target = latency_target  # Seconds - calls slower than this are counted per route
+        self.timeout = timeout  # Per-request timeout override
+
+    @property
+    def name(self):
+        return f"{self.backend}/{self.model}"
+
+
+class StreamOutcome:
+    """Result of a streamed request: the (partial) texts and why each was rejected, if it was."""
+
+    def __init__(self, texts, verdicts, aborted, time_to_first_token, time_to_verdict):
+        self.texts = texts
+        self.verdicts = verdicts  # None = passed the streaming checks
+        self.aborted = aborted  # Every candidate broke a rule - the stream was cut off early
+        self.time_to_first_token = time_to_first_token
+        self.time_to_verdict = time_to_verdict  # Until abort or the end of the stream
+
+    @property
+    def accepted(self):
+        return [text for text, verdict in zip(self.texts, self.verdicts) if verdict is None and text]
+
+
+class LLMClient:
+    """Chat completions with error classification, retries, circuit breakers and per-call-site/route metrics.
+
+    `backends` maps backend names to OpenAI-compatible clients; `routes` maps call sites
+    ("proofread", "reply", ...) to a Route. A " retry" suffix routes like its call site, and
+    anything unrouted - or routed to a backend that isn't configured - uses routes["default"].
+    Each backend has its own circuit breaker.
+    """
+
+    def __init__(self, client=None, model="gpt-3.5-turbo", timeout=20, retry_policy=None, breaker=None,
+                 ledger=None, sleep_fn=timing.sleep, backends=None, routes=None):
+        self.backends = dict(backends or {})
+        if client is not None:
+            self.backends.setdefault("openai", client)
+        self.routes = {"default": Route("openai", model)}
+        self.routes.update(routes or {})
+        self.timeout = timeout  # Per-request timeout (seconds) instead of the client's long default
+        self.retry_policy = retry_policy or RetryPolicy()
+        default_backend = self.routes["default"].backend
+        self.breakers = {name: CircuitBreaker() for name in self.backends}
+        self.breakers[default_backend] = breaker or self.breakers.get(default_backend) or CircuitBreaker()
+        self.ledger = ledger  # prompts.TokenLedger, if token accounting is wanted
+        self.sleep_fn = sleep_fn
+        self._lock = threading.Lock()
+        self._sites = {}
+        self._streams = {}  # call_site -> streaming stats (aborts, time to first token / verdict)
+        self._route_stats = {}  # route name -> latency histogram and token totals
+        self._unrouted = set()  # Call sites already warned about a missing backend
+
+    @property
+    def breaker(self):
+        """Breaker of the default (generation) backend."""
+        return self.breakers[self.routes["default"].backend]
+
+    @property
+    def available(self):
+        """False while the default backend's circuit is open - callers should pick an LLM-free path."""
+        return self.breaker.state != CircuitBreaker.OPEN
+
+    def route_for(self, call_site):
+        """The Route a call site's requests take."""
+        route = self.routes.get(call_site)
+        if route is None and call_site.endswith(" retry"):
+            route = self.routes.get(call_site[:-len(" retry")])
+        if route is not None and route.backend not in self.backends:
+            if call_site not in self._unrouted:
+                self._unrouted.add(call_site)
+                logger.warning(f"⚠️ LLM backend '{route.backend}' for {call_site} isn't configured, using the default route")
+            route = None
+        return route or self.routes["default"]
+
+    def _count(self, call_site, key, amount=1):
+        with self._lock:
+            site = self._sites.setdefault(call_site, {"calls": 0, "successes": 0, "retries": 0,
+                                                      "skipped": 0, "failures": {}})
+            if key.startswith("failure:"):
+                kind = key.split(":", 1)[1]
+                site["failures"][kind] = site["failures"].get(kind, 0) + amount
+            else:
+                site[key] += amount
+
+    def complete(self, call_site, messages, max_tokens, temperature, parse=None, n=1):
+        """Return the stripped completion text (or parse(text)); raises LLMUnavailable when it can't.
+
+        A ValueError, TypeError or KeyError from parse counts as bad output and is retried. With n > 1 the model samples n completions in one request and a list of them is returned.
+        """
+        def attempt(client, route, info):
+            extra = {"n": n} if n > 1 else {}
+            with timing.span("llm"):
+                response = client.chat.completions.create(
+                    model=route.model,
+                    messages=messages,
+                    max_tokens=max_tokens,
+                    temperature=temperature,
+                    timeout=route.timeout or self.timeout,
+                    **extra
+                )
+            if self.ledger is not None:
+                info["input_tokens"] = self.ledger.record(call_site, messages, response)
+            usage = getattr(response, "usage", None)
+            if usage is not None:
+                info["input_tokens"] = getattr(usage, "prompt_tokens", None) or info["input_tokens"]
+                info["output_tokens"] = getattr(usage, "completion_tokens", None)
+            contents = [choice.message.content.strip() for choice in response.choices
+                        if choice.message.content is not None]
+            if not contents:
+                raise BadOutput("empty completion")
+            if parse is None:
+                return contents if n > 1 else contents[0]
+            try:
+                return [parse(content) for content in contents] if n > 1 else parse(contents[0])
+            except (ValueError, TypeError, KeyError) as e:  # Only the parser's errors mean the output was unusable
+                raise BadOutput(f"unparseable completion: {e}") from e
+
+        return self._call(call_site, attempt)
+
+    def stream(self, call_site, messages, max_tokens, temperature, check=None, n=1):
+        """Stream n completions, cutting the stream off once check(partial_text) has rejected all of them.
+
+        check returns a reason string for text that already breaks a hard rule, else None.
+        Returns a StreamOutcome; raises LLMUnavailable like complete().
+        """
+        def attempt(client, route, info):
+            extra = {"n": n} if n > 1 else {}
+            start = time.perf_counter()
+            texts = [""] * n
+            verdicts = [None] * n  # Rejection reason per candidate, once known
+            first_token = None
+            aborted = False
+            chunks = 0
+            with timing.span("llm"):
+                response = client.chat.completions.create(
+                    model=route.model,
+                    messages=messages,
+                    max_tokens=max_tokens,
+                    temperature=temperature,
+                    timeout=route.timeout or self.timeout,
+                    stream=True,
+                    **extra
+                )
+                try:
+                    for chunk in response:
+                        for choice in chunk.choices:
+                            piece = choice.delta.content
+                            if not piece or verdicts[choice.index] is not None:
+                                continue
+                            if first_token is None:
+                                first_token = time.perf_counter() - start
+                            chunks += 1
+                            texts[choice.index] += piece
+                            if check is not None:
+                                verdicts[choice.index] = check(texts[choice.index])
+                        if check is not None and all(verdicts):
+                            aborted = True
+                            break
+                finally:
+                    close_stream(response)  # Stops generation server-side when we bail out early
+            if self.ledger is not None:
+                info["input_tokens"] = self.ledger.record(call_site, messages)
+            info["output_tokens"] = chunks  # Streams carry no usage - a chunk is about a token
+            if not aborted and not any(text.strip() for text in texts):
+                raise BadOutput("empty completion")
+            outcome = StreamOutcome([text.strip() for text in texts], verdicts, aborted, first_token,
+                                    time.perf_counter() - start)
+            self._record_stream(call_site, outcome)
+            return outcome
+
+        return self._call(call_site, attempt)
+
+    def _record_stream(self, call_site, outcome):
+        with self._lock:
+            stats = self._streams.setdefault(call_site, {"streams": 0, "aborted": 0, "rejected": 0,
+                                                         "ttft": timing.Histogram(500), "verdict": timing.Histogram(500)})
+            stats["streams"] += 1
+            stats["aborted"] += outcome.aborted
+            stats["rejected"] += sum(1 for verdict in outcome.verdicts if verdict)
+            if outcome.time_to_first_token is not None:
+                stats["ttft"].add(outcome.time_to_first_token)
+            stats["verdict"].add(outcome.time_to_verdict)
+        log_event("llm_stream", call_site=call_site, aborted=outcome.aborted,
+                  rejected=[verdict for verdict in outcome.verdicts if verdict],
+                  ttft_ms=round(outcome.time_to_first_token * 1000) if outcome.time_to_first_token is not None else None,
+                  verdict_ms=round(outcome.time_to_verdict * 1000))
+
+    def _record_route(self, route, seconds, info, ok=True):
+        """One attempt's latency and tokens; failed attempts (timeouts included) count towards the latency too."""
+        with self._lock:
+            stats = self._route_stats.setdefault(route.name, {"calls": 0, "failures": 0, "over_target": 0,
+                                                              "input_tokens": 0, "output_tokens": 0,
+                                                              "latency": timing.Histogram(1000),
+                                                              "target": route.latency_target})
+            stats["calls"] += 1
+            stats["failures"] += not ok
+            stats["latency"].add(seconds)
+            stats["input_tokens"] += info["input_tokens"] or 0
+            stats["output_tokens"] += info.get("output_tokens") or 0
+            if route.latency_target is not None and seconds > route.latency_target:
+                stats["over_target"] += 1
+
+    def _call(self, call_site, attempt_fn):
+        """Run attempt_fn(client, route, info) with circuit breaking, error classification and retries."""
+        route = self.route_for(call_site)
+        client = self.backends.get(route.backend)
+        breaker = self.breakers.setdefault(route.backend, CircuitBreaker())
+        if not breaker.allow():
+            self._count(call_site, "skipped")
+            log_event("llm_call", call_site=call_site, attempt=0, outcome="circuit_open", input_tokens=0, ms=0)
+            raise LLMUnavailable(f"LLM circuit open, skipped {call_site}", kind="circuit_open")
+
+        self._count(call_site, "calls")
+        attempt = 0
+        while True:
+            attempt += 1
+            start = time.perf_counter()
+            info = {"input_tokens": None}
+            try:
+                if client is None:
+                    raise LLMUnavailable(f"no client configured for backend '{route.backend}'", kind=CLIENT)
+                result = attempt_fn(client, route, info)
+            except Exception as e:
+                kind = classify_error(e)
+                self._count(call_site, f"failure:{kind}")
+                if client is not None:
+                    self._record_route(route, time.perf_counter() - start, info, ok=False)
+                log_event("llm_call", call_site=call_site, attempt=attempt, outcome=kind, input_tokens=info["input_tokens"],
+                          ms=round((time.perf_counter() - start) * 1000))
+                if kind in BREAKER_FAILURES:
+                    breaker.record_failure()
+                elif kind == BAD_OUTPUT:
+                    breaker.record_success()  # The API answered - only the content was off
+                else:
+                    breaker.release_probe()
+
+                if kind not in RETRYABLE or attempt >= self.retry_policy.max_attempts or not breaker.allow():
+                    logger.error(f"❌ LLM {call_site} failed ({kind}) after {attempt} attempts: {e}")
+                    raise LLMUnavailable(f"{call_site} failed: {e}", kind=kind) from e
+
+                delay = self.retry_policy.delay(attempt, e)
+                logger.warning(f"⚠️ LLM {call_site} {kind} (attempt {attempt}), retrying in {delay:.1f}s")
+                self._count(call_site, "retries")
+                self.sleep_fn(delay)
+                continue
+
+            elapsed = time.perf_counter() - start
+            breaker.record_success()
+            self._count(call_site, "successes")
+            self._record_route(route, elapsed, info)
+            log_event("llm_call", call_site=call_site, route=route.name, attempt=attempt, outcome="ok",
+                      input_tokens=info["input_tokens"], output_tokens=info.get("output_tokens"),
+                      ms=round(elapsed * 1000))
+            return result
+
+    def metrics(self):
+        """Breaker state plus calls/retries/failures/skips per call site."""
+        with self._lock:
+            sites = {name: {**site, "failures": dict(site["failures"])} for name, site in self._sites.items()}
+            streams = {}
+            for name, stats in self._streams.items():
+                ttft, verdict = stats["ttft"].percentiles((0.5, 0.95)), stats["verdict"].percentiles((0.5, 0.95))
+                streams[name] = {"streams": stats["streams"], "aborted": stats["aborted"], "rejected": stats["rejected"],
+                                 "ttft_p50": ttft[0.5], "ttft_p95": ttft[0.95],
+                                 "verdict_p50": verdict[0.5], "verdict_p95": verdict[0.95]}
+            routes = {}
+            for name, stats in self._route_stats.items():
+                latency = stats["latency"].percentiles((0.5, 0.95))
+                routes[name] = {"calls": stats["calls"], "failures": stats["failures"],
+                                "over_target": stats["over_target"], "target": stats["target"],
+                                "input_tokens": stats["input_tokens"], "output_tokens": stats["output_tokens"],
+                                "latency_p50": latency[0.5], "latency_p95": latency[0.95],
+                                "latency_count": stats["latency"].count, "latency_sum": stats["latency"].total,
+                                "latency_buckets": stats["latency"].buckets()}
+        return {
+            "state": self.breaker.state,
+            "backends": {name: breaker.state for name, breaker in self.breakers.items()},
+            "routes": routes,
+            "consecutive_failures": self.breaker.consecutive_failures,
+            "times_opened": self.breaker.times_opened,
+            "seconds_until_probe": self.breaker.seconds_until_probe(),
+            "skipped": sum(site["skipped"] for site in sites.values()),
+            "sites": sites,
+            "streams": streams,
+        }
+
+    def format_metrics(self):
+        """One-line summary for the log."""
+        m = self.metrics()
+        failures = {}
+        for site in m["sites"].values():
+            for kind, count in site["failures"].items():
+                failures[kind] = failures.get(kind, 0) + count
+        calls = sum(site["calls"] for site in m["sites"].values())
+        retries = sum(site["retries"] for site in m["sites"].values())
+        failed = " ".join(f"{kind}={count}" for kind, count in sorted(failures.items())) or "none"
+        summary = (f"circuit={m['state']} opened={m['times_opened']} calls={calls} retries={retries} "
+                   f"skipped={m['skipped']} failures: {failed}")
+        for name, route in sorted(m["routes"].items()):
+            target = f" over {route['target']}s={route['over_target']}" if route["target"] is not None else ""
+            summary += (f" | {name} calls={route['calls']} failed={route['failures']} p50={route['latency_p50'] * 1000:.0f}ms "
+                        f"p95={route['latency_p95'] * 1000:.0f}ms tokens in={route['input_tokens']} "
+                        f"out={route['output_tokens']}{target}")
+        for name, stream in sorted(m["streams"].items()):
+            summary += (f" | {name} streams={stream['streams']} aborted={stream['aborted']} "
+                        f"ttft p50={stream['ttft_p50'] * 1000:.0f}ms verdict p50={stream['verdict_p50'] * 1000:.0f}ms")
+        return summary
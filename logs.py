@@ -0,0 +1,124 @@
+"""
+Logging for Baggy Moonz Twitter Bot
+Log calls only enqueue the record - a QueueListener thread formats it and does the disk/console
+writes, with size-based rotation. Structured events (tweet seen, decision, action, LLM call)
+go to a separate JSONL stream next to the human-readable log.
+"""
+import json
+import queue
+import atexit
+import logging
+import logging.handlers
+
+HUMAN_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+
+events_logger = logging.getLogger("BaggyMoonz.events")
+
+_listener = None
+
+
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    """Enqueue the record untouched - message formatting happens on the listener thread.
+
+    The stock QueueHandler formats in the caller so records can be pickled; our queue never
+    leaves the process, so we skip that. Callers should pass immutable args (str/int/float).
+    """
+
+    def prepare(self, record):
+        return record
+
+
+class HumanFilter(logging.Filter):
+    """Keep structured events out of the console and the human log."""
+
+    def filter(self, record):
+        return not hasattr(record, "event")
+
+
+class EventFilter(logging.Filter):
+    def filter(self, record):
+        return hasattr(record, "event")
+
+
+class JsonlFormatter(logging.Formatter):
+    """One JSON object per event: timestamp, event name and its fields."""
+
+    def format(self, record):
+        payload = {"ts": round(record.created, 3), "event": record.event}
+        payload.update(record.fields)
+        return json.dumps(payload, default=str, ensure_ascii=False)
+
+
+def _no_caller(stack_info=False, stacklevel=1):
+    """Stand-in for Logger.findCaller: our format never shows the caller, so skip the stack walk."""
+    return "(unknown file)", 0, "(unknown function)", None
+
+
+def setup_logging(log_file="baggy_moonz.log", events_file="baggy_moonz.events.jsonl",
+                  max_bytes=10 * 1024 * 1024, backup_count=5, level=logging.INFO, console=True,
+                  skip_thread_info=False):
+    """Route all logging through a queue to rotating file handlers (and the console).
+
+    skip_thread_info also stops recording thread and process names on log records. Those are
+    logging-module globals, so this affects every library logging in the process.
+    """
+    global _listener
+    if _listener is not None:
+        return _listener
+
+    human_formatter = logging.Formatter(HUMAN_FORMAT)
+    handlers = []
+
+    file_handler = logging.handlers.RotatingFileHandler(log_file, maxBytes=max_bytes, backupCount=backup_count,
+                                                        encoding="utf-8")
+    file_handler.setFormatter(human_formatter)
+    file_handler.addFilter(HumanFilter())
+    handlers.append(file_handler)
+
+    if console:
+        console_handler = logging.StreamHandler()  # Everything human-readable also goes to the console
+        console_handler.setFormatter(human_formatter)
+        console_handler.addFilter(HumanFilter())
+        handlers.append(console_handler)
+
+    if events_file:
+        events_handler = logging.handlers.RotatingFileHandler(events_file, maxBytes=max_bytes,
+                                                              backupCount=backup_count, encoding="utf-8")
+        events_handler.setFormatter(JsonlFormatter())
+        events_handler.addFilter(EventFilter())
+        handlers.append(events_handler)
+
+    # Our format never uses the caller - skip the stack walk on the bot's own loggers (others keep theirs)
+    for name in ("BaggyMoonz", events_logger.name):
+        logging.getLogger(name).findCaller = _no_caller
+    if skip_thread_info:
+        logging.logThreads = False
+        logging.logProcesses = False
+        logging.logMultiprocessing = False
+
+    log_queue = queue.SimpleQueue()
+    root = logging.getLogger()
+    root.handlers = [DeferredQueueHandler(log_queue)]
+    root.setLevel(level)
+
+    _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    atexit.register(stop_logging)
+    return _listener
+
+
+def stop_logging():
+    """Flush the queue and stop the listener thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+
+
+def log_event(event, **fields):
+    """Emit a structured event to the JSONL stream (cheap when nothing listens)."""
+    if events_logger.isEnabledFor(logging.INFO):
+        events_logger.info(event, extra={"event": event, "fields": fields})
+
@@ -0,0 +1,126 @@
+"""
+Mentions tracking for Baggy Moonz Twitter Bot
+Keeps a persisted high-water mark (newest processed mention status ID) so each poll
+only handles strictly newer mentions, plus backlog and response-latency metrics.
+"""
+import os
+import json
+import time
+import logging
+from collections import deque
+
+from logs import log_event
+
+logger = logging.getLogger("BaggyMoonz")
+
+TWITTER_EPOCH_MS = 1288834974657  # Snowflake IDs encode their creation time relative to this
+
+
+def status_id_timestamp(status_id):
+    """Creation time (unix seconds) encoded in a snowflake status ID."""
+    return ((int(status_id) >> 22) + TWITTER_EPOCH_MS) / 1000.0
+
+
+class MentionTracker:
+    """Persisted watermark for mentions plus backlog/latency metrics."""
+
+    def __init__(self, path="mentions_state.json"):
+        self.path = path
+        self.watermark = None  # Newest status ID we've fully processed
+        self.last_backlog = 0
+        self.max_backlog = 0
+        self.polls = 0
+        self.processed = 0
+        self.responses = 0
+        self.truncated_polls = 0  # Polls that ran out of pages before reaching the watermark
+        self.failures = {}  # status ID -> failed attempts at the mention just past the watermark
+        self.abandoned = 0  # Mentions given up on after repeated failures
+        self._latencies = deque(maxlen=200)  # Seconds from mention creation to our reply
+        self.load()
+
+    def load(self):
+        """Load the watermark from disk (missing or corrupt files start fresh)."""
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path) as f:
+                state = json.load(f)
+            watermark = state.get("watermark")
+            self.watermark = int(watermark) if watermark is not None else None
+            logger.info(f"📍 Loaded mentions watermark: {self.watermark}")
+        except Exception as e:
+            logger.warning(f"⚠️ Could not load mentions state from {self.path}: {e}")
+
+    def save(self):
+        """Write the watermark atomically so a crash never leaves a half-written file."""
+        try:
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump({"watermark": self.watermark, "updated_at": time.time()}, f)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            logger.error(f"❌ Could not save mentions state to {self.path}: {e}")
+
+    def is_new(self, status_id):
+        """True if the mention is strictly newer than the watermark."""
+        return self.watermark is None or int(status_id) > self.watermark
+
+    def advance(self, status_id):
+        """Move the watermark forward past a processed mention."""
+        status_id = int(status_id)
+        self.failures.pop(status_id, None)
+        if self.watermark is None or status_id > self.watermark:
+            self.watermark = status_id
+        self.processed += 1
+
+    def record_failure(self, status_id, max_attempts=3):
+        """Handling a mention failed. True while it should be retried (the watermark stays before it); after
+        max_attempts it's abandoned, so one broken mention can't hold up every newer one."""
+        status_id = int(status_id)
+        attempts = self.failures[status_id] = self.failures.get(status_id, 0) + 1
+        if attempts < max_attempts:
+            return True
+        self.abandoned += 1
+        return False
+
+    def record_backlog(self, count):
+        """Number of unprocessed mentions found by a poll."""
+        self.polls += 1
+        self.last_backlog = count
+        self.max_backlog = max(self.max_backlog, count)
+
+    def record_truncation(self, oldest_found):
+        """A poll gave up paging before it reached the watermark. Mentions between the watermark and the
+        oldest one found were never seen and will be left behind once the watermark moves past them."""
+        self.truncated_polls += 1
+        logger.warning(f"⚠️ Mentions backlog deeper than the page limit: mentions after {self.watermark} "
+                       f"and before {oldest_found} were not reached and will be skipped")
+        log_event("mentions_truncated", watermark=self.watermark, oldest_found=oldest_found)
+
+    def record_response(self, created_at):
+        """A reply was posted to a mention created at `created_at` (unix seconds)."""
+        self.responses += 1
+        if created_at:
+            self._latencies.append(max(0.0, time.time() - created_at))
+
+    def metrics(self):
+        latencies = sorted(self._latencies)
+        return {
+            "watermark": self.watermark,
+            "polls": self.polls,
+            "processed": self.processed,
+            "responses": self.responses,
+            "last_backlog": self.last_backlog,
+            "max_backlog": self.max_backlog,
+            "truncated_polls": self.truncated_polls,
+            "abandoned": self.abandoned,
+            "median_response_seconds": latencies[len(latencies) // 2] if latencies else None,
+            "max_response_seconds": latencies[-1] if latencies else None,
+        }
+
+    def format_metrics(self):
+        """One-line summary for the log."""
+        m = self.metrics()
+        median = f"{m['median_response_seconds'] / 60:.1f}m" if m['median_response_seconds'] is not None else "n/a"
+        return (f"backlog={m['last_backlog']} (max {m['max_backlog']}) processed={m['processed']} "
+                f"replied={m['responses']} truncated={m['truncated_polls']} abandoned={m['abandoned']} median_latency={median} watermark={m['watermark']}")
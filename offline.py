@@ -0,0 +1,226 @@
+"""
+Offline stand-ins for Baggy Moonz Twitter Bot
+A mock chat-completions client that answers every prompt the bot sends (replies, batched
+JSON replies, proofread ratings, YES/NO checks) without the network, fixture tweets as TweetRecords, and an action
+recorder that dry runs use instead of clicking, so the decision/generation/validation path
+can run reproducibly with no side effects, browser or API key.
+"""
+import os
+import re
+import json
+import time
+import random
+import logging
+import threading
+from collections import OrderedDict
+
+from pipeline import TweetRecord
+from state import text_fingerprint
+from prompts import PROOFREAD_PROMPT, RELEVANCE_PROMPT, MOOD_PROMPT, BATCH_ITEM_PATTERN, estimate_tokens
+from relevance import normalize_text
+from conversations import has_thread_marker
+
+logger = logging.getLogger("BaggyMoonz")
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+QUOTED_TEXT_PATTERN = re.compile(r"(?:posted|thread): '(.*?)'", re.DOTALL)
+
+REPLY_TEMPLATES = [
+    "imagine {a} being the thing that finally broke you, skill issue",
+    "{a} and {b} in the same week is a speedrun to ngmi",
+    "not you posting about {a} like anyone asked, cope harder",
+    "{a} again? at this point it is a personality trait",
+    "the {a} arc was inevitable, the {b} arc is self inflicted",
+]
+TWEET_TEMPLATES = [
+    "portfolio down but vibes immaculate, the grind never touches grass",
+    "every startup is an AI startup now, my toaster has a roadmap",
+    "reply all to the company email is my cardio",
+    "monday meetings are just emails with worse lighting",
+]
+
+
+class _Message:
+    def __init__(self, content):
+        self.content = content
+        self.role = "assistant"
+
+
+class _Choice:
+    def __init__(self, content):
+        self.message = _Message(content)
+        self.finish_reason = "stop"
+
+
+class _Usage:
+    def __init__(self, prompt_tokens, completion_tokens):
+        self.prompt_tokens = prompt_tokens
+        self.completion_tokens = completion_tokens
+        self.total_tokens = prompt_tokens + completion_tokens
+
+
+class MockCompletion:
+    """Shape-compatible with the bits of an OpenAI ChatCompletion the bot reads."""
+
+    def __init__(self, contents, prompt_tokens):
+        self.choices = [_Choice(content) for content in contents]
+        self.usage = _Usage(prompt_tokens, sum(estimate_tokens(content) for content in contents))
+
+
+class _Delta:
+    def __init__(self, content):
+        self.content = content
+
+
+class _StreamChoice:
+    def __init__(self, index, content):
+        self.index = index
+        self.delta = _Delta(content)
+
+
+class _StreamChunk:
+    def __init__(self, choices):
+        self.choices = choices
+
+
+class MockStream:
+    """Iterates completion chunks like openai.Stream, `token_latency` seconds apart; close() stops it."""
+
+    def __init__(self, client, contents, token_latency):
+        self.client = client
+        self.contents = contents
+        self.token_latency = token_latency
+        self.closed = False
+
+    def __iter__(self):
+        # Roughly token-sized pieces, all candidates advancing together like n-way sampling
+        pieces = [re.findall(r"\S+\s*|\s+", content) for content in self.contents]
+        for step in range(max((len(parts) for parts in pieces), default=0)):
+            if self.closed:
+                return
+            if self.token_latency:
+                time.sleep(self.token_latency)
+            with self.client._lock:
+                self.client.streamed_tokens += 1
+            yield _StreamChunk([_StreamChoice(index, parts[step]) for index, parts in enumerate(pieces)
+                                if step < len(parts)])
+
+    def close(self):
+        if not self.closed:
+            self.closed = True
+            with self.client._lock:
+                self.client.closed_streams += 1
+
+
+class MockChatClient:
+    """Drop-in for `OpenAI().chat.completions` with deterministic canned answers."""
+
+    def __init__(self, seed=42, latency=0.0, invalid_rate=0.0, token_latency=0.0):
+        self.seed = seed
+        self._prompt_counts = OrderedDict()  # Answers are seeded per prompt, so worker timing can't reorder them
+        self.latency = latency  # Simulated API time per call (seconds) - time to first token when streaming
+        self.token_latency = token_latency  # Seconds between streamed chunks
+        self.invalid_rate = invalid_rate  # Share of generated texts that break the output rules
+        self.calls = 0
+        self.streamed_tokens = 0
+        self.closed_streams = 0
+        self._lock = threading.Lock()
+        self.chat = self
+        self.completions = self
+
+    def create(self, model=None, messages=None, max_tokens=None, temperature=None, n=1, stream=False, **kwargs):
+        with self._lock:
+            self.calls += 1
+            contents = [self._answer(messages or [], self._prompt_rng(messages or [])) for _ in range(n)]
+        if self.latency:
+            time.sleep(self.latency)
+        if stream:
+            return MockStream(self, contents, self.token_latency)
+        if self.token_latency:
+            # A full completion arrives once its longest candidate has been generated
+            time.sleep(self.token_latency * max(len(re.findall(r"\S+\s*|\s+", content)) for content in contents))
+        prompt_tokens = sum(estimate_tokens(message["content"]) for message in messages or [])
+        return MockCompletion(contents, prompt_tokens)
+
+    def _prompt_rng(self, messages):
+        """RNG for the k-th time this exact prompt is sent - same answers for the same prompts in any order."""
+        key = "\n".join(message["content"] for message in messages)
+        count = self._prompt_counts.pop(key, 0)
+        self._prompt_counts[key] = count + 1
+        if len(self._prompt_counts) > 1024:  # Only recent repeats matter (retries, the mood check)
+            self._prompt_counts.popitem(last=False)
+        return random.Random(f"{self.seed}|{count}|{key}")
+
+    def _answer(self, messages, rng):
+        system = messages[0]["content"] if messages and messages[0]["role"] == "system" else ""
+        user = messages[-1]["content"] if messages else ""
+        if system == PROOFREAD_PROMPT[0]:
+            return str(rng.choice([6, 7, 7, 8]))
+        if system == RELEVANCE_PROMPT[0]:
+            return "YES" if rng.random() < 0.8 else "NO"
+        if system == MOOD_PROMPT[0]:
+            return rng.choice(["YES, feeling chatty", "NO, touching grass"])
+
+        batch = BATCH_ITEM_PATTERN.findall(user)
+        if batch:
+            return json.dumps([{"id": key, "style": style, "reply": self._generate(text, rng)}
+                               for key, _, text, style in batch])
+        match = QUOTED_TEXT_PATTERN.search(user)
+        return self._generate(match.group(1) if match else None, rng)
+
+    def _generate(self, quoted, rng):
+        """A reply built from the quoted tweet's words, or an original tweet when nothing is quoted."""
+        if rng.random() < self.invalid_rate:
+            words = rng.choice(TWEET_TEMPLATES).split()
+            cut = rng.randint(1, len(words) - 1)
+            return " ".join(words[:cut] + ["#vibes"] + words[cut:])  # Hashtags fail local validation
+        if quoted is None:
+            return rng.choice(TWEET_TEMPLATES)
+        words = [word for word in normalize_text(quoted).split() if len(word) > 3] or ["this"]
+        a, b = rng.choice(words), rng.choice(words)
+        return rng.choice(REPLY_TEMPLATES).format(a=a, b=b)
+
+
+class ActionRecorder:
+    """Collects the likes, replies, retweets, follows and posts a dry run would have made."""
+
+    def __init__(self, keep=1000):
+        self._lock = threading.Lock()
+        self.actions = []  # Most recent `keep` actions as dicts
+        self.keep = keep
+        self.counts = {}
+        self.styles = {}
+
+    def record(self, action, target=None, content=None, style=None, tweet_id=None):
+        """Record an action in place of performing it; returns True like a successful click."""
+        with self._lock:
+            self.counts[action] = self.counts.get(action, 0) + 1
+            if style:
+                self.styles[style] = self.styles.get(style, 0) + 1
+            self.actions.append({"action": action, "target": target, "content": content, "style": style,
+                                 "tweet_id": tweet_id, "ts": time.time()})
+            del self.actions[:-self.keep]
+        logger.info(f"🧪 DRY RUN {action}" + (f" @{target}" if target else "") + (f": {content}" if content else ""))
+        return True
+
+    def format_metrics(self):
+        with self._lock:
+            return " ".join(f"{action}={count}" for action, count in sorted(self.counts.items())) or "none"
+
+
+def load_fixture_items(path=None):
+    with open(path or os.path.join(FIXTURES_DIR, "tweets.json")) as f:
+        return json.load(f)
+
+
+def fixture_records(items, source="timeline", tag=""):
+    """TweetRecords for fixture tweets; `tag` makes IDs unique when the same fixtures are replayed."""
+    records = []
+    for item in items:
+        text = item["text"]
+        tweet_id = f"{item['username']}:{text_fingerprint(text[:100] + tag)}"
+        status_id = item.get("status_id")
+        records.append(TweetRecord(tweet_id, item["username"], text, is_thread=has_thread_marker(text), source=source,
+                                   status_id=status_id, created_at=time.time()))
+    return records
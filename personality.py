@@ -1,9 +1,19 @@
 """
 Personality module for Baggy Moonz Twitter Bot
 Defines the character traits, interests, and response patterns
+Functions that draw random numbers take an `rng` - the `random` module by default, or a
+seeded random.Random so replays of the same tweets make the same decisions.
+Keyword decisions read the active keyword config, so edits to keywords.json apply live.
+The per-tweet checks take the tweet as a string or as a features.TextFeatures; passing the
+same TextFeatures to each of them lowercases and scans the text only once.
 """
 import random
 
+import numpy as np
+
+import keywords
+from features import text_features
+
 # Baggy Moonz's core personality traits - chill, witty, and engaging
 PERSONALITY_TRAITS = {
     "witty": 0.9,              # Quick and clever responses
@@ -16,83 +26,7 @@ PERSONALITY_TRAITS = {
     "concise": 0.9             # Keeps things short and sweet
 }
 
-# Topics that get engagement - EXPANDED for diversity
-ENGAGEMENT_TOPICS = [
-    # Tech & Programming (reduced focus)
-    "tech", "ai", "programming", "coding", "startups",
-    
-    # Internet Culture & Memes (core personality)
-    "memes", "internet culture", "gaming", "twitter", "social media", "reddit", "tiktok",
-    "viral", "trending", "content", "influencer", "clout", "ratio",
-    
-    # Entertainment & Pop Culture
-    "movies", "tv shows", "netflix", "anime", "music", "concerts", "festivals",
-    "celebrities", "drama", "gossip", "reality tv", "streaming", "youtube",
-    
-    # Life & Society
-    "dating", "relationships", "work", "jobs", "boss", "office", "remote work",
-    "Monday", "weekend", "vacation", "travel", "food", "cooking", "coffee",
-    "sleep", "tired", "stressed", "anxiety", "mental health", "therapy",
-    
-    # Current Events & Trends
-    "politics", "economy", "inflation", "housing", "rent", "gas prices",
-    "climate", "weather", "news", "breaking", "hot takes", "unpopular opinion",
-    
-    # Sports & Competition
-    "sports", "football", "basketball", "soccer", "olympics", "competition",
-    "teams", "playoffs", "championship", "world cup",
-    
-    # Money & Finance (broader than just crypto)
-    "money", "broke", "rent", "bills", "paycheck", "salary", "job hunting",
-    "student loans", "debt", "credit", "savings", "investing", "stocks",
-    "crypto", "bitcoin", "ethereum", "trading", "portfolio",
-    
-    # Random Fun Topics
-    "funny", "random thoughts", "shower thoughts", "conspiracy", "aliens",
-    "space", "universe", "science", "philosophy", "deep thoughts",
-    "cats", "dogs", "pets", "animals", "nature", "plants", "gardening"
-]
-
-# Response templates for different situations
-RESPONSE_TEMPLATES = {
-    "roasting": [
-        "this ain't it chief {point}",
-        "who's gonna tell them {point}",
-        "imagine thinking this {point}",
-        "delete this {point}",
-        "this you? {point}"
-    ],
-    "tech_roast": [
-        "tell me you don't code without telling me {point}",
-        "works on my machine vibes {point}",
-        "someone's been copying from Stack Overflow {point}",
-        "this code review would be brutal {point}",
-        "404 brain not found {point}"
-    ],
-    "crypto_roast": [
-        "buying high selling low energy {point}",
-        "diamond hands until broke {point}",
-        "still waiting for the moon {point}",
-        "rugpull incoming {point}",
-        "ngmi {point}"
-    ],
-    "agreement": [
-        "facts no printer {point}",
-        "finally someone with brain cells {point}",
-        "this person gets it {point}",
-        "based take {point}",
-        "spitting facts {point}"
-    ],
-    "tech_flex": [
-        "meanwhile in production {point}",
-        "git blame says otherwise {point}",
-        "undefined is not a function energy {point}",
-        "console log go brr {point}",
-        "segfault has entered the chat {point}"
-    ]
-}
-
-
+# Engagement topics, response templates and every keyword list live in keywords.json (see keywords.py)
 
 def get_system_prompt():
     """Returns the system prompt for a funny, edgy personality with swag."""
@@ -124,7 +58,7 @@ def get_system_prompt():
     You're the account that makes people say "this is why I have trust issues" while they're dying of laughter.
     """
 
-def get_random_tweet_prompt():
+def get_random_tweet_prompt(rng=random):
     """Returns a random prompt for generating diverse, funny tweets."""
     prompts = [
         # Life & Work Relatable Content
@@ -185,150 +119,182 @@ def get_random_tweet_prompt():
         "Share your thoughts on people who flex with rented luxury items"
     ]
     
-    return random.choice(prompts)
+    return rng.choice(prompts)
 
-def should_engage_with_content(tweet_text):
+def should_engage_with_content(tweet_text, rng=random):
     """Decide if we should engage based on content - MUCH more diverse interests."""
-    tweet_lower = tweet_text.lower()
+    tweet = text_features(tweet_text)
     
     # VERY HIGH engagement topics (funny, relatable content)
-    very_high_interest = [
-        "funny", "lol", "lmao", "meme", "viral", "ratio", "?", "question",
-        "dating", "relationship", "work", "job", "boss", "tired", "stressed",
-        "Monday", "weekend", "broke", "rent", "bills", "coffee", "sleep"
-    ]
-    if any(word in tweet_lower for word in very_high_interest):
-        return random.random() < 0.8  # 80% chance - very engaging content
+    if tweet.matches("very_high_interest"):
+        return rng.random() < 0.8  # 80% chance - very engaging content
     
     # HIGH engagement topics (entertaining content)
-    high_interest = [
-        "drama", "gossip", "celebrity", "movie", "tv", "netflix", "music",
-        "gaming", "anime", "food", "cooking", "travel", "weather", "pets",
-        "cats", "dogs", "animals", "conspiracy", "aliens", "space"
-    ]
-    if any(word in tweet_lower for word in high_interest):
-        return random.random() < 0.65  # 65% chance
+    if tweet.matches("high_interest"):
+        return rng.random() < 0.65  # 65% chance
     
     # MEDIUM engagement topics (general interest)
-    medium_interest = [
-        "tech", "ai", "programming", "crypto", "bitcoin", "stocks", "investing",
-        "twitter", "internet", "social media", "reddit", "tiktok", "youtube",
-        "sports", "football", "basketball", "politics", "news", "hot take",
-        "unpopular opinion", "thoughts", "philosophy", "science"
-    ]
-    if any(word in tweet_lower for word in medium_interest):
-        return random.random() < 0.45  # 45% chance
+    if tweet.matches("medium_interest"):
+        return rng.random() < 0.45  # 45% chance
     
     # Look for engaging tweet patterns (questions, opinions, relatable stuff)
-    engaging_patterns = [
-        "anyone else", "does anyone", "am i the only", "hot take", "unpopular opinion",
-        "change my mind", "prove me wrong", "thoughts?", "agree?", "disagree?",
-        "tell me", "explain", "why do", "how do", "what if", "imagine if"
-    ]
-    if any(pattern in tweet_lower for pattern in engaging_patterns):
-        return random.random() < 0.7  # 70% chance - these are usually engaging
+    if tweet.matches("engaging_patterns"):
+        return rng.random() < 0.7  # 70% chance - these are usually engaging
     
     # Still engage with random stuff sometimes to stay diverse
-    return random.random() < 0.25  # 25% chance - more generous baseline
+    return rng.random() < 0.25  # 25% chance - more generous baseline
 
-def should_retweet_content(tweet_text):
+def should_retweet_content(tweet_text, rng=random):
     """Decide if content is worth retweeting - only the most based content."""
-    tweet_lower = tweet_text.lower()
-    
-    # Degenerate-worthy retweet content
-    retweet_keywords = [
-        # Actually good tech content
-        "skill issue", "works on my machine", "spaghetti code", "junior dev", "bootcamp",
-        # Savage/funny content
-        "rekt", "cope", "seethe", "mald", "ngmi", "gmi", "based", "cringe", "kek",
-        # Financial destruction humor
-        "bagholding", "diamond handed to zero", "portfolio down", "got rugged",
-        # Internet culture
-        "touching grass", "chronically online", "normies", "anon", "fren"
-    ]
-    
-    # Don't retweet normie spam or actual financial advice
-    spam_keywords = [
-        "click here", "follow for follow", "dm me", "free money", 
-        "100x returns", "guaranteed profit", "buy now", "limited time",
-        "financial advice", "not financial advice", "investment opportunity"
-    ]
+    tweet = text_features(tweet_text)
     
     # Check for spam content
-    if any(spam in tweet_lower for spam in spam_keywords):
+    if tweet.matches("spam"):
         return False
     
     # Check for actually based content
-    if any(keyword in tweet_lower for keyword in retweet_keywords):
-        return random.random() < 0.9  # 90% chance to retweet truly degenerate content
+    if tweet.matches("retweet"):
+        return rng.random() < 0.9  # 90% chance to retweet truly degenerate content
     
     # Maybe retweet general tech/crypto if it seems decent
-    decent_keywords = ["programming", "coding", "bitcoin", "ethereum", "developer"]
-    if any(keyword in tweet_lower for keyword in decent_keywords):
-        return random.random() < 0.3  # 30% chance
+    if tweet.matches("decent_retweet"):
+        return rng.random() < 0.3  # 30% chance
     
     # Default very low chance for normie content
-    return random.random() < 0.05  # 5% chance
+    return rng.random() < 0.05  # 5% chance
 
-def get_engagement_style(tweet_text):
+def get_engagement_style(tweet_text, rng=random):
     """Determine how to engage - DIVERSE styles for different topics."""
-    tweet_lower = tweet_text.lower()
-    
-    # Relatable life struggles - supportive roasting
-    if any(word in tweet_lower for word in ["work", "job", "boss", "tired", "stressed", "Monday", "broke", "rent", "bills"]):
-        return "relatable_life_roast"
-    
-    # Dating/relationship content - funny but not cruel
-    if any(word in tweet_lower for word in ["dating", "relationship", "single", "crush", "love", "ex", "breakup"]):
-        return "dating_comedy"
-    
-    # Entertainment content - fun engagement
-    if any(word in tweet_lower for word in ["movie", "tv", "netflix", "anime", "music", "celebrity", "drama"]):
-        return "entertainment_banter"
+    tweet = text_features(tweet_text)
     
-    # Food/lifestyle content - playful
-    if any(word in tweet_lower for word in ["food", "cooking", "coffee", "sleep", "weekend", "vacation", "travel"]):
-        return "lifestyle_jokes"
+    # First style in priority order whose keywords match
+    style = tweet.engagement_style
+    if style is not None:
+        return style
     
-    # Gaming content - gamer humor
-    if any(word in tweet_lower for word in ["gaming", "game", "console", "pc", "mobile", "esports"]):
-        return "gaming_banter"
-    
-    # Pets/animals - wholesome but funny
-    if any(word in tweet_lower for word in ["cat", "dog", "pet", "animal", "cute"]):
-        return "wholesome_funny"
-    
-    # Financial losses - maximum mockery (kept but reduced priority)
-    if any(word in tweet_lower for word in ["lost money", "portfolio down", "rekt", "crash", "bear market"]):
-        return "financial_destruction"
-    
-    # Crypto cope - destroy them (kept but reduced priority)
-    if any(word in tweet_lower for word in ["crypto", "bitcoin", "moon", "diamond hands", "hodl"]):
-        return "crypto_annihilation"
-    
-    # Tech failures - skill issue (kept)
-    if any(word in tweet_lower for word in ["bug", "broken", "error", "crash", "fail", "doesn't work"]):
-        return "skill_issue"
-    
-    # Bad takes - roast but lighter
-    if any(word in tweet_lower for word in ["unpopular opinion", "hot take", "am i wrong", "thoughts?"]):
-        return "opinion_roast"
+    # Default to varied engagement styles
+    return rng.choice(tweet.config.default_engagement_styles)
+
+def find_keyword_offsets(data, keywords):
+    """Byte offsets of every keyword occurrence in a uint8 buffer, found with array operations.
     
-    # Actually based takes - rare respect
-    if any(word in tweet_lower for word in ["based", "facts", "truth", "exactly", "this", "agree"]):
-        return "rare_respect"
+    Positions are bucketed by their first two bytes once; each keyword then only checks its
+    own bucket, one byte column at a time.
+    """
+    max_length = max(len(keyword) for keyword in keywords)
+    padded = np.concatenate((data, np.zeros(max_length, dtype=np.uint8)))
+    pair_codes = (padded[:-1].astype(np.uint16) << 8) | padded[1:]
+    
+    wanted = np.zeros(1 << 16, dtype=bool)
+    for keyword in keywords:
+        if len(keyword) >= 2:
+            wanted[(keyword[0] << 8) | keyword[1]] = True
+    candidates = np.flatnonzero(wanted[pair_codes[:len(data)]])
+    candidate_codes = pair_codes[candidates]
+    order = np.argsort(candidate_codes, kind="stable")
+    candidates = candidates[order]
+    candidate_codes = candidate_codes[order]
+    
+    offsets = {}
+    for keyword in keywords:
+        if len(keyword) == 1:
+            offsets[keyword] = np.flatnonzero(data == keyword[0])
+            continue
+        code = (keyword[0] << 8) | keyword[1]
+        low, high = np.searchsorted(candidate_codes, [code, code + 1])
+        positions = candidates[low:high]
+        for i in range(2, len(keyword)):
+            positions = positions[padded[positions + i] == keyword[i]]
+        offsets[keyword] = positions
+    return offsets
+
+FEATURE_CHUNK_SIZE = 50000  # Tweets per chunk - keeps the working arrays cache-sized
+
+def build_feature_matrix(tweet_texts, config=None):
+    """N x len(config.feature_columns) int matrix of keyword-category hits, question marks and length.
     
-    # Questions - be helpful but funny
-    if "?" in tweet_text or any(word in tweet_lower for word in ["help", "how", "why", "what", "explain"]):
-        return "helpful_sarcasm"
+    Texts are lowercased and joined into one byte buffer per chunk so keyword matching runs as
+    NumPy array operations; match offsets are mapped back to tweet rows with searchsorted.
+    """
+    config = config or keywords.active()
+    count = len(tweet_texts)
+    num_categories = len(config.feature_categories)
+    matrix = np.zeros((count, len(config.feature_columns)), dtype=np.int32)
+    keyword_index = config.keyword_index
+    all_keywords = [keyword for keyword, _ in keyword_index]
+    
+    for chunk_start in range(0, count, FEATURE_CHUNK_SIZE):
+        chunk = tweet_texts[chunk_start:chunk_start + FEATURE_CHUNK_SIZE]
+        chunk_size = len(chunk)
+        encoded = [text.lower().encode("utf-8") for text in chunk]
+        byte_lengths = np.fromiter(map(len, encoded), dtype=np.int64, count=chunk_size)
+        row_starts = np.concatenate(([0], np.cumsum(byte_lengths + 1)[:-1]))
+        data = np.frombuffer(b"\x00".join(encoded), dtype=np.uint8)  # Separator never appears in a keyword
+        offsets = find_keyword_offsets(data, all_keywords)
+        
+        rows_by_column = [[] for _ in range(num_categories)]
+        for keyword, columns in keyword_index:
+            if len(offsets[keyword]) == 0:
+                continue
+            rows = np.searchsorted(row_starts, offsets[keyword], side="right") - 1
+            for column in columns:
+                rows_by_column[column].append(rows)
+        
+        block = matrix[chunk_start:chunk_start + chunk_size]
+        for column, row_lists in enumerate(rows_by_column):
+            if row_lists:
+                block[:, column] = np.bincount(np.concatenate(row_lists), minlength=chunk_size)
+        block[:, num_categories] = np.fromiter((text.count("?") for text in chunk), dtype=np.int32, count=chunk_size)
+        block[:, num_categories + 1] = np.fromiter(map(len, chunk), dtype=np.int32, count=chunk_size)
+    
+    return matrix
+
+def classify_batch(tweet_texts, rng=None, config=None):
+    """Classify many tweets at once - same probabilities as the per-tweet functions.
     
-    # Default to varied engagement styles
-    return random.choice([
-        "relatable_life_roast", "dating_comedy", "entertainment_banter", 
-        "lifestyle_jokes", "opinion_roast", "helpful_sarcasm", "rare_respect"
-    ])
+    Returns a dict of arrays: engage (bool), retweet (bool), style (str) and the feature matrix.
+    rng is a NumPy Generator; by default it is seeded from the global `random` state.
+    """
+    if rng is None:
+        rng = np.random.default_rng(random.getrandbits(64))  # Follows the global random seed
+    
+    config = config or keywords.active()  # One version for the whole batch, even if the file changes meanwhile
+    features = build_feature_matrix(tweet_texts, config)
+    num_categories = len(config.feature_categories)
+    hits = features[:, :num_categories] > 0
+    column = {name: i for i, name in enumerate(config.feature_columns)}
+    draws = rng.random((len(tweet_texts), 3))  # engage, retweet, default style
+    
+    # Engagement: first matching tier sets the probability (see should_engage_with_content)
+    engage_probability = np.select(
+        [hits[:, column["very_high_interest"]], hits[:, column["high_interest"]],
+         hits[:, column["medium_interest"]], hits[:, column["engaging_patterns"]]],
+        [0.8, 0.65, 0.45, 0.7],
+        default=0.25
+    )
+    
+    # Retweets: spam never, based content 90%, decent 30%, else 5% (see should_retweet_content)
+    retweet_probability = np.select(
+        [hits[:, column["spam"]], hits[:, column["retweet"]], hits[:, column["decent_retweet"]]],
+        [0.0, 0.9, 0.3],
+        default=0.05
+    )
+    
+    # Style: first matching style in priority order, otherwise a random default style
+    style_names = np.array([style for style, _ in config.engagement_styles], dtype=object)
+    default_styles = np.array(config.default_engagement_styles, dtype=object)
+    style_hits = hits[:, num_categories - len(config.engagement_styles):]
+    default_index = np.minimum((draws[:, 2] * len(default_styles)).astype(int), len(default_styles) - 1)
+    styles = np.where(style_hits.any(axis=1), style_names[style_hits.argmax(axis=1)], default_styles[default_index])
+    
+    return {
+        "engage": draws[:, 0] < engage_probability,
+        "retweet": draws[:, 1] < retweet_probability,
+        "style": styles,
+        "features": features,
+    }
 
-def get_bio_update():
+def get_bio_update(rng=random):
     """Generate a new bio that screams unhinged degenerate energy."""
     bios = [
         "professional portfolio destroyer and cope detector",
@@ -342,7 +308,7 @@ def get_bio_update():
         "allergic to grass, addicted to chaos",
         "portfolio down 90% but vibes immaculate"
     ]
-    return random.choice(bios)
+    return rng.choice(bios)
 
 def enhance_tweet(tweet_text):
     """Keep tweets clean and natural - no enhancement needed."""
@@ -350,9 +316,9 @@ def enhance_tweet(tweet_text):
     # Let the AI generate clean content naturally
     return tweet_text
 
-def get_thread_prompt():
+def get_thread_prompt(rng=random):
     """Generate a prompt for creating a thread."""
-    topic = random.choice(ENGAGEMENT_TOPICS)
+    topic = rng.choice(keywords.active().engagement_topics)
     thread_styles = [
         f"Share some thoughts about {topic} in a thread",
         f"Explain something interesting about {topic}",
@@ -363,11 +329,11 @@ def get_thread_prompt():
         f"Share a story or experience related to {topic}"
     ]
     
-    return random.choice(thread_styles)
+    return rng.choice(thread_styles)
 
-def should_engage_with_thread_content(thread_text):
+def should_engage_with_thread_content(thread_text, rng=random):
     """Enhanced engagement logic for threads."""
-    thread_lower = thread_text.lower()
+    thread_lower = text_features(thread_text).lower
     
     # Count relevant keywords from our engagement topics
     keyword_count = 0
@@ -376,22 +342,23 @@ def should_engage_with_thread_content(thread_text):
     
     # Threads with multiple relevant keywords are more interesting
     if keyword_count >= 2:
-        return random.random() < 0.8  # 80% chance
+        return rng.random() < 0.8  # 80% chance
     elif keyword_count >= 1:
-        return random.random() < 0.5  # 50% chance
+        return rng.random() < 0.5  # 50% chance
     else:
-        return random.random() < 0.15  # 15% chance for other threads
+        return rng.random() < 0.15  # 15% chance for other threads
 
-def get_thread_continuation_style(thread_content):
+def get_thread_continuation_style(thread_content, rng=random):
     """Determine how to continue someone else's thread."""
-    thread_lower = thread_content.lower()
+    thread = text_features(thread_content)
+    thread_lower = thread.lower
     
     # Tech threads - share knowledge
     if any(word in thread_lower for word in ["programming", "coding", "javascript", "python", "ai", "tech"]):
         return "tech"
     
     # Question threads - be curious
-    if "?" in thread_content or any(word in thread_lower for word in ["what", "how", "why", "who"]):
+    if thread.has_question or any(word in thread_lower for word in ["what", "how", "why", "who"]):
         return "curious"
     
     # Funny threads - be playful
@@ -399,14 +366,14 @@ def get_thread_continuation_style(thread_content):
         return "funny"
     
     # Default styles
-    return random.choice(["agreement", "disagreement"])
+    return rng.choice(["agreement", "disagreement"])
 
-def enhance_thread_tweet(tweet_text, thread_position="middle"):
+def enhance_thread_tweet(tweet_text, thread_position="middle", rng=random):
     """Keep thread tweets clean and natural."""
     # Just add simple thread indicators without emojis
-    if thread_position == "start" and random.random() < 0.2:
+    if thread_position == "start" and rng.random() < 0.2:
         tweet_text = f"thread: {tweet_text}"
-    elif thread_position == "end" and random.random() < 0.2:
+    elif thread_position == "end" and rng.random() < 0.2:
         tweet_text = f"{tweet_text} /end"
     
     return tweet_text
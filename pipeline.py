@@ -0,0 +1,285 @@
+"""
+Engagement pipeline for Baggy Moonz Twitter Bot
+The browser thread owns the Selenium driver: it produces tweet records and executes actions.
+A small pool of worker threads consumes the records, runs the personality decisions and
+LLM generation, and hands finished action requests back through a queue. A whole intake
+batch can also be submitted as one unit, so its replies can share one generation request.
+"""
+import time
+import queue
+import logging
+import threading
+from collections import deque
+from contextlib import contextmanager
+
+from logs import log_event
+
+logger = logging.getLogger("BaggyMoonz")
+
+
+class TweetRecord:
+    """Plain snapshot of a tweet - safe to hand to workers (no WebElements inside)."""
+
+    def __init__(self, tweet_id, username, text, is_thread=False, source="timeline",
+                 status_id=None, created_at=None):
+        self.tweet_id = tweet_id
+        self.username = username
+        self.text = text
+        self.is_thread = is_thread
+        self.source = source
+        self.status_id = status_id  # Numeric status ID from the permalink, when known
+        self.created_at = created_at  # Unix seconds, when known
+        self.produced_at = time.time()
+
+        # Filled in by batch classification (None until classified)
+        self.engage = None
+        self.retweet = None
+        self.engagement_style = None
+
+
+class ActionRequest:
+    """A finished decision for the browser thread to carry out."""
+
+    def __init__(self, record, action, engagement_style=None, content=None, engaged=True):
+        self.record = record
+        self.action = action  # 'like', 'reply', 'retweet', 'follow' or 'skip'
+        self.engagement_style = engagement_style
+        self.content = content  # Final reply text (already prefixed with @username)
+        self.engaged = engaged  # Whether the tweet should be marked as engaged with
+        self.ready_at = time.time()
+
+
+class EngagementPipeline:
+    """Worker pool between the browser (producer/executor) and the LLM-heavy decision code."""
+
+    def __init__(self, prepare_fn, workers=2, max_pending=20, prepare_batch_fn=None):
+        self.prepare_fn = prepare_fn  # record -> ActionRequest, must never touch the driver
+        self.prepare_batch_fn = prepare_batch_fn  # [records] -> iterable of ActionRequests, one per record
+        self.num_workers = max(1, workers)
+        self.intake = queue.Queue(maxsize=max_pending)
+        self.actions = queue.Queue()
+        self._threads = []
+        self._stop_event = threading.Event()
+        self._lock = threading.Lock()
+        self._outstanding = 0
+
+        # Metrics
+        self.submitted = 0
+        self.completed = 0
+        self.dropped = 0
+        self.failed = 0
+        self.max_intake_depth = 0
+        self.max_action_depth = 0
+        self.prepare_seconds = 0.0
+        self._worker_spans = deque(maxlen=1000)  # (start, end) of worker busy time
+        self._browser_spans = deque(maxlen=1000)  # (start, end) of browser busy time
+
+    def start(self):
+        """Start the worker threads (no-op if already running)."""
+        if self._threads:
+            return
+        self._stop_event.clear()
+        for i in range(self.num_workers):
+            thread = threading.Thread(target=self._worker_loop, name=f"llm-worker-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        logger.info(f"🧵 Engagement pipeline started with {self.num_workers} workers")
+
+    def stop(self, timeout=5):
+        """Stop the workers; records still queued are discarded."""
+        if not self._threads:
+            return
+        self._stop_event.set()
+        for thread in self._threads:
+            thread.join(timeout=timeout)
+        self._threads = []
+        logger.info("🧵 Engagement pipeline stopped")
+
+    @property
+    def outstanding(self):
+        """Records submitted whose action has not been collected yet."""
+        with self._lock:
+            return self._outstanding
+
+    def submit(self, record, timeout=1):
+        """Queue a record for the workers. Returns False if the intake queue stayed full."""
+        self._reserve(1)
+        try:
+            self.intake.put(record, timeout=timeout)
+        except queue.Full:
+            self._reserve(-1)
+            self.dropped += 1
+            logger.warning(f"⚠️ Pipeline intake full, dropping tweet from @{record.username}")
+            return False
+        with self._lock:
+            self.submitted += 1
+            self.max_intake_depth = max(self.max_intake_depth, self.intake.qsize())
+        return True
+
+    def submit_batch(self, records, timeout=1):
+        """Queue several records as one unit for prepare_batch_fn (one by one if there is none)."""
+        if self.prepare_batch_fn is None or len(records) < 2:
+            return all([self.submit(record, timeout) for record in records])
+        self._reserve(len(records))
+        try:
+            self.intake.put(list(records), timeout=timeout)
+        except queue.Full:
+            self._reserve(-len(records))
+            self.dropped += len(records)
+            logger.warning(f"⚠️ Pipeline intake full, dropping a batch of {len(records)} tweets")
+            return False
+        with self._lock:
+            self.submitted += len(records)
+            self.max_intake_depth = max(self.max_intake_depth, self.intake.qsize())
+        return True
+
+    def _reserve(self, count):
+        """Count records as outstanding before a worker can see them (negative undoes a failed put)."""
+        with self._lock:
+            self._outstanding += count
+
+    def poll_actions(self):
+        """Return every action that is ready right now without blocking."""
+        ready = []
+        while True:
+            try:
+                ready.append(self.actions.get_nowait())
+            except queue.Empty:
+                break
+        self._collected(len(ready))
+        return ready
+
+    def drain(self, timeout=120):
+        """Yield actions as they finish until nothing is outstanding or the timeout passes."""
+        deadline = time.time() + timeout
+        while self.outstanding > 0:
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                logger.warning(f"⚠️ Pipeline drain timed out with {self.outstanding} actions pending")
+                return
+            try:
+                action = self.actions.get(timeout=min(remaining, 1))
+            except queue.Empty:
+                continue
+            self._collected(1)
+            yield action
+
+    def _collected(self, count):
+        if count:
+            with self._lock:
+                self._outstanding -= count
+
+    @contextmanager
+    def browser_span(self):
+        """Mark a stretch of browser-thread work so overlap with the workers can be measured."""
+        start = time.time()
+        try:
+            yield
+        finally:
+            self._browser_spans.append((start, time.time()))
+
+    def _worker_loop(self):
+        while not self._stop_event.is_set():
+            try:
+                item = self.intake.get(timeout=0.5)
+            except queue.Empty:
+                continue
+
+            start = time.time()
+            if isinstance(item, list):
+                self._prepare_batch(item, start)
+                continue
+            try:
+                action = self.prepare_fn(item)
+            except Exception as e:
+                logger.error(f"❌ Worker failed preparing tweet from @{item.username}: {e}")
+                action = ActionRequest(item, "skip", engaged=False)
+                self.failed += 1
+            self._finish(action, start)
+
+    def _prepare_batch(self, records, start):
+        """Hand each of the batch's actions over as soon as it's ready (likes don't wait for the replies)."""
+        pending = {id(record): record for record in records}
+        batch_start = start
+        try:
+            for action in self.prepare_batch_fn(records):
+                pending.pop(id(action.record), None)
+                start = self._finish(action, start, batch_start)
+        except Exception as e:
+            logger.error(f"❌ Worker failed preparing a batch of {len(records)} tweets: {e}")
+            self.failed += len(pending)
+        for record in pending.values():
+            start = self._finish(ActionRequest(record, "skip", engaged=False), start, batch_start)
+
+    def _finish(self, action, start, batch_start=None):
+        """Record a prepared action and queue it for the browser thread; returns when it finished."""
+        end = time.time()
+        record = action.record
+        with self._lock:
+            self.completed += 1
+            self.prepare_seconds += end - start  # Batches count each stretch of work once
+            self._worker_spans.append((start, end))
+        log_event("decision", tweet_id=record.tweet_id, author=record.username, source=record.source,
+                  action=action.action, style=action.engagement_style, has_content=action.content is not None,
+                  queued_ms=round(((batch_start or start) - record.produced_at) * 1000),
+                  prepare_ms=round((end - (batch_start or start)) * 1000))
+        self.actions.put(action)
+        with self._lock:
+            self.max_action_depth = max(self.max_action_depth, self.actions.qsize())
+        return end
+
+    def overlap_ratio(self):
+        """Share of worker busy time that ran while the browser thread was also busy."""
+        with self._lock:
+            worker_spans = sorted(self._worker_spans)
+        browser_spans = sorted(self._browser_spans)
+        if not worker_spans:
+            return 0.0
+
+        # Merge browser spans into disjoint intervals
+        merged = []
+        for start, end in browser_spans:
+            if merged and start <= merged[-1][1]:
+                merged[-1][1] = max(merged[-1][1], end)
+            else:
+                merged.append([start, end])
+
+        busy = 0.0
+        overlap = 0.0
+        j = 0
+        for start, end in worker_spans:
+            busy += end - start
+            while j < len(merged) and merged[j][1] <= start:
+                j += 1
+            k = j
+            while k < len(merged) and merged[k][0] < end:
+                overlap += min(end, merged[k][1]) - max(start, merged[k][0])
+                k += 1
+        return overlap / busy if busy > 0 else 0.0
+
+    def metrics(self):
+        """Snapshot of queue depths, throughput and overlap."""
+        with self._lock:
+            completed = self.completed
+            prepare_seconds = self.prepare_seconds
+            snapshot = {
+                "submitted": self.submitted,
+                "completed": completed,
+                "dropped": self.dropped,
+                "failed": self.failed,
+                "outstanding": self._outstanding,
+                "max_intake_depth": self.max_intake_depth,
+                "max_action_depth": self.max_action_depth,
+            }
+        snapshot["intake_depth"] = self.intake.qsize()
+        snapshot["action_depth"] = self.actions.qsize()
+        snapshot["avg_prepare_seconds"] = prepare_seconds / completed if completed else 0.0
+        snapshot["overlap_ratio"] = self.overlap_ratio()
+        return snapshot
+
+    def format_metrics(self):
+        """One-line summary for the log."""
+        m = self.metrics()
+        return (f"submitted={m['submitted']} completed={m['completed']} dropped={m['dropped']} "
+                f"intake={m['intake_depth']}/{m['max_intake_depth']} actions={m['action_depth']}/{m['max_action_depth']} "
+                f"avg_prepare={m['avg_prepare_seconds']:.1f}s overlap={m['overlap_ratio']:.0%}")
@@ -0,0 +1,237 @@
+"""
+Profiling mode for Baggy Moonz Twitter Bot
+Replays fixture tweets through the bot's decision path for N cycles - batch classification,
+engagement decisions, reply generation, proofreading and relevance checks, original tweets -
+against the mock LLM with sleeps switched off. cProfile runs during every cycle and
+tracemalloc snapshots are taken at cycle boundaries, so the report shows where time goes,
+which lines allocate, and what keeps growing from one cycle to the next.
+
+The soak mode runs the same replay for many cycles without the profilers and charts the
+process's memory over time; browser memory from a live run can be charted from the
+`browser_memory` events in the JSONL event log.
+
+Usage:
+    python bot.py --profile [--cycles 20] [--batch 8] [--report profile.txt]
+    python bot.py --soak [--cycles 2000] [--csv soak.csv]
+    python bot.py --chart-events baggy_moonz.events.jsonl
+"""
+import io
+import os
+import csv
+import json
+import time
+import random
+import pstats
+import cProfile
+import logging
+import tempfile
+import tracemalloc
+
+import timing
+from browser import process_rss
+from personality import get_random_tweet_prompt
+from offline import MockChatClient, load_fixture_items, fixture_records
+
+logger = logging.getLogger("BaggyMoonz")
+
+SNAPSHOT_FILTERS = [
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"),
+    tracemalloc.Filter(False, "<unknown>"),
+]
+
+
+def replay_cycle(bot, items, cycle_number, batch, rng):
+    """One timeline-style pass over a window of fixture tweets; returns the actions taken."""
+    start = (cycle_number * batch) % len(items)
+    window = [items[(start + i) % len(items)] for i in range(batch)]
+    # Each pass over the fixtures gets fresh IDs, like new tweets on a real timeline
+    records = fixture_records(window, tag=f"#{(cycle_number * batch) // len(items)}")
+    records = [record for record in records if not bot.state.has_engaged(record.tweet_id)]
+    bot.classify_records(records)
+
+    # Inline on this thread: cProfile only sees the thread it was enabled on
+    prepare_batch = bot.pipeline.prepare_batch_fn
+    prepared = prepare_batch(records) if prepare_batch else map(bot.prepare_engagement, records)
+    actions = []
+    for action in prepared:
+        record = action.record
+        if action.action != "skip":
+            bot.state.record_engagement(record.tweet_id, record.username, action.action)
+        actions.append(action.action)
+
+    if rng.random() < 0.3:
+        bot.generate_content(get_random_tweet_prompt(), "original tweet")
+    return actions
+
+
+def format_stats(profiler, top):
+    stream = io.StringIO()
+    stats = pstats.Stats(profiler, stream=stream)
+    stats.strip_dirs().sort_stats(pstats.SortKey.CUMULATIVE).print_stats(top)
+    return stream.getvalue().rstrip()
+
+
+def format_allocations(snapshot, top):
+    lines = []
+    for stat in snapshot.statistics("lineno")[:top]:
+        frame = stat.traceback[0]
+        lines.append(f"  {stat.size / 1024:>9.1f} KiB {stat.count:>7} blocks  "
+                     f"{os.path.basename(frame.filename)}:{frame.lineno}")
+    return "\n".join(lines)
+
+
+def format_growth(first, last, top):
+    lines = []
+    for stat in last.compare_to(first, "lineno")[:top]:
+        if stat.size_diff <= 0:
+            continue
+        frame = stat.traceback[0]
+        lines.append(f"  {stat.size_diff / 1024:>+9.1f} KiB {stat.count_diff:>+7} blocks  "
+                     f"{os.path.basename(frame.filename)}:{frame.lineno}")
+    return "\n".join(lines) or "  (nothing grew)"
+
+
+def run_profile(bot_factory, cycles=20, batch=8, top=25, report_path=None, seed=42):
+    """Profile `cycles` offline replay cycles and return the report text.
+
+    bot_factory(llm_client=..., state_path=..., mentions_path=..., rng=...) builds the bot under test.
+    """
+    rng = random.Random(seed)  # Shared by the replay and the bot's own decisions - one thread, one sequence
+    items = load_fixture_items()
+    workdir = tempfile.mkdtemp(prefix="baggy_profile_")
+    mock = MockChatClient(seed=seed)
+    bot = bot_factory(llm_client=mock, state_path=os.path.join(workdir, "state.db"),
+                      mentions_path=os.path.join(workdir, "mentions.json"), rng=rng)
+    timing.TIMINGS.sleep_enabled = False
+
+    profiler = cProfile.Profile()
+    tracemalloc.start(10)
+    snapshots = [tracemalloc.take_snapshot().filter_traces(SNAPSHOT_FILTERS)]
+    cycle_rows = []
+    action_counts = {}
+    try:
+        for cycle_number in range(cycles):
+            start = time.perf_counter()
+            profiler.enable()
+            actions = replay_cycle(bot, items, cycle_number, batch, rng)
+            profiler.disable()
+            elapsed = time.perf_counter() - start
+            for action in actions:
+                action_counts[action] = action_counts.get(action, 0) + 1
+            snapshots.append(tracemalloc.take_snapshot().filter_traces(SNAPSHOT_FILTERS))
+            current, peak = tracemalloc.get_traced_memory()
+            cycle_rows.append((cycle_number + 1, elapsed, len(actions), current, peak))
+    finally:
+        tracemalloc.stop()
+        timing.TIMINGS.sleep_enabled = True
+        bot.state.close()
+
+    lines = [f"=== Profile: {cycles} cycles x {batch} fixture tweets, mock LLM, sleeps off ===",
+             f"LLM calls: {mock.calls}  skipped sleep: {timing.TIMINGS.skipped_sleep:.0f}s  actions: "
+             + " ".join(f"{action}={count}" for action, count in sorted(action_counts.items())),
+             "", "--- Per cycle ---",
+             f"  {'cycle':>5} {'seconds':>8} {'tweets':>6} {'traced KiB':>11} {'peak KiB':>9}"]
+    for number, elapsed, tweets, current, peak in cycle_rows:
+        lines.append(f"  {number:>5} {elapsed:>8.3f} {tweets:>6} {current / 1024:>11.1f} {peak / 1024:>9.1f}")
+    lines += ["", f"--- Top {top} functions by cumulative time ---", format_stats(profiler, top),
+              "", f"--- Top {top} allocation sites (after last cycle) ---", format_allocations(snapshots[-1], top)]
+    # Cycle 1 warms caches (encodings, regexes, the DB connection) - measure growth after it
+    baseline = snapshots[1] if len(snapshots) > 2 else snapshots[0]
+    lines += ["", f"--- Growth from cycle 1 to cycle {cycles} ---", format_growth(baseline, snapshots[-1], top)]
+    report = "\n".join(lines)
+
+    if report_path:
+        with open(report_path, "w") as f:
+            f.write(report + "\n")
+        profiler.dump_stats(os.path.splitext(report_path)[0] + ".prof")
+        logger.info(f"📈 Profile report written to {report_path}")
+    return report
+
+
+def ascii_chart(points, title, unit="MB", width=60, height=12):
+    """Plot (x, y) points as a small text chart; x is bucketed into `width` columns."""
+    points = [(x, y) for x, y in points if y is not None]
+    if not points:
+        return f"{title}: no data"
+    xs = [x for x, _ in points]
+    low, high = min(y for _, y in points), max(y for _, y in points)
+    span = (high - low) or 1.0
+    x0, x_span = xs[0], (xs[-1] - xs[0]) or 1
+    columns = {}
+    for x, y in points:
+        columns.setdefault(min(width - 1, int((x - x0) / x_span * (width - 1))), []).append(y)
+    heights = {col: round((max(ys) - low) / span * (height - 1)) for col, ys in columns.items()}
+    lines = [f"{title} (min {low:.1f}{unit}, max {high:.1f}{unit})"]
+    for row in range(height - 1, -1, -1):
+        label = f"{low + span * row / (height - 1):>8.1f} |"
+        lines.append(label + "".join("*" if heights.get(col) == row else
+                                     ("." if col in heights and heights[col] > row else " ") for col in range(width)))
+    lines.append(" " * 9 + "+" + "-" * width)
+    lines.append(" " * 10 + f"{xs[0]:<{width // 2}g}{xs[-1]:>{width - width // 2}g}")
+    return "\n".join(lines)
+
+
+def run_soak(bot_factory, cycles=2000, batch=8, sample_every=10, csv_path=None, seed=42):
+    """Replay `cycles` cycles with sleeps off, sampling process RSS and Python heap; returns charts."""
+    rng = random.Random(seed)
+    items = load_fixture_items()
+    workdir = tempfile.mkdtemp(prefix="baggy_soak_")
+    bot = bot_factory(llm_client=MockChatClient(seed=seed), state_path=os.path.join(workdir, "state.db"),
+                      mentions_path=os.path.join(workdir, "mentions.json"), rng=rng)
+    timing.TIMINGS.sleep_enabled = False
+    tracemalloc.start(1)
+    rows = []
+    start = time.perf_counter()
+    try:
+        for cycle_number in range(1, cycles + 1):
+            replay_cycle(bot, items, cycle_number - 1, batch, rng)
+            if cycle_number % sample_every == 0 or cycle_number == 1:
+                rss = process_rss(os.getpid())
+                rows.append({
+                    "cycle": cycle_number,
+                    "elapsed_s": round(time.perf_counter() - start, 2),
+                    "rss_mb": round(rss / 1024 / 1024, 2) if rss is not None else None,
+                    "py_heap_mb": round(tracemalloc.get_traced_memory()[0] / 1024 / 1024, 2),
+                    "engagements": bot.state.engagement_count(),
+                })
+    finally:
+        tracemalloc.stop()
+        timing.TIMINGS.sleep_enabled = True
+        bot.state.close()
+
+    if csv_path:
+        with open(csv_path, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+            writer.writeheader()
+            writer.writerows(rows)
+    first, last = rows[0], rows[-1]
+    summary = (f"=== Soak: {cycles} cycles x {batch} tweets in {last['elapsed_s']:.0f}s, "
+               f"{last['engagements']} engagements stored ===\n"
+               f"RSS {first['rss_mb']} -> {last['rss_mb']} MB, Python heap {first['py_heap_mb']} -> {last['py_heap_mb']} MB")
+    return "\n\n".join([summary,
+                         ascii_chart([(row["cycle"], row["rss_mb"]) for row in rows], "Process RSS by cycle"),
+                         ascii_chart([(row["cycle"], row["py_heap_mb"]) for row in rows], "Python heap by cycle")])
+
+
+def chart_events(path):
+    """Charts of browser RSS, JS heap and DOM nodes from a live run's browser_memory events."""
+    samples = []
+    with open(path) as f:
+        for line in f:
+            try:
+                event = json.loads(line)
+            except ValueError:
+                continue
+            if event.get("event") == "browser_memory":
+                samples.append(event)
+    if not samples:
+        return f"No browser_memory events in {path}"
+    t0 = samples[0]["ts"]
+    hours = [(sample["ts"] - t0) / 3600 for sample in samples]
+    return "\n\n".join([
+        f"=== Browser memory: {len(samples)} samples over {hours[-1]:.1f}h (x axis in hours) ===",
+        ascii_chart(list(zip(hours, (s.get("rss_mb") for s in samples))), "Chrome + chromedriver RSS"),
+        ascii_chart(list(zip(hours, (s.get("heap_mb") for s in samples))), "Renderer JS heap"),
+        ascii_chart(list(zip(hours, (s.get("nodes") for s in samples))), "DOM nodes", unit=""),
+    ])
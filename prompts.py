@@ -0,0 +1,396 @@
+"""
+Prompt assembly for Baggy Moonz Twitter Bot
+Engagement styles are data, the shared content rules live once in a fixed system prefix
+(byte-identical on every call, so provider-side prefix caching can kick in), and every
+assembled prompt is token-counted offline and tallied per call site.
+
+Run `python prompts.py` for a per-call-site token report over the fixture tweets.
+"""
+import os
+import re
+import json
+import math
+import logging
+import time
+import threading
+
+import keywords
+from personality import get_system_prompt
+from relevance import URL_PATTERN, MENTION_PATTERN, TICKER_PATTERN
+
+logger = logging.getLogger("BaggyMoonz")
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+# Output rules shared by every generation call - sent once in the system prefix, never per message
+OUTPUT_RULES = """OUTPUT RULES - NEVER BREAK THESE:
+1. NO emojis, NO hashtags, no symbols except basic punctuation (.,!?) and crypto tickers
+2. Crypto tickers like $BTC $ETH are allowed and encouraged
+3. Under 150 characters total, complete sentences only
+4. Never include usernames or @mentions in the text itself
+5. When replying, respond directly to what they actually said - no random roasts"""
+
+# Fixed prefix for all content generation: personality + rules, computed once
+CONTENT_SYSTEM_PROMPT = f"{get_system_prompt().rstrip()}\n\n{OUTPUT_RULES}"
+
+# Reply instructions per engagement style (see engagement_styles in keywords.json)
+REPLY_STYLES = {
+    "relatable_life_roast": "Write a funny, relatable reply that sympathizes with their struggle but roasts them gently. Be supportive but with humor.",
+    "dating_comedy": "Write a funny reply about dating/relationships. Be humorous but not mean-spirited.",
+    "entertainment_banter": "Write a fun, engaging reply about movies/TV/entertainment. Be conversational and entertaining.",
+    "lifestyle_jokes": "Write a playful, funny reply about food/coffee/lifestyle. Be light-hearted and relatable.",
+    "gaming_banter": "Write a funny gaming-related reply. Use gamer humor but be engaging.",
+    "wholesome_funny": "Write a wholesome but funny reply about pets/animals. Be positive and humorous.",
+    "helpful_sarcasm": "Write a helpful but slightly sarcastic reply that actually answers their question. Be useful but with humor.",
+    "opinion_roast": "Write a funny reply that playfully roasts their opinion. Be witty but not too harsh.",
+    "financial_destruction": "Write a savage reply mocking their financial decisions. Be brutal but relevant to their actual words.",
+    "crypto_annihilation": "Write a savage reply calling out their crypto delusions. Be brutal but address their content.",
+    "skill_issue": "Write a savage reply calling it a skill issue. Be brutal but respond to their actual words.",
+    "rare_respect": "Write a reply that actually respects what they said, acknowledging they're based. Be positive but still edgy.",
+}
+DEFAULT_REPLY_STYLE = "Write a funny, engaging reply. Be humorous and relatable but make sure it makes sense as a response."
+
+# Thread reply instructions per continuation style (see personality.get_thread_continuation_style)
+THREAD_STYLES = {
+    "tech": "Share your knowledge or experience casually.",
+    "curious": "Ask a follow-up question or show interest in the thread topic.",
+    "funny": "Be playful and engaging.",
+    "disagreement": "Politely offer a different perspective on the thread topic.",
+}
+DEFAULT_THREAD_STYLE = "Engage naturally and conversationally."
+
+REPLY_TEMPLATE = "Reply to @{username} who posted: '{text}'\n{instruction}"
+STRICT_REPLY_TEMPLATE = ("Reply to @{username} who posted: '{text}'\n"
+                         "Your last reply was off-topic. Respond directly to the words of their tweet.")
+THREAD_REPLY_TEMPLATE = "Reply to @{username}'s thread: '{text}'\n{instruction} Consider the full thread context."
+THREAD_CONTINUATION_TEMPLATE = ("Add your thoughts to this thread: '{text}'\n"
+                                "Be conversational. Share your perspective or ask a follow-up question.")
+RETRY_NOTE = "Previous attempt failed - make it shorter and cleaner but complete the sentence."
+
+# Several replies in one request: one block per tweet, answered as a JSON array keyed by the block IDs
+BATCH_REPLY_ITEM_TEMPLATE = "[{key}] @{username} posted: '{text}'\nStyle {style}: {instruction}"
+BATCH_REPLY_TEMPLATE = ("Write one reply to each of these {count} tweets, following each tweet's style.\n\n{items}\n\n"
+                        'Answer with only a JSON array, one object per tweet: [{{"id": "1", "style": "...", "reply": "..."}}]')
+BATCH_ITEM_PATTERN = re.compile(r"^\[(\w+)\] @(\w+) posted: '(.*?)'\nStyle (\w+):", re.MULTILINE | re.DOTALL)
+JSON_ARRAY_PATTERN = re.compile(r"\[.*\]", re.DOTALL)
+
+# Small classification prompts (system, user template)
+PROOFREAD_PROMPT = (
+    "Rate this Twitter reply from 1-10. Be very lenient with edgy/savage content as that's the personality. "
+    "Only rate 1-2 for spam/gibberish. Rate 5+ for decent replies, 7+ for good ones. Respond with just a number.",
+    "Rate this reply: {content}",
+)
+RELEVANCE_PROMPT = (
+    "You are checking if a Twitter reply makes sense. Be LENIENT - if replies share context or respond "
+    "to the topic, answer YES. Only say NO if completely unrelated.",
+    'Original tweet: "{original}"\nReply: "{reply}"\n'
+    "Relevant if it references the same topic, responds to the sentiment or question, or shares context "
+    "even if sarcastic. Answer YES or NO.",
+)
+MOOD_PROMPT = (
+    "You are a chill person who likes tech and internet culture. Decide if you feel like tweeting "
+    "something interesting. Answer YES or NO.",
+    "Do you feel like tweeting something right now? What's your mood?",
+)
+
+
+# Token budget for the tweet/thread text pasted into each call site's prompt
+INPUT_BUDGETS = {
+    "reply": 80,
+    "thread_reply": 150,
+    "thread_continuation": 120,
+    "relevance": 80,
+}
+
+# Scraped-timeline noise that carries nothing for the model
+QUOTE_PATTERN = re.compile(r'\n\s*Quote\s*\n.*', re.DOTALL)  # Quoted tweet appended after the author's text
+UI_TEXT_PATTERN = re.compile(r'^\s*Replying to .*$|\b(?:Show more|Show this thread|Translate post)\b', re.MULTILINE | re.IGNORECASE)
+THREAD_NUMBER_PATTERN = re.compile(r'(?:(?<=\s)|^)\d{1,2}/(?:\d{1,2})?(?=\s)')
+LEADING_MENTIONS_PATTERN = re.compile(r'^(?:@\w+\s+)+')
+SENTENCE_SPLIT_PATTERN = re.compile(r'(?<=[.!?])\s+|\n+')
+WHITESPACE_PATTERN = re.compile(r'[ \t\r\f\v]+')
+
+
+def normalize_input(text):
+    """Strip links, quoted tweets, UI text, reply-chain mentions and repeated mentions; collapse whitespace."""
+    text = QUOTE_PATTERN.sub('', text)
+    text = UI_TEXT_PATTERN.sub(' ', text)
+    text = URL_PATTERN.sub(' ', text)
+    text = THREAD_NUMBER_PATTERN.sub(' ', text)
+    text = LEADING_MENTIONS_PATTERN.sub('', text.strip())
+
+    # Keep the first occurrence of each remaining @mention
+    seen = set()
+    def dedupe_mention(match):
+        handle = match.group(0).lower()
+        if handle in seen:
+            return ''
+        seen.add(handle)
+        return match.group(0)
+    text = MENTION_PATTERN.sub(dedupe_mention, text)
+
+    lines = [WHITESPACE_PATTERN.sub(' ', line).strip() for line in text.split('\n')]
+    return '\n'.join(line for line in lines if line)
+
+
+def sentence_weight(sentence, position):
+    """How much a sentence tells the model what the tweet is about."""
+    lower = sentence.lower()
+    weight = 2.0 if position == 0 else 0.0  # The opening line carries the point
+    weight += sum(keyword in lower for keyword in keywords.active().interest_keywords)
+    weight += len(TICKER_PATTERN.findall(sentence))
+    weight += 1.0 if '?' in sentence else 0.0
+    return weight
+
+
+def trim_to_budget(text, max_tokens):
+    """Keep the highest-weighted sentences (in their original order) that fit in max_tokens."""
+    if count_tokens(text) <= max_tokens:
+        return text
+    sentences = [sentence.strip() for sentence in SENTENCE_SPLIT_PATTERN.split(text) if sentence.strip()]
+    ranked = sorted(range(len(sentences)), key=lambda i: (-sentence_weight(sentences[i], i), i))
+
+    kept = set()
+    used = 0
+    for i in ranked:
+        tokens = count_tokens(sentences[i]) + 1
+        if used + tokens <= max_tokens:
+            kept.add(i)
+            used += tokens
+    if not kept:
+        # A single oversized sentence - cut it at a word boundary
+        words = sentences[ranked[0]].split()
+        while words and count_tokens(' '.join(words)) > max_tokens - 1:
+            words = words[:max(1, len(words) * 3 // 4)] if len(words) > 1 else []
+        return ' '.join(words) + '...'
+    return ' '.join(sentences[i] for i in sorted(kept))
+
+
+def prepare_input(text, call_site):
+    """Normalize scraped text and trim it to the call site's token budget."""
+    text = normalize_input(text)
+    budget = INPUT_BUDGETS.get(call_site)
+    return trim_to_budget(text, budget) if budget else text
+
+
+def reply_prompt(username, tweet_text, engagement_style):
+    """User message for a reply in the given engagement style."""
+    instruction = REPLY_STYLES.get(engagement_style, DEFAULT_REPLY_STYLE)
+    return REPLY_TEMPLATE.format(username=username, text=prepare_input(tweet_text, "reply"), instruction=instruction)
+
+
+def strict_reply_prompt(username, tweet_text):
+    """User message for the second attempt after an off-topic reply."""
+    return STRICT_REPLY_TEMPLATE.format(username=username, text=prepare_input(tweet_text, "reply"))
+
+
+def thread_reply_prompt(username, thread_content, engagement_style):
+    """User message for a reply to a whole thread."""
+    instruction = THREAD_STYLES.get(engagement_style, DEFAULT_THREAD_STYLE)
+    return THREAD_REPLY_TEMPLATE.format(username=username, text=prepare_input(thread_content, "thread_reply"),
+                                        instruction=instruction)
+
+
+def thread_continuation_prompt(original_tweet_content):
+    return THREAD_CONTINUATION_TEMPLATE.format(text=prepare_input(original_tweet_content, "thread_continuation"))
+
+
+def batch_reply_prompt(items):
+    """User message asking for replies to several tweets; items are (key, username, tweet_text, style)."""
+    blocks = [BATCH_REPLY_ITEM_TEMPLATE.format(key=key, username=username, text=prepare_input(text, "reply"),
+                                               style=style, instruction=REPLY_STYLES.get(style, DEFAULT_REPLY_STYLE))
+              for key, username, text, style in items]
+    return BATCH_REPLY_TEMPLATE.format(count=len(blocks), items="\n\n".join(blocks))
+
+
+def parse_batch_replies(text):
+    """{key: reply} from a batch reply completion; raises ValueError when there's no JSON array in it.
+
+    LLMClient.complete turns that into BadOutput, so the request is retried."""
+    match = JSON_ARRAY_PATTERN.search(text)  # Models like to wrap JSON in a code fence
+    if not match:
+        raise ValueError("no JSON array in batch reply")
+    entries = json.loads(match.group(0))
+    if not isinstance(entries, list):
+        raise ValueError("batch reply is not a list")
+    return {str(entry["id"]): str(entry["reply"]).strip() for entry in entries
+            if isinstance(entry, dict) and "id" in entry and entry.get("reply")}
+
+
+def relevance_messages(reply, original):
+    """LLM tie-breaker messages for reply relevance."""
+    return classifier_messages(RELEVANCE_PROMPT, original=prepare_input(original, "relevance"),
+                               reply=normalize_input(reply))
+
+
+def content_messages(prompt, retry=False):
+    """Chat messages for content generation: fixed system prefix, then only the variable part."""
+    if retry:
+        prompt = f"{prompt}\n{RETRY_NOTE}"
+    return [
+        {"role": "system", "content": CONTENT_SYSTEM_PROMPT},
+        {"role": "user", "content": prompt},
+    ]
+
+
+def classifier_messages(prompt_pair, **fields):
+    """Chat messages for one of the small (system, user template) classification prompts."""
+    system, user = prompt_pair
+    return [
+        {"role": "system", "content": system},
+        {"role": "user", "content": user.format(**fields)},
+    ]
+
+
+# Offline token counting - tiktoken when it's installed with its encoding cached, else an estimate
+_encoding = None
+_encoding_checked = False
+_encoding_lock = threading.Lock()
+
+# GPT-style pre-tokenization: contractions, letter runs, digit groups, punctuation runs, whitespace
+PRETOKEN_PATTERN = re.compile(r"'s|'t|'re|'ve|'m|'ll|'d| ?[A-Za-z]+| ?\d{1,3}| ?[^\sA-Za-z\d]+|\s+")
+
+MESSAGE_OVERHEAD_TOKENS = 4  # Role/separator tokens per chat message
+REPLY_PRIMING_TOKENS = 3  # Every chat completion is primed with the assistant header
+
+
+def _get_encoding():
+    global _encoding, _encoding_checked
+    with _encoding_lock:
+        if not _encoding_checked:
+            _encoding_checked = True
+            try:
+                import tiktoken
+                _encoding = tiktoken.get_encoding("cl100k_base")
+            except Exception:
+                _encoding = None
+    return _encoding
+
+
+def estimate_tokens(text):
+    """BPE-like estimate: one token per short word or digit group, longer words and non-ASCII split further."""
+    tokens = 0
+    for piece in PRETOKEN_PATTERN.findall(text):
+        stripped = piece.strip()
+        if not stripped:
+            tokens += 1
+        elif not stripped.isascii():
+            tokens += math.ceil(len(stripped.encode("utf-8")) / 2)
+        elif stripped.isalpha():
+            tokens += max(1, math.ceil(len(stripped) / 6))
+        else:
+            tokens += math.ceil(len(stripped) / 2)  # Digits and punctuation
+    return tokens
+
+
+def count_tokens(text):
+    """Token count for a piece of text without any API call."""
+    encoding = _get_encoding()
+    if encoding is not None:
+        return len(encoding.encode(text))
+    return estimate_tokens(text)
+
+
+def count_message_tokens(messages):
+    """Input tokens for a chat completion request."""
+    return REPLY_PRIMING_TOKENS + sum(MESSAGE_OVERHEAD_TOKENS + count_tokens(message["content"]) for message in messages)
+
+
+class TokenLedger:
+    """Input tokens sent per call site, split into the shared system prefix and the variable part."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._sites = {}
+        self._prefix_cache = {}  # System prompts are fixed strings - count each one once
+
+    def _prefix_tokens(self, system):
+        tokens = self._prefix_cache.get(system)
+        if tokens is None:
+            tokens = MESSAGE_OVERHEAD_TOKENS + count_tokens(system)
+            self._prefix_cache[system] = tokens
+        return tokens
+
+    def record(self, call_site, messages, response=None):
+        """Count an outgoing request; `response.usage` is folded in when the API reports it."""
+        prefix = self._prefix_tokens(messages[0]["content"]) if messages and messages[0]["role"] == "system" else 0
+        variable = REPLY_PRIMING_TOKENS + sum(MESSAGE_OVERHEAD_TOKENS + count_tokens(message["content"])
+                                              for message in messages[1 if prefix else 0:])
+        usage = getattr(response, "usage", None)
+        with self._lock:
+            site = self._sites.setdefault(call_site, {
+                "calls": 0, "input_tokens": 0, "prefix_tokens": 0, "max_input_tokens": 0,
+                "reported_input_tokens": 0, "output_tokens": 0,
+            })
+            site["calls"] += 1
+            site["input_tokens"] += prefix + variable
+            site["prefix_tokens"] += prefix
+            site["max_input_tokens"] = max(site["max_input_tokens"], prefix + variable)
+            if usage is not None:
+                site["reported_input_tokens"] += getattr(usage, "prompt_tokens", 0) or 0
+                site["output_tokens"] += getattr(usage, "completion_tokens", 0) or 0
+        return prefix + variable
+
+    def metrics(self):
+        with self._lock:
+            sites = {name: dict(site) for name, site in self._sites.items()}
+        for site in sites.values():
+            site["avg_input_tokens"] = site["input_tokens"] / site["calls"] if site["calls"] else 0.0
+            site["prefix_share"] = site["prefix_tokens"] / site["input_tokens"] if site["input_tokens"] else 0.0
+        return sites
+
+    def format_metrics(self):
+        """One-line summary for the log."""
+        parts = [f"{name}: calls={m['calls']} in={m['input_tokens']} avg={m['avg_input_tokens']:.0f} "
+                 f"prefix={m['prefix_share']:.0%}"
+                 for name, m in sorted(self.metrics().items())]
+        return " | ".join(parts) if parts else "no LLM calls yet"
+
+
+def report():
+    """Assembled-prompt token counts per call site over the fixture tweets."""
+    with open(os.path.join(FIXTURES_DIR, "tweets.json")) as f:
+        tweets = json.load(f)
+
+    encoding = "tiktoken cl100k_base" if _get_encoding() is not None else "offline estimate"
+    print(f"Token counts ({encoding}); system prefix = "
+          f"{MESSAGE_OVERHEAD_TOKENS + count_tokens(CONTENT_SYSTEM_PROMPT)} tokens")
+
+    ledger = TokenLedger()
+    styles = list(REPLY_STYLES) + ["default"]
+    for i, item in enumerate(tweets):
+        style = styles[i % len(styles)]
+        ledger.record("reply", content_messages(reply_prompt(item["username"], item["text"], style)))
+        ledger.record("reply_retry", content_messages(reply_prompt(item["username"], item["text"], style), retry=True))
+        ledger.record("reply_strict", content_messages(strict_reply_prompt(item["username"], item["text"])))
+        ledger.record("relevance", relevance_messages(item["text"], item["text"]))
+
+    print(f"{'call site':<14} {'calls':>6} {'avg in':>8} {'max in':>8} {'prefix':>7}")
+    for name, m in ledger.metrics().items():
+        print(f"{name:<14} {m['calls']:>6} {m['avg_input_tokens']:>8.0f} {m['max_input_tokens']:>8} {m['prefix_share']:>7.0%}")
+
+
+def report_normalization(repeats=200):
+    """Tokens saved by normalize/trim on scraped fixture text, and what the normalization itself costs."""
+    with open(os.path.join(FIXTURES_DIR, "raw_tweets.json")) as f:
+        items = json.load(f)
+
+    print(f"\n{'call site':<14} {'items':>6} {'raw tok':>8} {'prepared':>9} {'saved':>6} {'us/item':>8}")
+    by_site = {}
+    for item in items:
+        by_site.setdefault(item["call_site"], []).append(item["text"])
+    for call_site, texts in by_site.items():
+        raw = sum(count_tokens(text) for text in texts)
+        prepared = sum(count_tokens(prepare_input(text, call_site)) for text in texts)
+        start = time.perf_counter()
+        for _ in range(repeats):
+            for text in texts:
+                prepare_input(text, call_site)
+        per_item_us = (time.perf_counter() - start) / (repeats * len(texts)) * 1e6
+        print(f"{call_site:<14} {len(texts):>6} {raw / len(texts):>8.0f} {prepared / len(texts):>9.0f} "
+              f"{1 - prepared / raw:>6.0%} {per_item_us:>8.0f}")
+
+
+if __name__ == "__main__":
+    report()
+    report_normalization()
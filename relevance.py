@@ -0,0 +1,290 @@
+"""
+Reply relevance scoring for Baggy Moonz Twitter Bot
+Local character n-gram TF-IDF + cosine similarity between a tweet and a candidate reply,
+so the LLM relevance check is only needed as a tie-breaker for uncertain scores. Either side
+can be a features.TextFeatures, whose tickers and n-grams are then computed only once.
+
+Run `python relevance.py` to check latency and accuracy on the labelled fixtures
+(add --llm to also measure agreement with the LLM check).
+"""
+import os
+import re
+import json
+import math
+import time
+import random
+import logging
+import threading
+from collections import Counter
+
+import numpy as np
+
+logger = logging.getLogger("BaggyMoonz")
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+DEFAULT_CORPUS = os.path.join(FIXTURES_DIR, "tweets.json")
+DEFAULT_LABELS = os.path.join(FIXTURES_DIR, "relevance_labels.json")
+
+# Common words that carry no topical signal
+STOP_WORDS = frozenset({
+    'the', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by', 'a', 'an', 'is', 'are',
+    'was', 'were', 'you', 'your', 'this', 'that', 'will', 'be', 'have', 'has', 'had', 'do', 'does', 'did',
+    'can', 'could', 'would', 'should', 'may', 'might', 'must', 'shall', 'going', 'get', 'got', 'like',
+    'more', 'much', 'many', 'most', 'some', 'any', 'all', 'if', 'then', 'so', 'just', 'only', 'also',
+    'even', 'still', 'now', 'here', 'there', 'when', 'where', 'why', 'how', 'what', 'who', 'which',
+    'about', 'after', 'before', 'during', 'while', 'until', 'since', 'from', 'into', 'through', 'over',
+    'under', 'up', 'down', 'out', 'off', 'between', 'among', 'i', 'me', 'my', 'mine', 'we', 'us', 'our',
+    'ours', 'he', 'him', 'his', 'she', 'her', 'hers', 'it', 'its', 'they', 'them', 'their', 'theirs'
+})
+
+URL_PATTERN = re.compile(r'https?://\S+|t\.co/\S+')
+MENTION_PATTERN = re.compile(r'@\w+')
+TICKER_PATTERN = re.compile(r'\$[A-Za-z]{2,6}\b')
+WORD_PATTERN = re.compile(r'\b\w+\b')
+
+# Score bands from `python relevance.py`: calibrate() on fixtures/relevance_labels.json with the labelled
+# texts left out of the IDF corpus gives a threshold of 0.043; the LLM band is that +/- its 0.03 margin
+ACCEPT_THRESHOLD = 0.073  # At or above: relevant without asking the LLM
+REJECT_THRESHOLD = 0.013  # Below: irrelevant without asking the LLM
+
+
+def extract_tickers(text):
+    """Uppercased $TICKER symbols in the text."""
+    return {ticker.upper() for ticker in TICKER_PATTERN.findall(text)}
+
+
+def tickers_of(text):
+    """extract_tickers for a string or a TextFeatures (which has them already)."""
+    return extract_tickers(text) if isinstance(text, str) else text.tickers
+
+
+def normalize_text(text):
+    """Lowercase, drop links and @mentions, keep content words only."""
+    text = URL_PATTERN.sub(' ', text)
+    text = MENTION_PATTERN.sub(' ', text)
+    words = [word for word in WORD_PATTERN.findall(text.lower()) if word not in STOP_WORDS]
+    return ' '.join(words)
+
+
+def char_ngrams(text, ngram_range=(3, 5)):
+    """Character n-gram counts over word-padded text."""
+    padded = f" {text} "
+    low, high = ngram_range
+    grams = Counter()
+    for n in range(low, high + 1):
+        for i in range(len(padded) - n + 1):
+            grams[padded[i:i + n]] += 1
+    return grams
+
+
+class RelevanceScorer:
+    """TF-IDF over character n-grams with IDF weights learned from a local corpus."""
+
+    def __init__(self, corpus_texts, ngram_range=(3, 5),
+                 accept_threshold=ACCEPT_THRESHOLD, reject_threshold=REJECT_THRESHOLD):
+        self.ngram_range = ngram_range
+        self.accept_threshold = accept_threshold
+        self.reject_threshold = reject_threshold
+
+        # Document frequencies over the corpus -> smoothed IDF
+        doc_freq = Counter()
+        for text in corpus_texts:
+            doc_freq.update(char_ngrams(normalize_text(text), ngram_range).keys())
+        num_docs = max(1, len(corpus_texts))
+        self.idf = {gram: math.log((1 + num_docs) / (1 + df)) + 1.0 for gram, df in doc_freq.items()}
+        self.default_idf = math.log(1 + num_docs) + 1.0  # Unseen n-grams are treated as rare
+
+        # Latency / decision metrics
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.total_seconds = 0.0
+        self.accepted = 0
+        self.rejected = 0
+        self.uncertain = 0
+
+    @classmethod
+    def from_corpus_file(cls, path=DEFAULT_CORPUS, **kwargs):
+        """Build the scorer from a JSON list of tweets ({"text": ...}) - falls back to an empty corpus."""
+        texts = []
+        try:
+            texts = load_corpus(path)
+        except Exception as e:
+            logger.warning(f"⚠️ Could not load relevance corpus {path}: {e}")
+        return cls(texts, **kwargs)
+
+    def _grams(self, text):
+        if isinstance(text, str):
+            return char_ngrams(normalize_text(text), self.ngram_range)
+        return text.char_ngrams(self.ngram_range)  # TextFeatures caches them
+
+    def _vectors(self, text_a, text_b):
+        """Aligned TF-IDF vectors for two texts over the union of their n-grams."""
+        grams_a = self._grams(text_a)
+        grams_b = self._grams(text_b)
+        keys = list(grams_a.keys() | grams_b.keys())
+        if not keys:
+            return None, None
+        idf = np.fromiter((self.idf.get(key, self.default_idf) for key in keys), dtype=np.float64, count=len(keys))
+        tf_a = np.fromiter((grams_a.get(key, 0) for key in keys), dtype=np.float64, count=len(keys))
+        tf_b = np.fromiter((grams_b.get(key, 0) for key in keys), dtype=np.float64, count=len(keys))
+        # Sublinear term frequency
+        vec_a = np.where(tf_a > 0, 1.0 + np.log(np.maximum(tf_a, 1.0)), 0.0) * idf
+        vec_b = np.where(tf_b > 0, 1.0 + np.log(np.maximum(tf_b, 1.0)), 0.0) * idf
+        return vec_a, vec_b
+
+    def score(self, reply, original):
+        """Cosine similarity in [0, 1]; a shared $TICKER counts as fully relevant."""
+        original_tickers = tickers_of(original)
+        if original_tickers and original_tickers & tickers_of(reply):
+            return 1.0
+        vec_a, vec_b = self._vectors(reply, original)
+        if vec_a is None:
+            return 0.0
+        norm = np.linalg.norm(vec_a) * np.linalg.norm(vec_b)
+        if norm == 0:
+            return 0.0
+        return float(np.dot(vec_a, vec_b) / norm)
+
+    def classify(self, reply, original):
+        """Return (verdict, score) where verdict is True/False, or None when the LLM should decide."""
+        start = time.perf_counter()
+        score = self.score(reply, original)
+        if score >= self.accept_threshold:
+            verdict = True
+        elif score < self.reject_threshold:
+            verdict = False
+        else:
+            verdict = None
+        elapsed = time.perf_counter() - start
+
+        with self._lock:
+            self.calls += 1
+            self.total_seconds += elapsed
+            if verdict is True:
+                self.accepted += 1
+            elif verdict is False:
+                self.rejected += 1
+            else:
+                self.uncertain += 1
+        return verdict, score
+
+    def metrics(self):
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "avg_ms": (self.total_seconds / self.calls * 1000) if self.calls else 0.0,
+                "accepted": self.accepted,
+                "rejected": self.rejected,
+                "uncertain": self.uncertain,
+            }
+
+
+def load_corpus(path=DEFAULT_CORPUS):
+    """Tweet texts from a JSON list of tweets ({"text": ...} or plain strings)."""
+    with open(path) as f:
+        return [item["text"] if isinstance(item, dict) else str(item) for item in json.load(f)]
+
+
+def held_out_corpus(texts, labels):
+    """The corpus without any text that appears in a labelled pair, so calibration isn't scored in-sample."""
+    labelled = {item["tweet"] for item in labels} | {item["reply"] for item in labels}
+    return [text for text in texts if text not in labelled]
+
+
+def load_labels(path=DEFAULT_LABELS):
+    """Labelled (tweet, reply, relevant) pairs."""
+    with open(path) as f:
+        return json.load(f)
+
+
+def calibrate(scorer, labels, margin=0.03):
+    """Pick the threshold with the best accuracy on labelled pairs; the LLM band sits +/- margin around it."""
+    scores = [(scorer.score(item["reply"], item["tweet"]), item["relevant"]) for item in labels]
+    best_threshold, best_correct = 0.0, -1
+    for candidate, _ in scores:
+        correct = sum((score >= candidate) == relevant for score, relevant in scores)
+        if correct > best_correct:
+            best_threshold, best_correct = candidate, correct
+    return {
+        "threshold": best_threshold,
+        "accuracy": best_correct / len(scores) if scores else 0.0,
+        "accept_threshold": best_threshold + margin,
+        "reject_threshold": max(0.0, best_threshold - margin),
+    }
+
+
+def cross_validate(scorer, labels, folds=5, seed=0):
+    """Accuracy of calibrate()'s threshold on pairs it wasn't fitted on (k-fold), plus the per-fold thresholds."""
+    order = list(range(len(labels)))
+    random.Random(seed).shuffle(order)
+    correct = 0
+    thresholds = []
+    for fold in range(folds):
+        held_out = set(order[fold::folds])
+        threshold = calibrate(scorer, [item for i, item in enumerate(labels) if i not in held_out])["threshold"]
+        thresholds.append(threshold)
+        correct += sum((scorer.score(labels[i]["reply"], labels[i]["tweet"]) >= threshold) == labels[i]["relevant"]
+                       for i in held_out)
+    return {"accuracy": correct / len(labels) if labels else 0.0, "thresholds": thresholds}
+
+
+def llm_relevance_check(client, reply, original):
+    """The original YES/NO LLM relevance check, for agreement measurements."""
+    response = client.chat.completions.create(
+        model="gpt-3.5-turbo",
+        messages=[
+            {"role": "system", "content": "You are checking if a Twitter reply makes sense. Be LENIENT - if replies share context or respond to the topic, answer YES. Only say NO if completely unrelated."},
+            {"role": "user", "content": f'Original tweet: "{original}"\nReply: "{reply}"\nAnswer YES if it makes sense as a response, NO only if it\'s completely unrelated.'}
+        ],
+        max_tokens=10,
+        temperature=0.1
+    )
+    return "YES" in response.choices[0].message.content.strip().upper()
+
+
+def evaluate(use_llm=False):
+    """Report scorer latency, accuracy and LLM-band usage on the labelled fixtures."""
+    labels = load_labels()
+    corpus = held_out_corpus(load_corpus(), labels)
+    scorer = RelevanceScorer(corpus)
+
+    calibration = calibrate(scorer, labels)
+    validation = cross_validate(scorer, labels)
+    print(f"IDF corpus: {len(corpus)} tweets (labelled texts left out)")
+    print(f"Calibrated threshold: {calibration['threshold']:.3f} "
+          f"(accuracy {calibration['accuracy']:.0%}, LLM band "
+          f"{calibration['reject_threshold']:.3f}-{calibration['accept_threshold']:.3f}; "
+          f"configured {REJECT_THRESHOLD:.3f}-{ACCEPT_THRESHOLD:.3f})")
+    print(f"Cross-validated accuracy: {validation['accuracy']:.0%} "
+          f"(fold thresholds {', '.join(f'{t:.3f}' for t in validation['thresholds'])})")
+
+    correct = 0
+    decided = 0
+    for item in labels:
+        verdict, _ = scorer.classify(item["reply"], item["tweet"])
+        if verdict is not None:
+            decided += 1
+            correct += verdict == item["relevant"]
+    metrics = scorer.metrics()
+    print(f"Local verdicts: {decided}/{len(labels)} decided, {correct}/{decided or 1} correct, "
+          f"{metrics['uncertain']} sent to LLM tie-breaker")
+    print(f"Scorer latency: {metrics['avg_ms']:.3f} ms/call")
+
+    if use_llm:
+        from dotenv import load_dotenv
+        from openai import OpenAI
+        load_dotenv()
+        client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+        agree = 0
+        llm_correct = 0
+        for item in labels:
+            llm_verdict = llm_relevance_check(client, item["reply"], item["tweet"])
+            local_verdict = scorer.score(item["reply"], item["tweet"]) >= calibration["threshold"]
+            agree += llm_verdict == local_verdict
+            llm_correct += llm_verdict == item["relevant"]
+        print(f"Agreement with LLM: {agree}/{len(labels)}; LLM accuracy vs labels: {llm_correct}/{len(labels)}")
+
+
+if __name__ == "__main__":
+    import sys
+    evaluate(use_llm="--llm" in sys.argv)
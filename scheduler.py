@@ -0,0 +1,203 @@
+"""
+Task scheduler for Baggy Moonz Twitter Bot
+Heap-based, deadline-aware scheduling of the bot's recurring tasks
+(mentions poll, timeline pass, original post, bio update, maintenance).
+Idle time is computed from the next due task instead of slept blindly.
+The gap between two tasks is the bot's safe point: an optional checkpoint callable runs
+there, and can hold the loop (pause) or end it (drain).
+"""
+import time
+import heapq
+import random
+import logging
+import threading
+
+logger = logging.getLogger("BaggyMoonz")
+
+
+class ScheduledTask:
+    """A recurring task with a jittered interval, a deadline and a priority (lower runs first)."""
+
+    def __init__(self, name, fn, interval, deadline, priority, first_run=0):
+        self.name = name
+        self.fn = fn
+        self.interval = interval  # (min_seconds, max_seconds) between runs
+        self.deadline = deadline  # Seconds after becoming due before the run counts as late
+        self.priority = priority
+        self.first_run = first_run  # Seconds after start for the first run
+        self.due_at = None
+
+        # Metrics
+        self.runs = 0
+        self.failures = 0
+        self.missed_deadlines = 0
+        self.busy_seconds = 0.0
+        self.total_lateness = 0.0
+        self.max_lateness = 0.0
+        self.last_lateness = 0.0
+
+    def next_interval(self, rng=random):
+        low, high = self.interval
+        return rng.uniform(low, high)
+
+    def metrics(self):
+        return {
+            "runs": self.runs,
+            "failures": self.failures,
+            "missed_deadlines": self.missed_deadlines,
+            "busy_seconds": self.busy_seconds,
+            "avg_lateness": self.total_lateness / self.runs if self.runs else 0.0,
+            "max_lateness": self.max_lateness,
+            "last_lateness": self.last_lateness,
+            "due_at": self.due_at,
+        }
+
+
+class TaskScheduler:
+    """Runs due tasks earliest-deadline-first, breaking ties by priority."""
+
+    def __init__(self, min_gap=(20, 60), clock=time.time, rng=random):
+        self.min_gap = min_gap  # Human-like pause between consecutive tasks
+        self.clock = clock
+        self.rng = rng  # Interval and gap jitter
+        self.tasks = {}
+        self._heap = []  # (due_at, seq, task)
+        self._seq = 0
+        self._started_at = None
+        self._next_allowed = 0.0
+        self.current_task = None
+        self.idle_seconds = 0.0
+
+    def add(self, task):
+        """Register a task; its first run is scheduled relative to now."""
+        if self._started_at is None:
+            self._started_at = self.clock()
+        self.tasks[task.name] = task
+        self._push(task, self.clock() + task.first_run)
+        return task
+
+    def _push(self, task, due_at):
+        task.due_at = due_at
+        self._seq += 1
+        heapq.heappush(self._heap, (due_at, self._seq, task))
+
+    def reschedule(self, name, delay=0):
+        """Pull a task forward (or push it back) to run `delay` seconds from now."""
+        task = self.tasks[name]
+        self._heap = [entry for entry in self._heap if entry[2] is not task]
+        heapq.heapify(self._heap)
+        self._push(task, self.clock() + delay)
+
+    def next_task(self):
+        """The task that will run next and when, without running it."""
+        if not self._heap:
+            return None, None
+        due = self._due_tasks(self.clock())
+        if due:
+            return due[0], max(due[0].due_at, self._next_allowed)
+        due_at, _, task = self._heap[0]
+        return task, max(due_at, self._next_allowed)
+
+    def time_until_next(self):
+        """Seconds until something is due (0 if a task is ready now)."""
+        _, when = self.next_task()
+        if when is None:
+            return None
+        return max(0.0, when - self.clock())
+
+    def _due_tasks(self, now):
+        """Tasks that are due now, ordered by deadline then priority."""
+        due = [task for due_at, _, task in self._heap if due_at <= now]
+        due.sort(key=lambda task: (task.due_at + task.deadline, task.priority))
+        return due
+
+    def run_pending(self, checkpoint=None):
+        """Run every task that is currently due, most urgent first. Returns the number run.
+
+        checkpoint() is called before looking for the next task; it may block, and returning False stops here.
+        """
+        ran = 0
+        while True:
+            if checkpoint is not None and not checkpoint():
+                break
+            now = self.clock()
+            if now < self._next_allowed and ran:
+                break
+            due = self._due_tasks(now)
+            if not due:
+                break
+            self._run(due[0])
+            ran += 1
+        return ran
+
+    def _run(self, task):
+        self._heap = [entry for entry in self._heap if entry[2] is not task]
+        heapq.heapify(self._heap)
+
+        start = self.clock()
+        lateness = max(0.0, start - task.due_at)
+        task.last_lateness = lateness
+        task.total_lateness += lateness
+        task.max_lateness = max(task.max_lateness, lateness)
+        if lateness > task.deadline:
+            task.missed_deadlines += 1
+            logger.warning(f"⏰ Task {task.name} ran {lateness:.0f}s late (deadline {task.deadline}s)")
+
+        self.current_task = task.name
+        try:
+            task.fn()
+        except Exception as e:
+            task.failures += 1
+            logger.error(f"❌ Error in task {task.name}: {e}")
+        finally:
+            self.current_task = None
+            end = self.clock()
+            task.runs += 1
+            task.busy_seconds += end - start
+            self._push(task, end + task.next_interval(self.rng))
+            self._next_allowed = end + self.rng.uniform(*self.min_gap)
+
+    def run_forever(self, stop_event=None, sleep_fn=None, checkpoint=None):
+        """Main loop: run due tasks, then idle exactly until the next one is due (or stop_event is set)."""
+        stop_event = stop_event or threading.Event()
+        while not stop_event.is_set():
+            self.run_pending(checkpoint)
+            if stop_event.is_set():
+                break
+            idle = self.time_until_next()
+            if idle is None:
+                break
+            if idle > 0:
+                task, _ = self.next_task()
+                logger.info(f"😴 Idle {idle:.0f}s until {task.name}")
+                self.idle_seconds += idle
+                if sleep_fn:
+                    sleep_fn(idle)
+                else:
+                    stop_event.wait(idle)
+
+    def utilization(self):
+        """Share of wall-clock time since start spent running tasks."""
+        if self._started_at is None:
+            return 0.0
+        elapsed = self.clock() - self._started_at
+        busy = sum(task.busy_seconds for task in self.tasks.values())
+        return busy / elapsed if elapsed > 0 else 0.0
+
+    def metrics(self):
+        """Per-task lateness and busy time plus overall utilization."""
+        return {
+            "utilization": self.utilization(),
+            "idle_seconds": self.idle_seconds,
+            "current_task": self.current_task,
+            "tasks": {name: task.metrics() for name, task in self.tasks.items()},
+        }
+
+    def format_metrics(self):
+        """One-line summary for the log."""
+        parts = []
+        for name, task in self.tasks.items():
+            m = task.metrics()
+            parts.append(f"{name}: runs={m['runs']} late_avg={m['avg_lateness']:.0f}s "
+                         f"late_max={m['max_lateness']:.0f}s missed={m['missed_deadlines']}")
+        return f"utilization={self.utilization():.1%} | " + " | ".join(parts)
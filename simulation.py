@@ -0,0 +1,90 @@
+"""
+Dry-run simulation for Baggy Moonz Twitter Bot
+Runs the whole engagement path - intake, batch personality decisions, the worker pipeline,
+prompt assembly, generation, validation and action selection, plus original-tweet slots -
+over fixture tweets with the mock LLM. The bot runs in dry-run mode, so likes, replies,
+retweets, follows and posts are recorded instead of clicked. The report gives decisions/s,
+LLM calls and input tokens per decision, and the action and engagement-style mix: a
+side-effect-free end-to-end baseline for performance changes.
+
+Usage:
+    python bot.py --simulate [--tweets 500] [--batch 8] [--llm-latency 0.05]
+"""
+import os
+import time
+import random
+import tempfile
+
+import timing
+from offline import MockChatClient, load_fixture_items, fixture_records
+
+
+def format_distribution(counts):
+    total = sum(counts.values()) or 1
+    return "  " + "  ".join(f"{name} {count} ({count / total:.0%})"
+                            for name, count in sorted(counts.items(), key=lambda item: -item[1]))
+
+
+def run_simulation(bot_factory, tweets=500, batch=8, tweet_every=10, llm_latency=0.0, fixtures=None, seed=42):
+    """Dry-run `tweets` fixture tweets through the pipeline in timeline-sized batches; returns the report."""
+    rng = random.Random(seed)  # The bot's decisions, styles and jitter
+    items = load_fixture_items(fixtures)
+    workdir = tempfile.mkdtemp(prefix="baggy_sim_")
+    mock = MockChatClient(seed=seed, latency=llm_latency)
+    bot = bot_factory(llm_client=mock, state_path=os.path.join(workdir, "state.db"),
+                      mentions_path=os.path.join(workdir, "mentions.json"), dry_run=True, rng=rng)
+    bot.logged_in = True
+    timing.TIMINGS.sleep_enabled = False
+
+    decisions = {}
+    submitted = 0
+    start = time.perf_counter()
+    try:
+        bot.pipeline.start()
+        batch_number = 0
+        while submitted < tweets:
+            window = [items[(submitted + i) % len(items)] for i in range(min(batch, tweets - submitted))]
+            # Each pass over the fixtures gets fresh IDs, like new tweets on a real timeline
+            records = fixture_records(window, tag=f"#{submitted // len(items)}")
+            submitted += len(records)
+            records = [record for record in records if not bot.state.has_engaged(record.tweet_id)]
+            bot.classify_records(records)
+            bot.pipeline.submit_batch(records, timeout=60)
+            for action in bot.pipeline.poll_actions():
+                decisions[action.action] = decisions.get(action.action, 0) + 1
+                bot.execute_engagement(action, None)
+
+            batch_number += 1
+            if batch_number % tweet_every == 0:
+                bot.maybe_create_original_tweet()
+
+        for action in bot.pipeline.drain(timeout=300):
+            decisions[action.action] = decisions.get(action.action, 0) + 1
+            bot.execute_engagement(action, None)
+    finally:
+        elapsed = time.perf_counter() - start
+        bot.pipeline.stop()
+        timing.TIMINGS.sleep_enabled = True
+        bot.state.close()
+
+    decided = sum(decisions.values())
+    llm = bot.llm.metrics()
+    sites = {name: site["calls"] for name, site in llm["sites"].items()}
+    input_tokens = sum(site["input_tokens"] for site in bot.token_ledger.metrics().values())
+
+    lines = [
+        f"=== Dry run: {submitted} tweets, {decided} decisions in {elapsed:.2f}s "
+        f"(mock LLM latency {llm_latency * 1000:.0f}ms, {bot.pipeline.num_workers} workers) ===",
+        f"Decisions/s: {decided / elapsed:.1f}" if elapsed > 0 else "Decisions/s: n/a",
+        f"LLM calls: {mock.calls} ({mock.calls / max(decided, 1):.2f} per decision), "
+        f"input tokens per decision: {input_tokens / max(decided, 1):.0f}",
+        "  by call site: " + " ".join(f"{name}={calls}" for name, calls in sorted(sites.items())),
+        "  by route: " + " ".join(f"{name} calls={route['calls']} p95={route['latency_p95'] * 1000:.0f}ms "
+                                  f"tokens={route['input_tokens']}/{route['output_tokens']}"
+                                  for name, route in sorted(llm["routes"].items())),
+        f"Skipped waits: {timing.TIMINGS.skipped_sleep:.0f}s",
+        "", "Decisions:", format_distribution(decisions),
+        "", "Recorded actions:", format_distribution(bot.recorder.counts),
+        "", "Engagement styles (recorded actions):", format_distribution(bot.recorder.styles),
+    ]
+    return "\n".join(lines)
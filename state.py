@@ -0,0 +1,296 @@
+"""
+Persistent state for Baggy Moonz Twitter Bot
+SQLite (WAL mode) store for engaged tweets, action timestamps, followers and the blacklist,
+so a restart keeps dedup and rate state. Engagement writes are batched; lookups go
+through the primary key / author index instead of loading everything at startup.
+"""
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+
+logger = logging.getLogger("BaggyMoonz")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS engagements (
+    tweet_id TEXT PRIMARY KEY,
+    author TEXT NOT NULL,
+    action TEXT,
+    engaged_at REAL NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_engagements_author ON engagements (author, engaged_at);
+CREATE INDEX IF NOT EXISTS idx_engagements_time ON engagements (engaged_at);
+CREATE TABLE IF NOT EXISTS timestamps (
+    name TEXT PRIMARY KEY,
+    value REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS followers (
+    username TEXT PRIMARY KEY,
+    seen_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS follower_changes (
+    username TEXT NOT NULL,
+    change TEXT NOT NULL,
+    changed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_follower_changes_time ON follower_changes (changed_at);
+CREATE TABLE IF NOT EXISTS blacklist (
+    username TEXT PRIMARY KEY,
+    added_at REAL NOT NULL
+);
+"""
+
+
+def copy_database(src_path, dst_path):
+    """Consistent copy of a state database (WAL included) via SQLite's online backup."""
+    src = sqlite3.connect(src_path)
+    dst = sqlite3.connect(dst_path)
+    try:
+        src.backup(dst)
+    finally:
+        dst.close()
+        src.close()
+
+
+def text_fingerprint(text):
+    """Stable short hash of tweet text (Python's hash() changes between runs)."""
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=8).hexdigest()
+
+
+class StateStore:
+    """SQLite-backed bot state; engagement inserts are buffered and flushed in batches."""
+
+    def __init__(self, path="bot_state.db", batch_size=100, flush_interval=5.0):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval  # Max seconds an engagement waits in the buffer
+        self._lock = threading.RLock()
+        self._conn = None
+        self._pending = {}  # tweet_id -> row, not yet written
+        self._last_flush = time.time()
+        self._followers = None  # Loaded on first access
+        self._blacklist = None
+
+        # Metrics
+        self.flushes = 0
+        self.rows_written = 0
+        self.lookups = 0
+        self.lookup_seconds = 0.0
+
+    @property
+    def conn(self):
+        """Open the database on first use."""
+        if self._conn is None:
+            with self._lock:
+                if self._conn is None:
+                    start = time.perf_counter()
+                    conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+                    conn.execute("PRAGMA journal_mode=WAL")
+                    conn.execute("PRAGMA synchronous=NORMAL")  # Durable at checkpoints, fast commits
+                    conn.executescript(SCHEMA)
+                    self._conn = conn
+                    logger.info(f"💾 Opened state store {self.path} in {(time.perf_counter() - start) * 1000:.1f}ms")
+        return self._conn
+
+    @contextmanager
+    def _transaction(self):
+        """BEGIN ... COMMIT, rolled back if any statement fails so the connection is usable again."""
+        self.conn.execute("BEGIN")
+        try:
+            yield self.conn
+        except BaseException:
+            self.conn.execute("ROLLBACK")
+            raise
+        self.conn.execute("COMMIT")
+
+    # Engagements
+
+    def has_engaged(self, tweet_id):
+        """Whether we've already engaged with this tweet (indexed lookup)."""
+        start = time.perf_counter()
+        with self._lock:
+            if tweet_id in self._pending:
+                found = True
+            else:
+                found = self.conn.execute("SELECT 1 FROM engagements WHERE tweet_id = ?", (tweet_id,)).fetchone() is not None
+            self.lookups += 1
+            self.lookup_seconds += time.perf_counter() - start
+        return found
+
+    def record_engagement(self, tweet_id, author, action=None, engaged_at=None):
+        """Buffer an engagement; the batch is written once it's full or old enough."""
+        with self._lock:
+            self._pending[tweet_id] = (tweet_id, author.lower(), action, engaged_at or time.time())
+            if len(self._pending) >= self.batch_size or time.time() - self._last_flush >= self.flush_interval:
+                self.flush()
+
+    def forget_engagement(self, tweet_id):
+        """Drop an engagement that didn't happen after all, so the tweet can be engaged with again."""
+        with self._lock:
+            if self._pending.pop(tweet_id, None) is None:
+                self.conn.execute("DELETE FROM engagements WHERE tweet_id = ?", (tweet_id,))
+
+    def record_engagements(self, rows):
+        """Bulk insert of (tweet_id, author, action, engaged_at) rows."""
+        with self._lock:
+            self.flush()
+            with self._transaction():
+                self.conn.executemany("INSERT OR REPLACE INTO engagements VALUES (?, ?, ?, ?)",
+                                      ((tweet_id, author.lower(), action, engaged_at) for tweet_id, author, action, engaged_at in rows))
+
+    def flush(self):
+        """Write buffered engagements in one transaction."""
+        with self._lock:
+            self._last_flush = time.time()
+            if not self._pending:
+                return 0
+            rows = list(self._pending.values())
+            with self._transaction():
+                self.conn.executemany("INSERT OR REPLACE INTO engagements VALUES (?, ?, ?, ?)", rows)
+            self._pending.clear()
+            self.flushes += 1
+            self.rows_written += len(rows)
+            return len(rows)
+
+    def engagements_with(self, author, since=None):
+        """How many times we've engaged with an author (optionally since a unix time)."""
+        with self._lock:
+            self.flush()
+            row = self.conn.execute("SELECT COUNT(*) FROM engagements WHERE author = ? AND engaged_at >= ?",
+                                    (author.lower(), since or 0)).fetchone()
+        return row[0]
+
+    def recent_engagements(self, limit=100):
+        """Newest engagements as (tweet_id, author, action, engaged_at) rows."""
+        with self._lock:
+            self.flush()
+            return self.conn.execute("SELECT tweet_id, author, action, engaged_at FROM engagements "
+                                     "ORDER BY engaged_at DESC LIMIT ?", (limit,)).fetchall()
+
+    def engagement_count(self):
+        with self._lock:
+            self.flush()
+            return self.conn.execute("SELECT COUNT(*) FROM engagements").fetchone()[0]
+
+    def compact(self, max_age_days=30, vacuum=False):
+        """Forget engagements older than max_age_days and checkpoint the WAL. Returns rows removed."""
+        cutoff = time.time() - max_age_days * 86400
+        with self._lock:
+            self.flush()
+            removed = self.conn.execute("DELETE FROM engagements WHERE engaged_at < ?", (cutoff,)).rowcount
+            self.conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            if vacuum:
+                self.conn.execute("VACUUM")
+        if removed:
+            logger.info(f"🧹 Compacted state store: removed {removed} engagements older than {max_age_days} days")
+        return removed
+
+    # Timestamps
+
+    def get_time(self, name):
+        """Stored datetime for `name`, or None."""
+        with self._lock:
+            row = self.conn.execute("SELECT value FROM timestamps WHERE name = ?", (name,)).fetchone()
+        return datetime.fromtimestamp(row[0]) if row else None
+
+    def set_time(self, name, value):
+        with self._lock:
+            if value is None:
+                self.conn.execute("DELETE FROM timestamps WHERE name = ?", (name,))
+            else:
+                self.conn.execute("INSERT OR REPLACE INTO timestamps VALUES (?, ?)", (name, value.timestamp()))
+
+    # Followers and blacklist
+
+    @property
+    def followers(self):
+        with self._lock:
+            if self._followers is None:
+                self._followers = [row[0] for row in self.conn.execute("SELECT username FROM followers ORDER BY seen_at")]
+            return list(self._followers)
+
+    def set_followers(self, usernames):
+        """Replace the stored follower list."""
+        now = time.time()
+        with self._lock:
+            with self._transaction():
+                self.conn.execute("DELETE FROM followers")
+                self.conn.executemany("INSERT OR IGNORE INTO followers VALUES (?, ?)", ((name, now) for name in usernames))
+                self.conn.execute("INSERT OR REPLACE INTO timestamps VALUES ('followers_crawled', ?)", (now,))
+            self._followers = list(dict.fromkeys(usernames))
+
+    def apply_follower_diff(self, new, lost, full=False):
+        """Add new followers, drop lost ones and log both; only the changed rows are written."""
+        now = time.time()
+        with self._lock:
+            with self._transaction():
+                self.conn.executemany("INSERT OR IGNORE INTO followers VALUES (?, ?)", ((name, now) for name in new))
+                self.conn.executemany("DELETE FROM followers WHERE username = ?", ((name,) for name in lost))
+                self.conn.executemany("INSERT INTO follower_changes VALUES (?, ?, ?)",
+                                      [(name, "new", now) for name in new] + [(name, "lost", now) for name in lost])
+                self.conn.execute("INSERT OR REPLACE INTO timestamps VALUES ('followers_crawled', ?)", (now,))
+                if full:
+                    self.conn.execute("INSERT OR REPLACE INTO timestamps VALUES ('followers_full_crawl', ?)", (now,))
+            if self._followers is not None:
+                lost_set = set(lost)
+                self._followers = [name for name in self._followers if name not in lost_set]
+                self._followers.extend(name for name in new if name not in self._followers)
+
+    def follower_changes(self, since=0):
+        """(username, 'new'|'lost', changed_at) rows since a unix time, oldest first."""
+        with self._lock:
+            return self.conn.execute("SELECT username, change, changed_at FROM follower_changes "
+                                     "WHERE changed_at >= ? ORDER BY changed_at", (since,)).fetchall()
+
+    def followers_age(self, full=False):
+        """Seconds since the follower list was last crawled - or fully crawled - (None if never)."""
+        name = "followers_full_crawl" if full else "followers_crawled"
+        with self._lock:
+            row = self.conn.execute("SELECT value FROM timestamps WHERE name = ?", (name,)).fetchone()
+            if row is None and not full:
+                row = self.conn.execute("SELECT MAX(seen_at) FROM followers").fetchone()  # Stores from before crawl times
+        return time.time() - row[0] if row and row[0] else None
+
+    @property
+    def blacklist(self):
+        with self._lock:
+            if self._blacklist is None:
+                self._blacklist = {row[0] for row in self.conn.execute("SELECT username FROM blacklist")}
+            return set(self._blacklist)
+
+    def add_to_blacklist(self, username):
+        with self._lock:
+            self.conn.execute("INSERT OR IGNORE INTO blacklist VALUES (?, ?)", (username.lower(), time.time()))
+            if self._blacklist is not None:
+                self._blacklist.add(username.lower())
+
+    def is_blacklisted(self, username):
+        return username.lower() in self.blacklist
+
+    def close(self):
+        """Flush pending writes and close the database."""
+        with self._lock:
+            if self._conn is None and not self._pending:
+                return
+            self.flush()
+            self._conn.close()
+            self._conn = None
+
+    def metrics(self):
+        with self._lock:
+            return {
+                "pending": len(self._pending),
+                "flushes": self.flushes,
+                "rows_written": self.rows_written,
+                "lookups": self.lookups,
+                "avg_lookup_us": (self.lookup_seconds / self.lookups * 1e6) if self.lookups else 0.0,
+            }
+
+    def format_metrics(self):
+        """One-line summary for the log."""
+        m = self.metrics()
+        return (f"pending={m['pending']} flushes={m['flushes']} written={m['rows_written']} "
+                f"lookups={m['lookups']} avg_lookup={m['avg_lookup_us']:.0f}us")
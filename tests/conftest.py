@@ -0,0 +1,10 @@
+"""
+Shared test setup for Baggy Moonz Twitter Bot
+Importing bot.py starts logging to files - point them at a temporary directory instead of the checkout.
+"""
+import os
+import tempfile
+
+_log_dir = tempfile.mkdtemp(prefix="baggy_tests_")
+os.environ.setdefault("LOG_FILE", os.path.join(_log_dir, "baggy_moonz.log"))
+os.environ.setdefault("EVENTS_FILE", os.path.join(_log_dir, "baggy_moonz.events.jsonl"))
@@ -0,0 +1,22 @@
+"""
+Thread marker tests for Baggy Moonz Twitter Bot
+Run with: python -m pytest -q tests
+"""
+import os
+import sys
+import json
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from conversations import has_thread_marker  # noqa: E402
+from relevance import FIXTURES_DIR  # noqa: E402
+
+with open(os.path.join(FIXTURES_DIR, "thread_markers.json"), encoding="utf-8") as f:
+    CASES = json.load(f)
+
+
+@pytest.mark.parametrize("case", CASES, ids=[case["text"][:30] for case in CASES])
+def test_thread_marker(case):
+    assert has_thread_marker(case["text"]) == case["thread"]
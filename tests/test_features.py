@@ -0,0 +1,62 @@
+"""
+TextFeatures parity tests for Baggy Moonz Twitter Bot
+Decisions must come out the same whether a check gets the tweet text or a shared TextFeatures.
+Run with: python -m pytest -q tests
+"""
+import os
+import sys
+import json
+import random
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import keywords  # noqa: E402
+from features import TextFeatures, TextFeatureCache  # noqa: E402
+from personality import (build_feature_matrix, should_engage_with_content, should_retweet_content,  # noqa: E402
+                         get_engagement_style)
+
+with open(keywords.SAMPLE_TWEETS_FILE, encoding="utf-8") as f:
+    TEXTS = [item["text"] for item in json.load(f)]
+
+
+@pytest.fixture(scope="module")
+def config():
+    return keywords.KeywordConfig.from_file(keywords.DEFAULT_KEYWORDS_FILE)
+
+
+def test_feature_matrix_hits_equal_the_matchers(config):
+    matrix = build_feature_matrix(TEXTS, config=config)
+    for row, text in zip(matrix, TEXTS):
+        for column, (category, _) in enumerate(config.feature_categories):
+            assert (row[column] > 0) == config.matches(category, text.lower()), (category, text)
+
+
+def test_seeded_hits_equal_computed_hits(config):
+    matrix = build_feature_matrix(TEXTS, config=config)
+    categories = [name for name, _ in config.feature_categories]
+    for row, text in zip(matrix, TEXTS):
+        seeded = TextFeatures(text, config, zip(categories, (row[:len(categories)] > 0).tolist()))
+        fresh = TextFeatures(text, config)
+        for category in categories + ["mention_spam"]:
+            assert seeded.matches(category) == fresh.matches(category), (category, text)
+        assert seeded.engagement_style == fresh.engagement_style
+
+
+@pytest.mark.parametrize("check", [should_engage_with_content, should_retweet_content, get_engagement_style])
+def test_checks_agree_for_text_and_features(check):
+    for seed, text in enumerate(TEXTS):
+        assert check(text, rng=random.Random(seed)) == check(TextFeatures(text), rng=random.Random(seed)), text
+
+
+def test_cache_rebuilds_when_text_or_config_changes(config):
+    cache = TextFeatureCache(maxsize=2)
+    first = cache.get("t1", "gm frens", config)
+    assert cache.get("t1", "gm frens", config) is first
+    assert cache.get("t1", "gn frens", config) is not first
+    other = keywords.KeywordConfig.from_file(keywords.DEFAULT_KEYWORDS_FILE)
+    assert cache.get("t1", "gn frens", other).config is other
+    cache.get("t2", "a", config)
+    cache.get("t3", "b", config)
+    assert cache.format_metrics().startswith("cached=2 ")
@@ -0,0 +1,92 @@
+"""
+Keyword matching tests for Baggy Moonz Twitter Bot
+The compiled trie regexes must give the same answers as plain substring checks.
+Run with: python -m pytest -q tests
+"""
+import os
+import sys
+import json
+import random
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from keywords import DEFAULT_KEYWORDS_FILE, SAMPLE_TWEETS_FILE, KeywordConfig, KeywordMatcher, KeywordStore  # noqa: E402
+
+
+@pytest.fixture(scope="module")
+def data():
+    with open(DEFAULT_KEYWORDS_FILE, encoding="utf-8") as f:
+        return json.load(f)
+
+
+@pytest.fixture(scope="module")
+def texts(data):
+    """Fixture tweets plus random mixes of keywords, their prefixes and filler, lowercased."""
+    with open(SAMPLE_TWEETS_FILE, encoding="utf-8") as f:
+        sample = [item["text"].lower() for item in json.load(f)]
+    words = [keyword for entry in data["engagement_styles"] for keyword in entry["keywords"]]
+    words += [keyword for tier in data["interest_tiers"].values() for keyword in tier] + data["spam_keywords"]
+    pieces = words + [word[:max(1, len(word) - 1)] for word in words] + ["the", "x", " ", "!"]
+    rng = random.Random(7)
+    return sample + ["".join(rng.choice(pieces) + rng.choice(["", " "]) for _ in range(rng.randint(1, 8)))
+                     for _ in range(2000)]
+
+
+def test_matcher_matches_substring_search():
+    keywords = ["work", "workout", "wor", "job", "a.b", "c++", ""]
+    matcher = KeywordMatcher(keywords)
+    for text in ["homework", "wo", "a.b", "axb", "c++ dev", "c+", "jo", ""]:
+        assert matcher.matches(text) == any(keyword and keyword in text for keyword in keywords), text
+
+
+def test_empty_matcher_never_matches():
+    assert not KeywordMatcher([]).matches("anything")
+
+
+def test_category_matches_equal_scalar_checks(data, texts):
+    config = KeywordConfig(data)
+    for category, keywords in config.keywords.items():
+        for text in texts:
+            assert config.matches(category, text) == any(keyword in text for keyword in keywords), (category, text)
+
+
+def test_engagement_style_is_first_matching_style(data, texts):
+    config = KeywordConfig(data)
+    for text in texts:
+        expected = next((style for style, keywords in config.engagement_styles
+                         if any(keyword in text for keyword in keywords)), None)
+        assert config.engagement_style(text) == expected, text
+
+
+def test_empty_styles_are_rejected(data):
+    with pytest.raises(ValueError):
+        KeywordConfig({**data, "engagement_styles": []})
+
+
+def test_store_reloads_edits_and_keeps_the_last_good_version(data, tmp_path):
+    path = tmp_path / "keywords.json"
+    path.write_text(json.dumps(data), encoding="utf-8")
+    now = [0.0]
+    store = KeywordStore(str(path), check_interval=5.0, clock=lambda: now[0])
+    first = store.get()
+    assert not first.matches("spam", "zebracorn")
+
+    edited = {**data, "spam_keywords": data["spam_keywords"] + ["zebracorn"]}
+    path.write_text(json.dumps(edited), encoding="utf-8")
+    os.utime(path, ns=(10 ** 18, 10 ** 18))
+    assert store.get() is first  # Not checked again until check_interval has passed
+    now[0] += 5
+    assert store.get().matches("spam", "zebracorn")
+    assert store.reloads == 1
+
+    good = store.get()
+    path.write_text("{ broken", encoding="utf-8")
+    os.utime(path, ns=(2 * 10 ** 18, 2 * 10 ** 18))
+    now[0] += 5
+    assert store.get() is good
+    assert store.failures == 1
+    now[0] += 5
+    store.get()
+    assert store.failures == 1  # The same broken file isn't retried on every check
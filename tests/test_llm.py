@@ -0,0 +1,135 @@
+"""
+LLM client tests for Baggy Moonz Twitter Bot
+Run with: python -m pytest -q tests
+"""
+import os
+import sys
+import json
+
+import httpx
+import openai
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from llm import LLMClient, LLMUnavailable, CircuitBreaker, RetryPolicy, BAD_OUTPUT, CLIENT  # noqa: E402
+
+
+def sse_body(pieces):
+    """A chat.completions stream as the API sends it: one SSE event per delta, then [DONE]."""
+    events = []
+    for piece in pieces:
+        chunk = {"id": "chatcmpl-1", "object": "chat.completion.chunk", "created": 0, "model": "gpt-3.5-turbo",
+                 "choices": [{"index": 0, "delta": {"content": piece}, "finish_reason": None}]}
+        events.append(f"data: {json.dumps(chunk)}\n\n")
+    events.append("data: [DONE]\n\n")
+    return "".join(events).encode("utf-8")
+
+
+def sdk_client(handler):
+    """A real OpenAI client whose HTTP requests are answered by handler(request)."""
+    return openai.OpenAI(api_key="test", base_url="http://llm.test/v1", max_retries=0,
+                         http_client=httpx.Client(transport=httpx.MockTransport(handler)))
+
+
+def test_stream_with_sdk_stream():
+    def handler(request):
+        return httpx.Response(200, headers={"content-type": "text/event-stream"},
+                              content=sse_body(["gm ", "frens"]))
+
+    llm = LLMClient(client=sdk_client(handler), sleep_fn=lambda seconds: None)
+    outcome = llm.stream("reply", [{"role": "user", "content": "hi"}], max_tokens=20, temperature=0.5)
+    assert outcome.accepted == ["gm frens"]
+    assert not outcome.aborted
+
+
+def test_stream_cut_off_with_sdk_stream():
+    def handler(request):
+        return httpx.Response(200, headers={"content-type": "text/event-stream"},
+                              content=sse_body(["#bad ", "tweet ", "more"]))
+
+    llm = LLMClient(client=sdk_client(handler), sleep_fn=lambda seconds: None)
+    outcome = llm.stream("reply", [{"role": "user", "content": "hi"}], max_tokens=20, temperature=0.5,
+                         check=lambda text: "hashtag" if "#" in text else None)
+    assert outcome.aborted
+    assert outcome.verdicts == ["hashtag"]
+
+
+def completion_response(content):
+    return httpx.Response(200, json={
+        "id": "chatcmpl-1", "object": "chat.completion", "created": 0, "model": "gpt-3.5-turbo",
+        "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}]})
+
+
+def test_breaker_probe_released_after_client_error():
+    now = [0.0]
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10, clock=lambda: now[0])
+    responses = [503, 400, 200]
+
+    def handler(request):
+        status = responses.pop(0)
+        if status != 200:
+            return httpx.Response(status, json={"error": {"message": "nope"}})
+        return completion_response("ok")
+
+    llm = LLMClient(client=sdk_client(handler), breaker=breaker, retry_policy=RetryPolicy(max_attempts=1),
+                    sleep_fn=lambda seconds: None)
+    messages = [{"role": "user", "content": "hi"}]
+    for expected_kind in ("server", "client"):
+        with pytest.raises(LLMUnavailable) as exc:
+            llm.complete("reply", messages, max_tokens=5, temperature=0)
+        assert exc.value.kind == expected_kind
+        now[0] += 10  # The 503 opened the breaker; wait out the reset so the next call is the probe
+
+    # The BadRequestError probe must not leave the breaker wedged half-open
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert llm.complete("reply", messages, max_tokens=5, temperature=0) == "ok"
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_unparseable_completion_is_retried_as_bad_output():
+    replies = ["seven", "7"]
+    llm = LLMClient(client=sdk_client(lambda request: completion_response(replies.pop(0))),
+                    sleep_fn=lambda seconds: None)
+    assert llm.complete("proofread", [{"role": "user", "content": "rate"}], max_tokens=5, temperature=0, parse=int) == 7
+    assert llm.metrics()["sites"]["proofread"]["failures"] == {BAD_OUTPUT: 1}
+
+
+def test_value_error_outside_the_parser_is_not_bad_output():
+    breaker = CircuitBreaker(failure_threshold=5)
+    breaker.consecutive_failures = 3
+    llm = LLMClient(client=object(), breaker=breaker, sleep_fn=lambda seconds: None)
+    attempts = []
+
+    def buggy_attempt(client, route, info):
+        attempts.append(1)
+        first, second = [1]  # A plain bug, not the model's fault
+        return first
+
+    with pytest.raises(LLMUnavailable) as exc:
+        llm._call("reply", buggy_attempt)
+    assert exc.value.kind == CLIENT
+    assert len(attempts) == 1  # Not retried
+    assert breaker.consecutive_failures == 3  # Not reset as if the API had answered
+
+
+def test_breaker_opens_and_admits_a_single_probe():
+    now = [0.0]
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=10, clock=lambda: now[0])
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow()
+
+    now[0] += 10
+    assert breaker.allow()  # The probe
+    assert not breaker.allow()  # Everyone else waits for its outcome
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN  # A failed probe opens it again straight away
+
+    now[0] += 10
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.consecutive_failures == 0
@@ -0,0 +1,87 @@
+"""
+Mentions watermark tests for Baggy Moonz Twitter Bot
+Run with: python -m pytest -q tests
+"""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import bot  # noqa: E402
+import timing  # noqa: E402
+from offline import MockChatClient  # noqa: E402
+from pipeline import TweetRecord  # noqa: E402
+from state import text_fingerprint  # noqa: E402
+
+
+@pytest.fixture
+def twitter_bot(tmp_path, monkeypatch):
+    monkeypatch.setattr(timing.TIMINGS, "sleep_enabled", False)
+    instance = bot.IntelligentTwitterBot(llm_client=MockChatClient(), state_path=str(tmp_path / "state.db"),
+                                         mentions_path=str(tmp_path / "mentions.json"))
+    instance.mention_tracker.watermark = 100
+    yield instance
+    instance.state.close()
+
+
+def mention(status_id):
+    return TweetRecord(f"t{status_id}", "alice", f"mention number {status_id}", source="mentions",
+                       status_id=str(status_id))
+
+
+def poll(twitter_bot, monkeypatch, records, handle):
+    monkeypatch.setattr(twitter_bot, "navigate", lambda url: None)
+    monkeypatch.setattr(twitter_bot, "collect_new_mentions", lambda: [(record, None) for record in records])
+    monkeypatch.setattr(twitter_bot, "prepare_mention_replies", lambda mentions: {})
+    monkeypatch.setattr(twitter_bot, "handle_mention", handle)
+    twitter_bot.check_mentions()
+
+
+def test_failed_mention_holds_the_watermark(twitter_bot, monkeypatch):
+    seen = []
+
+    def handle(record, element, prepared):
+        seen.append(record.status_id)
+        if record.status_id == "102":
+            raise RuntimeError("stale element")
+        return False
+
+    poll(twitter_bot, monkeypatch, [mention(101), mention(102), mention(103)], handle)
+    assert seen == ["101", "102"]  # Stopped at the failure
+    assert twitter_bot.mention_tracker.watermark == 101  # Just before the failed mention, so it's retried
+
+    seen.clear()
+    poll(twitter_bot, monkeypatch, [mention(102), mention(103)], lambda record, element, prepared: seen.append(record.status_id))
+    assert seen == ["102", "103"]
+    assert twitter_bot.mention_tracker.watermark == 103
+
+
+def test_mention_abandoned_after_repeated_failures(twitter_bot, monkeypatch):
+    def handle(record, element, prepared):
+        if record.status_id == "101":
+            raise RuntimeError("deleted")
+        return False
+
+    for _ in range(bot.MENTION_MAX_ATTEMPTS - 1):
+        poll(twitter_bot, monkeypatch, [mention(101), mention(102)], handle)
+        assert twitter_bot.mention_tracker.watermark == 100
+    poll(twitter_bot, monkeypatch, [mention(101), mention(102)], handle)
+    assert twitter_bot.mention_tracker.watermark == 102
+    assert twitter_bot.mention_tracker.abandoned == 1
+
+
+def test_unposted_reply_forgets_the_mention(twitter_bot, monkeypatch):
+    record = mention(101)
+    monkeypatch.setattr(twitter_bot, "mention_skip_reason", lambda record: None)
+    monkeypatch.setattr(twitter_bot, "is_thread_tweet", lambda element: False)
+    monkeypatch.setattr(twitter_bot, "should_engage", lambda *args, **kwargs: True)
+    monkeypatch.setattr(twitter_bot, "prepare_reply", lambda *args: "@alice fair point")
+    monkeypatch.setattr(twitter_bot, "locate_mention_element", lambda record, element: object())
+    monkeypatch.setattr(twitter_bot, "post_actual_reply", lambda element, content: False)
+
+    with pytest.raises(RuntimeError):
+        twitter_bot.handle_mention(record, None)
+    # Not marked as answered, so the retry can still reply
+    assert not twitter_bot.state.has_engaged(f"mention:alice:{text_fingerprint(record.text[:100])}")
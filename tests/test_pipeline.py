@@ -0,0 +1,44 @@
+"""
+Engagement pipeline tests for Baggy Moonz Twitter Bot
+Run with: python -m pytest -q tests
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pipeline import EngagementPipeline, ActionRequest, TweetRecord  # noqa: E402
+
+
+def record(number):
+    return TweetRecord(f"t{number}", "alice", f"tweet {number}")
+
+
+def test_record_counts_as_outstanding_before_a_worker_sees_it():
+    pipeline = EngagementPipeline(lambda item: ActionRequest(item, "like"), prepare_batch_fn=lambda items: [])
+    seen = []
+    put = pipeline.intake.put
+
+    def put_and_finish(item, timeout=None):
+        put(item, timeout=timeout)
+        # A worker takes the item and the action is collected before submit() gets to return
+        pipeline.intake.get_nowait()
+        seen.append(pipeline.outstanding)
+        pipeline._collected(len(item) if isinstance(item, list) else 1)
+        seen.append(pipeline.outstanding)
+
+    pipeline.intake.put = put_and_finish
+    assert pipeline.submit(record(1))
+    assert pipeline.submit_batch([record(2), record(3)])
+    assert seen == [1, 0, 2, 0]
+    assert pipeline.outstanding == 0
+
+
+def test_dropped_record_is_not_outstanding():
+    pipeline = EngagementPipeline(lambda item: ActionRequest(item, "like"), max_pending=1,
+                                  prepare_batch_fn=lambda items: [])
+    assert pipeline.submit(record(1))
+    assert not pipeline.submit(record(2), timeout=0.01)
+    assert not pipeline.submit_batch([record(3), record(4)], timeout=0.01)
+    assert pipeline.outstanding == 1
+    assert pipeline.dropped == 3
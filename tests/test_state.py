@@ -0,0 +1,57 @@
+"""
+State store tests for Baggy Moonz Twitter Bot
+Run with: python -m pytest -q tests
+"""
+import os
+import sys
+import sqlite3
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from state import StateStore  # noqa: E402
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = StateStore(str(tmp_path / "state.db"))
+    yield store
+    store.close()
+
+
+def test_failed_bulk_insert_rolls_back(store):
+    with pytest.raises(sqlite3.IntegrityError):
+        store.record_engagements([("1", "alice", "like", 1.0), ("2", "bob", "like", None)])  # engaged_at is NOT NULL
+    assert not store.has_engaged("1")  # The whole batch was rolled back
+
+    store.record_engagements([("3", "carol", "reply", 2.0)])  # No "transaction within a transaction"
+    assert store.has_engaged("3")
+
+
+def test_failed_flush_keeps_pending_rows(store):
+    store.record_engagement("1", "alice", "like")
+    store._pending["2"] = ("2", "bob", "like", None)
+    with pytest.raises(sqlite3.IntegrityError):
+        store.flush()
+    assert store.has_engaged("1")  # Still buffered, not lost
+
+    del store._pending["2"]
+    assert store.flush() == 1
+    assert store.engagement_count() == 1
+
+
+def test_failed_follower_diff_rolls_back(store):
+    store.set_followers(["alice"])
+    with pytest.raises(sqlite3.Error):
+        store.apply_follower_diff(["bob"], [object()])  # Unbindable parameter fails mid-transaction
+    store.apply_follower_diff(["carol"], [])
+    assert store.followers == ["alice", "carol"]
+
+
+def test_close_writes_pending_rows(tmp_path):
+    path = str(tmp_path / "state.db")
+    store = StateStore(path)
+    store.record_engagement("1", "alice", "like")
+    store.close()
+    assert StateStore(path).has_engaged("1")
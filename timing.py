@@ -0,0 +1,184 @@
+"""
+Timing spans for Baggy Moonz Twitter Bot
+`span("phase")` (context manager) and `@timed("phase")` (decorator) time the bot's phases -
+navigation, DOM extraction, decisions, LLM calls, validation, posting - into per-phase
+histograms, and `cycle("name")` collects a per-cycle breakdown. Intentional waits go through
+`sleep()` so they're reported separately from work. Nested spans are broken down by
+exclusive time, so a cycle's phases add up to the time its threads actually spent.
+"""
+import time
+import bisect
+import logging
+import threading
+import functools
+from collections import deque
+from contextlib import contextmanager
+
+logger = logging.getLogger("BaggyMoonz")
+
+SLEEP_PHASE = "sleep"
+# Upper bounds (seconds) of the lifetime bucket counts exported by the control endpoint
+BUCKET_BOUNDS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+
+class Histogram:
+    """Recent durations for one phase with count/total and percentiles, plus lifetime bucket counts."""
+
+    def __init__(self, maxlen=2000):
+        self.samples = deque(maxlen=maxlen)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.bucket_counts = [0] * (len(BUCKET_BOUNDS) + 1)  # Last one is +Inf
+
+    def add(self, seconds):
+        self.samples.append(seconds)
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        self.bucket_counts[bisect.bisect_left(BUCKET_BOUNDS, seconds)] += 1
+
+    def buckets(self):
+        """Cumulative (upper bound, count) pairs, ending with (inf, count)."""
+        cumulative, running = [], 0
+        for bound, count in zip(BUCKET_BOUNDS + (float("inf"),), self.bucket_counts):
+            running += count
+            cumulative.append((bound, running))
+        return cumulative
+
+    def percentiles(self, points=(0.5, 0.95, 0.99)):
+        ordered = sorted(self.samples)
+        if not ordered:
+            return {point: 0.0 for point in points}
+        return {point: ordered[min(len(ordered) - 1, int(len(ordered) * point))] for point in points}
+
+
+class Timings:
+    """Thread-safe span recorder with per-phase histograms and a per-cycle breakdown."""
+
+    def __init__(self, clock=time.perf_counter):
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.phases = {}
+        self._cycle = None  # {"name", "start", "phases": {phase: exclusive seconds}}
+        self.last_cycle = None
+        self.sleep_enabled = True  # Offline runs turn waits off and only count them
+        self.skipped_sleep = 0.0
+
+    def _stack(self):
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    @contextmanager
+    def span(self, phase):
+        """Time a block as `phase`; time spent in nested spans is excluded from its breakdown share."""
+        stack = self._stack()
+        frame = [phase, 0.0]  # [phase, seconds spent in child spans]
+        stack.append(frame)
+        start = self.clock()
+        try:
+            yield
+        finally:
+            elapsed = self.clock() - start
+            stack.pop()
+            if stack:
+                stack[-1][1] += elapsed
+            self._record(phase, elapsed, max(0.0, elapsed - frame[1]))
+
+    def _record(self, phase, inclusive, exclusive):
+        with self._lock:
+            histogram = self.phases.get(phase)
+            if histogram is None:
+                histogram = self.phases[phase] = Histogram()
+            histogram.add(inclusive)
+            if self._cycle is not None:
+                self._cycle["phases"][phase] = self._cycle["phases"].get(phase, 0.0) + exclusive
+
+    def timed(self, phase):
+        """Decorator form of span()."""
+        def decorator(fn):
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                with self.span(phase):
+                    return fn(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def sleep(self, seconds):
+        """time.sleep that is accounted as intentional waiting, not work."""
+        if not self.sleep_enabled:
+            with self._lock:
+                self.skipped_sleep += seconds
+            return
+        with self.span(SLEEP_PHASE):
+            time.sleep(seconds)
+
+    @contextmanager
+    def cycle(self, name):
+        """Collect a breakdown of every span (from any thread) recorded while the block runs.
+
+        A cycle started inside another one is just a span of the outer cycle.
+        """
+        with self._lock:
+            nested = self._cycle is not None
+            if not nested:
+                self._cycle = {"name": name, "start": self.clock(), "phases": {}}
+        if nested:
+            with self.span(name):
+                yield
+            return
+        try:
+            with self.span(name):
+                yield
+        finally:
+            with self._lock:
+                cycle, self._cycle = self._cycle, None
+            cycle["wall"] = self.clock() - cycle["start"]
+            # The cycle's own exclusive time is whatever no finer span covered
+            untracked = cycle["phases"].pop(name, 0.0)
+            cycle["phases"]["other"] = cycle["phases"].get("other", 0.0) + untracked
+            self.last_cycle = cycle
+            logger.info("⏱️ %s", self.format_cycle(cycle))
+
+    def format_cycle(self, cycle):
+        """One-line breakdown: wall time, work by phase (largest first), then sleep."""
+        phases = dict(cycle["phases"])
+        sleep = phases.pop(SLEEP_PHASE, 0.0)
+        work = sum(phases.values())
+        parts = ", ".join(f"{phase} {seconds:.1f}s" for phase, seconds in
+                          sorted(phases.items(), key=lambda item: -item[1]) if seconds >= 0.05)
+        return f"cycle {cycle['name']} {cycle['wall']:.1f}s: work {work:.1f}s ({parts or 'none'}) sleep {sleep:.1f}s"
+
+    def metrics(self):
+        """Per-phase count, total, max and p50/p95/p99 (seconds)."""
+        with self._lock:
+            snapshot = {}
+            for phase, histogram in self.phases.items():
+                points = histogram.percentiles()
+                snapshot[phase] = {
+                    "count": histogram.count,
+                    "total": histogram.total,
+                    "max": histogram.max,
+                    "p50": points[0.5],
+                    "p95": points[0.95],
+                    "p99": points[0.99],
+                    "buckets": histogram.buckets(),
+                }
+        return snapshot
+
+    def format_metrics(self):
+        """One line per phase, busiest first."""
+        rows = sorted(self.metrics().items(), key=lambda item: -item[1]["total"])
+        return "\n".join(f"  {phase:<16} n={m['count']:<5} p50={m['p50']:.2f}s p95={m['p95']:.2f}s "
+                         f"p99={m['p99']:.2f}s total={m['total']:.0f}s" for phase, m in rows)
+
+
+# Shared recorder for the whole bot
+TIMINGS = Timings()
+span = TIMINGS.span
+timed = TIMINGS.timed
+sleep = TIMINGS.sleep
+cycle = TIMINGS.cycle